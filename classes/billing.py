@@ -0,0 +1,88 @@
+# classes/billing.py
+
+from collections import defaultdict
+from django.db import transaction
+from django.db.models import F, Max
+from students.models import Student
+from .models import ClassInfo, TuitionLog, billing_period_of
+
+
+def run_monthly_billing(charge_date, memo="정기 일괄 청구", batch_size=500):
+    """
+    진행 중인 모든 수업의 수강생에게 해당 월 수강료를 일괄 청구합니다.
+
+    수강생 수와 관계없이 쿼리 수가 거의 일정하도록 집합 단위로 처리합니다.
+    1. (학생, 수업) 수강 목록과 해당 청구월에 이미 청구된 내역을 각각 한 번에 조회
+    2. 청구되지 않은 건만 bulk_create(ignore_conflicts) 로 일괄 생성
+       (학생, 수업, 청구월) 유니크 키 덕분에 여러 번 실행해도 중복 청구되지 않습니다.
+    3. 이번 실행에서 실제로 생성된 청구서만 다시 조회해 (동시에 다른 경로로 먼저 생성된 건 제외)
+       학생별 미납금 증가분을 같은 금액끼리 묶어 F() 표현식으로 일괄 갱신
+
+    :return: {'charged': 청구 건수, 'students': 청구된 학생 수, 'amount': 청구 총액}
+    """
+    target_month = f"{charge_date.month}월 수강료"
+    period = billing_period_of(charge_date)
+
+    with transaction.atomic():
+        # 0. 진행 중인 수업 행을 잠가 동시에 실행된 일괄 청구를 직렬화
+        list(ClassInfo.objects.select_for_update().filter(is_active=True).values_list('pk', flat=True))
+
+        # 1. 진행 중인 수업의 (학생, 수업, 수강료) 목록 - 쿼리 1회
+        Enrollment = ClassInfo.students.through
+        enrollments = Enrollment.objects.filter(classinfo__is_active=True).values_list(
+            'student_id', 'classinfo_id', 'classinfo__tuition_fee'
+        )
+
+        # 2. 이번 청구월에 이미 청구된 (학생, 수업) 쌍 - 쿼리 1회 (billing_period 인덱스 사용)
+        already_charged = charged_pairs(period)
+
+        new_logs = []
+        planned = set()
+        for student_id, class_id, fee in enrollments:
+            if (student_id, class_id) in already_charged or (student_id, class_id) in planned:
+                continue
+            planned.add((student_id, class_id))
+            new_logs.append(TuitionLog(
+                student_id=student_id, class_info_id=class_id, amount=fee,
+                charge_date=charge_date, month=target_month, billing_period=period, memo=memo
+            ))
+
+        # 3. 청구 내역 일괄 생성 (insert-or-ignore)
+        last_pk = TuitionLog.objects.aggregate(last=Max('pk'))['last'] or 0
+        TuitionLog.objects.bulk_create(new_logs, batch_size=batch_size, ignore_conflicts=True)
+
+        # 4. 이번 실행이 실제로 만든 청구서만 다시 조회
+        #    (조회와 INSERT 사이에 개별 청구 등으로 먼저 생긴 건은 무시되었으므로 미납금에 더하지 않음)
+        increase_by_student = defaultdict(int)
+        charged = 0
+        created = TuitionLog.objects.filter(
+            pk__gt=last_pk, billing_period=period, charge_date=charge_date, memo=memo,
+        ).values_list('student_id', 'class_info_id', 'amount')
+        for student_id, class_id, amount in created:
+            if (student_id, class_id) in planned:
+                increase_by_student[student_id] += amount
+                charged += 1
+
+        # 5. 미납금 갱신: 증가액이 같은 학생들끼리 묶어 UPDATE 한 번씩 실행
+        students_by_amount = defaultdict(list)
+        for student_id, amount in increase_by_student.items():
+            students_by_amount[amount].append(student_id)
+
+        for amount, student_ids in students_by_amount.items():
+            if amount == 0:
+                continue
+            for i in range(0, len(student_ids), batch_size):
+                Student.objects.filter(pk__in=student_ids[i:i + batch_size]).update(
+                    unpaid_amount=F('unpaid_amount') + amount
+                )
+
+    return {
+        'charged': charged,
+        'students': len(increase_by_student),
+        'amount': sum(increase_by_student.values()),
+    }
+
+
+def charged_pairs(period):
+    """해당 청구월에 이미 청구서가 있는 (학생, 수업) 쌍"""
+    return set(TuitionLog.objects.filter(billing_period=period).values_list('student_id', 'class_info_id'))
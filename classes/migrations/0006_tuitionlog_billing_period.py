@@ -0,0 +1,62 @@
+# Generated by Django 5.2.8 on 2026-10-17 00:58
+
+import datetime
+import re
+
+from django.db import migrations, models
+
+
+def parse_billing_period(month_text, charge_date):
+    """'11월 수강료' 같은 텍스트와 청구일로 청구 기준월(1일)을 추정합니다."""
+    match = re.search(r'(\d{1,2})\s*월', month_text or '')
+    if not match or not 1 <= int(match.group(1)) <= 12:
+        return charge_date.replace(day=1)
+
+    month = int(match.group(1))
+    year = charge_date.year
+    # 연말/연초 경계 보정 (예: 12월 말에 청구한 '1월 수강료' -> 다음 해 1월)
+    if month - charge_date.month > 6:
+        year -= 1
+    elif charge_date.month - month > 6:
+        year += 1
+    return datetime.date(year, month, 1)
+
+
+def backfill_billing_period(apps, schema_editor):
+    TuitionLog = apps.get_model('classes', 'TuitionLog')
+
+    seen = set()
+    to_update = []
+    logs = TuitionLog.objects.order_by('pk').only('pk', 'student_id', 'class_info_id', 'month', 'charge_date')
+    for log in logs.iterator(chunk_size=1000):
+        period = parse_billing_period(log.month, log.charge_date)
+        key = (log.student_id, log.class_info_id, period)
+        # 같은 달 중복 청구건은 가장 먼저 생성된 건만 기준월을 갖고 나머지는 NULL 로 둡니다.
+        if key in seen:
+            continue
+        seen.add(key)
+        log.billing_period = period
+        to_update.append(log)
+
+    TuitionLog.objects.bulk_update(to_update, ['billing_period'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('classes', '0005_alter_dailyspecialstatus_unique_together_and_more'),
+        ('students', '0003_student_status'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='tuitionlog',
+            name='billing_period',
+            field=models.DateField(blank=True, db_index=True, null=True, verbose_name='청구 기준월'),
+        ),
+        migrations.RunPython(backfill_billing_period, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='tuitionlog',
+            constraint=models.UniqueConstraint(fields=('student', 'class_info', 'billing_period'), name='unique_tuition_billing_period'),
+        ),
+    ]
@@ -6,6 +6,24 @@ from students.models import Student
 from django.utils import timezone
 
 
+# 요일 이름 (date.weekday() 순서: 월=0 ... 일=6)
+WEEKDAY_NAMES = ['월', '화', '수', '목', '금', '토', '일']
+
+
+def parse_schedule_slots(schedule):
+    """
+    수업 시간 문자열을 요일별 시간 목록으로 변환합니다.
+    예: "월-14,월-15,수-10" -> {'월': [14, 15], '수': [10]}
+    형식이 잘못되면 ValueError 를 발생시킵니다.
+    """
+    slots = {}
+    for item in (schedule or '').split(','):
+        if '-' in item:
+            day, hour = item.split('-')
+            slots.setdefault(day.strip(), []).append(int(hour))
+    return slots
+
+
 class ClassInfo(models.Model):
     """수업(강좌) 정보 모델"""
     name = models.CharField(max_length=100, verbose_name="수업명")
@@ -36,21 +54,15 @@ class ClassInfo(models.Model):
             return "-"
 
         # 1. 데이터 파싱 (예: "월-14,월-15,수-10" -> {'월': [14, 15], '수': [10]})
-        slots = {}
         try:
-            for item in self.schedule.split(','):
-                if '-' in item:
-                    day, hour = item.split('-')
-                    if day not in slots: slots[day] = []
-                    slots[day].append(int(hour))
-        except:
+            slots = parse_schedule_slots(self.schedule)
+        except ValueError:
             return self.schedule  # 파싱 에러 시 원본 반환
 
         # 2. 요일 순서대로 정렬 및 시간대 병합
-        days_order = ['월', '화', '수', '목', '금', '토', '일']
         result_parts = []
 
-        for day in days_order:
+        for day in WEEKDAY_NAMES:
             if day in slots:
                 hours = sorted(slots[day])
                 if not hours: continue
@@ -76,6 +88,14 @@ class ClassInfo(models.Model):
 
         return " / ".join(result_parts)
 
+    def get_weekdays(self):
+        """수업이 있는 요일 집합 (월=0 ... 일=6). 형식이 잘못된 일정은 빈 집합"""
+        try:
+            slots = parse_schedule_slots(self.schedule)
+        except ValueError:
+            return set()
+        return {WEEKDAY_NAMES.index(day) for day in slots if day in WEEKDAY_NAMES}
+
     def __str__(self):
         return self.name
 
@@ -85,6 +105,11 @@ class ClassInfo(models.Model):
         ordering = ['-is_active', 'name']
 
 
+def billing_period_of(date):
+    """청구 기준월(해당 월 1일)을 반환합니다. 예: 2026-11-17 -> 2026-11-01"""
+    return date.replace(day=1)
+
+
 # 수강료 청구/납부 기록 모델
 class TuitionLog(models.Model):
     student = models.ForeignKey(Student, on_delete=models.CASCADE, related_name='tuition_logs', verbose_name="학생")
@@ -93,6 +118,8 @@ class TuitionLog(models.Model):
     charge_date = models.DateField(default=timezone.now, verbose_name="청구일")
     amount = models.PositiveIntegerField(verbose_name="청구 금액")
     month = models.CharField(max_length=20, verbose_name="해당 월", blank=True)  # 예: "11월 수강료"
+    # 청구 기준월 (해당 월 1일). 정기/수강신청 청구의 중복 방지 및 월별 조회용
+    billing_period = models.DateField(blank=True, null=True, db_index=True, verbose_name="청구 기준월")
 
     is_paid = models.BooleanField(default=False, verbose_name="납부 여부")
     payment_date = models.DateField(blank=True, null=True, verbose_name="납부일")
@@ -106,4 +133,11 @@ class TuitionLog(models.Model):
         verbose_name = "수강료 내역"
         verbose_name_plural = "수강료 내역"
         ordering = ['-charge_date']
+        constraints = [
+            # 같은 학생/수업/청구월에는 청구서가 하나만 존재 (NULL 은 중복 허용)
+            models.UniqueConstraint(
+                fields=['student', 'class_info', 'billing_period'],
+                name='unique_tuition_billing_period',
+            ),
+        ]
 
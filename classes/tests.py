@@ -1,3 +1,82 @@
+import datetime
+from unittest import mock
+
 from django.test import TestCase
+from django.urls import reverse
+
+from students.models import Student
+from .billing import run_monthly_billing
+from .models import ClassInfo, TuitionLog
+
+
+class MonthlyBillingTests(TestCase):
+    def setUp(self):
+        self.class_info = ClassInfo.objects.create(name='중등 영어', tuition_fee=200000)
+        self.students = [
+            Student.objects.create(name=f'학생{i}', grade='K8', gender='M') for i in range(3)
+        ]
+        self.class_info.students.add(*self.students)
+        self.charge_date = datetime.date(2026, 10, 1)
+
+    def unpaid(self):
+        return list(Student.objects.order_by('pk').values_list('unpaid_amount', flat=True))
+
+    def test_rerun_does_not_charge_twice(self):
+        first = run_monthly_billing(self.charge_date)
+        second = run_monthly_billing(self.charge_date)
+
+        self.assertEqual(first['charged'], 3)
+        self.assertEqual(second, {'charged': 0, 'students': 0, 'amount': 0})
+        self.assertEqual(TuitionLog.objects.count(), 3)
+        self.assertEqual(self.unpaid(), [200000] * 3)
+
+    def test_logs_created_concurrently_are_not_added_to_unpaid(self):
+        # 이미 청구된 건을 조회한 뒤 다른 요청이 먼저 한 학생의 청구서를 만든 상황
+        TuitionLog.objects.create(
+            student=self.students[0], class_info=self.class_info, amount=200000,
+            charge_date=self.charge_date, month='10월 수강료', billing_period=self.charge_date,
+        )
+        with mock.patch('classes.billing.charged_pairs', return_value=set()):
+            result = run_monthly_billing(self.charge_date)
+
+        self.assertEqual(result['charged'], 2)
+        self.assertEqual(result['amount'], 400000)
+        self.assertEqual(TuitionLog.objects.count(), 3)
+        self.assertEqual(self.unpaid(), [0, 200000, 200000])
+
+
+class TuitionChargeTests(TestCase):
+    def setUp(self):
+        self.class_info = ClassInfo.objects.create(name='중등 수학', tuition_fee=150000)
+        self.student = Student.objects.create(name='홍길동', grade='K8', gender='F')
+        self.url = reverse('tuition_charge', args=[self.student.pk, self.class_info.pk])
+
+    def unpaid(self):
+        self.student.refresh_from_db()
+        return self.student.unpaid_amount
+
+    def test_second_charge_in_same_period_is_skipped(self):
+        self.client.post(self.url)
+        response = self.client.post(self.url, follow=True)
+
+        self.assertEqual(TuitionLog.objects.count(), 1)
+        self.assertEqual(self.unpaid(), 150000)
+        self.assertIn('이미 청구', ' '.join(str(m) for m in response.context['messages']))
+
+    def test_duplicate_insert_race_is_reported_not_raised(self):
+        self.client.post(self.url)
+        # 중복 확인을 통과한 뒤 유니크 키에 걸리는 경우
+        with mock.patch('classes.views.TuitionLog.objects.filter') as existing:
+            existing.return_value.exists.return_value = False
+            self.client.post(self.url)
+
+        self.assertEqual(TuitionLog.objects.count(), 1)
+        self.assertEqual(self.unpaid(), 150000)
+
+    def test_extra_charge_is_recorded_without_period(self):
+        self.client.post(self.url)
+        self.client.post(self.url, {'extra': '1'})
 
-# Create your tests here.
+        self.assertEqual(TuitionLog.objects.count(), 2)
+        self.assertEqual(TuitionLog.objects.filter(billing_period__isnull=True, memo='추가 청구').count(), 1)
+        self.assertEqual(self.unpaid(), 300000)
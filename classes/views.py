@@ -1,11 +1,13 @@
 # classes/views.py
 
 from django.shortcuts import render, redirect, get_object_or_404
-from .models import ClassInfo, TuitionLog
+from .models import ClassInfo, TuitionLog, billing_period_of
 from .forms import ClassForm, ClassDropForm
+from .billing import run_monthly_billing
 from django.utils import timezone
 from django.contrib import messages
-from django.db import transaction
+from django.db import transaction, IntegrityError
+from django.db.models import F
 from students.models import Student
 import calendar
 
@@ -52,6 +54,7 @@ def class_create(request):
                             amount=charge_amount,
                             charge_date=enroll_date,
                             month=f"{enroll_date.month}월 수강료",
+                            billing_period=billing_period_of(enroll_date),
                             memo=memo_text
                         )
                         student.unpaid_amount += charge_amount
@@ -95,8 +98,16 @@ def class_update(request, pk):
                     to_add = new_students - old_students
                     to_remove = old_students - new_students
 
+                    # 같은 청구월에 이미 청구서가 있는 학생(재등록 등)은 다시 청구하지 않음
+                    period = billing_period_of(enroll_date)
+                    already_charged = set(TuitionLog.objects.filter(
+                        class_info=updated_class, billing_period=period, student__in=to_add
+                    ).values_list('student_id', flat=True))
+
                     # [추가된 학생] -> enroll_date 기준으로 청구
                     for student in to_add:
+                        if student.pk in already_charged:
+                            continue
                         if enroll_date.day == 1:
                             charge_amount = updated_class.tuition_fee
                             memo_text = f"{enroll_date.month}월 수강신청"
@@ -112,6 +123,7 @@ def class_update(request, pk):
                             amount=charge_amount,
                             charge_date=enroll_date,
                             month=f"{enroll_date.month}월 수강료",
+                            billing_period=period,
                             memo=memo_text
                         )
                         student.unpaid_amount += charge_amount
@@ -199,11 +211,25 @@ def student_class_drop(request, student_pk, class_pk):
 
 
 def tuition_charge(request, student_pk, class_pk):
-    """개별 수강료 청구"""
+    """
+    개별 수강료 청구
+    같은 달 정기 수강료는 (학생, 수업, 청구월) 유니크 키로 한 번만 청구됩니다.
+    같은 달에 일부러 한 번 더 청구하려면 extra=1 로 요청하면 청구월 없이 '추가 청구' 로 기록합니다.
+    """
     student = get_object_or_404(Student, pk=student_pk)
     class_obj = get_object_or_404(ClassInfo, pk=class_pk)
 
     if request.method == 'POST':
+        today = timezone.localtime(timezone.now()).date()
+        is_extra = request.POST.get('extra') == '1'
+        period = None if is_extra else billing_period_of(today)
+
+        # 이번 달 수강료가 이미 청구되어 있으면 중복 청구하지 않음
+        if period and TuitionLog.objects.filter(student=student, class_info=class_obj, billing_period=period).exists():
+            messages.warning(request, f"'{class_obj.name}' {today.month}월 수강료는 이미 청구되어 있습니다. "
+                                      f"한 번 더 청구하려면 추가 청구를 이용해 주세요.")
+            return redirect('student_detail', pk=student_pk)
+
         try:
             with transaction.atomic():
                 # 1. 수강료 기록 생성
@@ -211,13 +237,17 @@ def tuition_charge(request, student_pk, class_pk):
                     student=student,
                     class_info=class_obj,
                     amount=class_obj.tuition_fee,
-                    charge_date=timezone.localtime(timezone.now()).date(),
-                    month=f"{timezone.localtime(timezone.now()).month}월 수강료"
+                    charge_date=today,
+                    month=f"{today.month}월 수강료",
+                    billing_period=period,
+                    memo="추가 청구" if is_extra else None,
                 )
-                # 2. 학생 미납금 증가
-                student.unpaid_amount += class_obj.tuition_fee
-                student.save()
+                # 2. 학생 미납금 증가 (동시 요청에도 값이 유실되지 않도록 F() 로 갱신)
+                Student.objects.filter(pk=student.pk).update(unpaid_amount=F('unpaid_amount') + class_obj.tuition_fee)
                 messages.success(request, f"'{class_obj.name}' 수강료가 청구되었습니다.")
+        except IntegrityError:
+            # 확인 직후 일괄 청구 등 다른 요청이 먼저 같은 달 청구서를 만든 경우
+            messages.warning(request, f"'{class_obj.name}' {today.month}월 수강료는 이미 청구되어 있습니다.")
         except Exception as e:
             messages.error(request, f"오류 발생: {e}")
 
@@ -250,24 +280,10 @@ def tuition_settle(request, log_pk):
 def monthly_batch_charge(request):
     if request.method == 'POST':
         today = timezone.localtime(timezone.now()).date()
-        target_month = f"{today.month}월 수강료"
-        count = 0
         try:
-            with transaction.atomic():
-                active_classes = ClassInfo.objects.filter(is_active=True)
-                for class_obj in active_classes:
-                    for student in class_obj.students.all():
-                        if not TuitionLog.objects.filter(student=student, class_info=class_obj,
-                                                         month=target_month).exists():
-                            TuitionLog.objects.create(
-                                student=student, class_info=class_obj, amount=class_obj.tuition_fee,
-                                charge_date=today, month=target_month, memo="정기 일괄 청구"
-                            )
-                            student.unpaid_amount += class_obj.tuition_fee
-                            student.save()
-                            count += 1
-            messages.success(request, f"총 {count}건의 수강료가 일괄 청구되었습니다.")
+            # 집합 단위 청구 엔진 사용 (수강생 수와 무관하게 쿼리 수 일정)
+            result = run_monthly_billing(today)
+            messages.success(request, f"총 {result['charged']}건의 수강료가 일괄 청구되었습니다.")
         except Exception as e:
             messages.error(request, f"오류: {e}")
     return redirect('dashboard')
-
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.8 on 2026-10-17 03:10
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DataVersion',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.CharField(max_length=100, unique=True, verbose_name='키')),
+                ('version', models.PositiveIntegerField(default=0, verbose_name='버전')),
+                ('updated_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='수정 시각')),
+            ],
+            options={
+                'verbose_name': '데이터 버전',
+                'verbose_name_plural': '데이터 버전',
+            },
+        ),
+    ]
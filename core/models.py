@@ -1,3 +1,48 @@
-from django.db import models
+from django.db import models, transaction
+from django.db.models import F
+from django.utils import timezone
 
-# Create your models here.
+
+class DataVersion(models.Model):
+    """
+    데이터 묶음별 변경 버전 (캐시 키/ETag/Last-Modified 기준).
+    캐시는 프로세스(워커)마다 따로 있으므로 무효화 기준을 DB 에 두어 모든 워커가 같은 버전을 보게 합니다.
+    예: 'teachers', 'payroll:2026', 'students'
+    """
+    key = models.CharField(max_length=100, unique=True, verbose_name="키")
+    version = models.PositiveIntegerField(default=0, verbose_name="버전")
+    updated_at = models.DateTimeField(default=timezone.now, verbose_name="수정 시각")
+
+    @classmethod
+    def bump(cls, *keys):
+        """버전을 1 올리고 수정 시각을 갱신합니다. (없으면 생성, 호출한 트랜잭션과 함께 커밋/롤백)"""
+        keys = set(keys)
+        if not keys:
+            return
+        now = timezone.now()
+        with transaction.atomic():
+            cls.objects.bulk_create([cls(key=key) for key in keys], ignore_conflicts=True)
+            cls.objects.filter(key__in=keys).update(version=F('version') + 1, updated_at=now)
+
+    @classmethod
+    def versions(cls, *keys):
+        """{키: 버전} (기록이 없는 키는 0) - 쿼리 1회"""
+        found = dict(cls.objects.filter(key__in=keys).values_list('key', 'version'))
+        return {key: found.get(key, 0) for key in keys}
+
+    @classmethod
+    def last_modified(cls, key):
+        """최종 수정 시각 (기록이 없으면 지금 시각으로 만들어 두어 모든 워커가 같은 값을 쓰게 함)"""
+        modified = cls.objects.filter(key=key).values_list('updated_at', flat=True).first()
+        if modified is None:
+            cls.objects.bulk_create([cls(key=key, updated_at=timezone.now().replace(microsecond=0))],
+                                    ignore_conflicts=True)
+            modified = cls.objects.filter(key=key).values_list('updated_at', flat=True).first()
+        return modified
+
+    def __str__(self):
+        return f"{self.key} (v{self.version})"
+
+    class Meta:
+        verbose_name = "데이터 버전"
+        verbose_name_plural = "데이터 버전"
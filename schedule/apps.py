@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class ScheduleConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'schedule'
+
+    def ready(self):
+        # 스케줄 리비전/ETag 갱신, 실시간 전달, 가동률 캐시 무효화용 시그널 수신기 등록
+        from . import month_data, live, utilization  # noqa: F401
@@ -0,0 +1,163 @@
+# schedule/attendance.py
+
+import datetime
+import logging
+from collections import defaultdict
+from functools import reduce
+from operator import or_
+from django.db import connection, transaction
+from django.db.models import Count, ExpressionWrapper, F, FloatField, Q, Sum
+from django.db.models.functions import NullIf, TruncMonth
+from teachers.payroll import month_bounds
+from .models import DailySchedule, DailyLog, StudentMonthlyAttendance
+
+
+logger = logging.getLogger(__name__)
+
+
+def month_range(start_month, end_month):
+    """start_month ~ end_month (각 월 1일) 사이의 월 목록"""
+    months = []
+    month = start_month.replace(day=1)
+    while month <= end_month:
+        months.append(month)
+        month = month_bounds(month.year, month.month)[1]
+    return months
+
+
+def _in_months(field, months):
+    return reduce(or_, (
+        Q(**{f'{field}__gte': first_day, f'{field}__lt': next_first_day})
+        for first_day, next_first_day in (month_bounds(m.year, m.month) for m in months)
+    ))
+
+
+def _grouped_counts(through, date_field, months, student_ids=None, distinct_days=False):
+    """M2M 중간 테이블에서 (학생, 월)별 일수를 그룹 쿼리 1회로 셉니다."""
+    rows = through.objects.filter(_in_months(date_field, months))
+    if student_ids is not None:
+        rows = rows.filter(student_id__in=student_ids)
+    return (
+        rows.annotate(month=TruncMonth(date_field))
+        .values('student_id', 'month')
+        .annotate(days=Count(date_field, distinct=distinct_days))
+        .order_by()
+    )
+
+
+def rebuild_monthly_attendance(months, student_ids=None):
+    """
+    해당 월들의 학생별 출결 집계를 다시 계산합니다. (중간 테이블당 그룹 쿼리 1회)
+    student_ids 를 주면 그 학생들의 행만 다시 계산하고, 없으면 월 전체를 계산합니다. (야간 명령)
+
+    예정일수 = 배정일 + 결석일 + 예외일 (스케줄표에서 한 학생은 하루에 한 칸에만 들어가므로 서로 겹치지 않음)
+    집계 행은 (학생, 월) 유니크 키로 upsert 하므로 같은 학생을 동시에 다시 계산해도 충돌하지 않습니다.
+    :return: 생성/갱신된 집계 행 수
+    """
+    months = sorted({month.replace(day=1) for month in months})
+    if student_ids is not None:
+        student_ids = sorted(set(student_ids))
+    if not months or student_ids == []:
+        return 0
+
+    # (학생, 월) -> [예정, 결석, 지각, 예외]
+    counts = defaultdict(lambda: [0, 0, 0, 0])
+    for row in _grouped_counts(DailySchedule.assigned_students.through, 'dailyschedule__date', months,
+                               student_ids, distinct_days=True):
+        counts[(row['student_id'], row['month'])][0] += row['days']
+    for idx, field in ((1, 'absent_students'), (2, 'late_students'), (3, 'exception_students')):
+        for row in _grouped_counts(getattr(DailyLog, field).through, 'dailylog__date', months, student_ids):
+            key = (row['student_id'], row['month'])
+            counts[key][idx] += row['days']
+            if idx != 2:
+                counts[key][0] += row['days']
+
+    upsert_options = {
+        'update_conflicts': True,
+        'update_fields': ['scheduled_days', 'absent_days', 'late_days', 'exception_days'],
+    }
+    # PostgreSQL/SQLite 는 충돌 기준 컬럼 지정 필요 (MySQL/MariaDB 는 유니크 키로 자동 판단)
+    if connection.features.supports_update_conflicts_with_target:
+        upsert_options['unique_fields'] = ['student', 'month']
+
+    existing = StudentMonthlyAttendance.objects.filter(month__in=months)
+    if student_ids is not None:
+        existing = existing.filter(student_id__in=student_ids)
+
+    with transaction.atomic():
+        # 더 이상 기록이 없는 (학생, 월) 행만 삭제
+        stale = [
+            pk for pk, student_id, month in existing.values_list('pk', 'student_id', 'month')
+            if (student_id, month) not in counts
+        ]
+        for i in range(0, len(stale), 900):
+            StudentMonthlyAttendance.objects.filter(pk__in=stale[i:i + 900]).delete()
+        return len(StudentMonthlyAttendance.objects.bulk_create([
+            StudentMonthlyAttendance(
+                student_id=student_id, month=month, scheduled_days=scheduled,
+                absent_days=absent, late_days=late, exception_days=exception,
+            )
+            for (student_id, month), (scheduled, absent, late, exception) in counts.items()
+        ], batch_size=500, **upsert_options))
+
+
+def _rebuild_after_commit(months, student_ids):
+    """
+    커밋 뒤 실행되는 집계 재계산.
+    스케줄 저장은 이미 커밋되었으므로 여기서 실패해도 요청을 오류로 끝내지 않고 기록만 남깁니다.
+    (집계는 매일 밤 rebuild_attendance 로 다시 맞춰짐)
+    """
+    try:
+        rebuild_monthly_attendance(months, student_ids)
+    except Exception:
+        logger.exception("출결 집계 재계산 실패: %s (학생 %d명)",
+                         ', '.join(f'{month:%Y-%m}' for month in sorted(months)), len(student_ids))
+
+
+def schedule_attendance_rebuild(dates, student_ids):
+    """
+    저장이 커밋된 뒤 바뀐 칸에 들어가거나 빠진 학생들의 해당 월 출결 집계를 다시 계산하도록 예약합니다.
+    (월 전체 재계산은 야간 rebuild_attendance 명령이 담당)
+    """
+    months = {date.replace(day=1) for date in dates}
+    student_ids = set(student_ids)
+    if months and student_ids:
+        transaction.on_commit(lambda: _rebuild_after_commit(months, student_ids))
+
+
+def attendance_report(start_month, end_month, status=None, descending=False):
+    """
+    기간 내 학생별 출결 합계와 출석률을 집계 테이블에서 쿼리 1회로 가져옵니다.
+
+    출석률(%) = (예정 - 결석 - 예외) / (예정 - 예외) * 100  (예외일은 분모에서 제외)
+    """
+    attended = F('scheduled') - F('absent') - F('exception')
+    rate = ExpressionWrapper(attended * 100.0 / NullIf(F('scheduled') - F('exception'), 0),
+                             output_field=FloatField())
+
+    rows = StudentMonthlyAttendance.objects.filter(month__gte=start_month, month__lte=end_month)
+    if status:
+        rows = rows.filter(student__status=status)
+
+    order = F('rate').desc(nulls_last=True) if descending else F('rate').asc(nulls_last=True)
+    return list(
+        rows.values('student_id', 'student__name', 'student__grade', 'student__status')
+        .annotate(
+            scheduled=Sum('scheduled_days'),
+            absent=Sum('absent_days'),
+            late=Sum('late_days'),
+            exception=Sum('exception_days'),
+        )
+        .annotate(rate=rate)
+        .order_by(order, 'student__name')
+    )
+
+
+def default_report_range(today=None):
+    """기본 조회 기간: 최근 3개월 (2개월 전 ~ 이번 달)"""
+    today = today or datetime.date.today()
+    end_month = today.replace(day=1)
+    start_month = end_month
+    for _ in range(2):
+        start_month = (start_month - datetime.timedelta(days=1)).replace(day=1)
+    return start_month, end_month
@@ -0,0 +1,145 @@
+# schedule/autofill.py
+
+import calendar
+import datetime
+import heapq
+from collections import defaultdict
+from classes.models import ClassInfo
+from teachers.models import Teacher, TeacherUnavailable
+from teachers.payroll import month_bounds
+from .models import DailySchedule, DailyLog
+
+
+def _load_month(year, month):
+    """자동 배정에 필요한 데이터를 테이블당 쿼리 1회로 읽습니다."""
+    first_day, next_first_day = month_bounds(year, month)
+
+    # 재직 교사 (열 순서) + 일일 정원
+    teachers = list(Teacher.objects.filter(status='ACTIVE').order_by('name').values_list('pk', 'daily_capacity'))
+
+    # 진행 중인 수업: 요일, 기간, 담당 교사
+    classes = {
+        info.pk: info
+        for info in ClassInfo.objects.filter(is_active=True)
+        .only('pk', 'teacher_id', 'schedule', 'start_date', 'end_date')
+    }
+
+    # 수업별 재원생
+    enrolled = defaultdict(list)
+    for class_id, student_id in ClassInfo.students.through.objects.filter(
+        classinfo_id__in=classes, student__status='ATTENDING'
+    ).order_by('student__name').values_list('classinfo_id', 'student_id'):
+        enrolled[class_id].append(student_id)
+
+    off = set(TeacherUnavailable.objects.filter(
+        date__gte=first_day, date__lt=next_first_day
+    ).values_list('date', 'teacher_id'))
+
+    # 이미 입력된 배정/결석/예외 (해당 학생은 그날 배정 완료로 간주)
+    existing = defaultdict(dict)      # date -> {student_id: teacher_id}
+    for date, teacher_id, student_id in DailySchedule.assigned_students.through.objects.filter(
+        dailyschedule__date__gte=first_day, dailyschedule__date__lt=next_first_day
+    ).values_list('dailyschedule__date', 'dailyschedule__teacher_id', 'student_id'):
+        existing[date][student_id] = teacher_id
+    placed_elsewhere = defaultdict(set)
+    for field in ('absent_students', 'exception_students'):
+        for date, student_id in getattr(DailyLog, field).through.objects.filter(
+            dailylog__date__gte=first_day, dailylog__date__lt=next_first_day
+        ).values_list('dailylog__date', 'student_id'):
+            placed_elsewhere[date].add(student_id)
+
+    return teachers, classes, enrolled, off, existing, placed_elsewhere
+
+
+def _day_class_map(classes, enrolled, dates):
+    """
+    날짜 -> {학생: [선호 교사, ...]} (수업 요일/기간 기준, 같은 날 여러 수업이면 수업 순서대로)
+    요일별로 한 번만 계산하고 기간이 있는 수업만 날짜별로 걸러냅니다.
+    """
+    by_weekday = defaultdict(list)
+    for info in classes.values():
+        if not enrolled.get(info.pk):
+            continue
+        for weekday in info.get_weekdays():
+            by_weekday[weekday].append(info)
+
+    day_map = {}
+    for date in dates:
+        wants = {}
+        for info in by_weekday.get(date.weekday(), []):
+            if (info.start_date and date < info.start_date) or (info.end_date and date > info.end_date):
+                continue
+            for student_id in enrolled[info.pk]:
+                preferred = wants.setdefault(student_id, [])
+                if info.teacher_id and info.teacher_id not in preferred:
+                    preferred.append(info.teacher_id)
+        day_map[date] = wants
+    return day_map
+
+
+def build_month_draft(year, month):
+    """
+    월간 자동 배정 초안 (DB 에 저장하지 않음).
+
+    날짜마다
+    1. 이미 입력된 배정/결석/예외 학생은 건너뛰고, 기존 배정 인원을 교사 부하로 반영
+    2. 수업 담당 교사가 근무 가능하고 정원이 남아 있으면 그 교사에게 배정
+    3. 담당 교사가 휴무이거나 정원이 찼으면 그날 가장 적게 맡은 교사(동률이면 이번 달 누적이 적은 교사)에게 배정
+    4. 남는 자리가 없으면 미배정으로 보고
+
+    :return: {'draft': {'YYYY-MM-DD': {teacher_id: [student_id, ...]}},
+              'unplaced': [{'date', 'student_id'}], 'substituted': 대체 배정 수, 'assigned': 배정 수}
+    """
+    _, last_day = calendar.monthrange(year, month)
+    dates = [datetime.date(year, month, day) for day in range(1, last_day + 1)]
+    teachers, classes, enrolled, off, existing, placed_elsewhere = _load_month(year, month)
+    capacity = {teacher_id: cap or None for teacher_id, cap in teachers}
+    day_map = _day_class_map(classes, enrolled, dates)
+
+    month_load = defaultdict(int)
+    draft = {}
+    unplaced = []
+    assigned = substituted = 0
+
+    for date in dates:
+        available = [teacher_id for teacher_id, _ in teachers if (date, teacher_id) not in off]
+        load = defaultdict(int)
+        for teacher_id in existing[date].values():
+            load[teacher_id] += 1
+
+        def has_room(teacher_id):
+            return capacity[teacher_id] is None or load[teacher_id] < capacity[teacher_id]
+
+        cells = defaultdict(list)
+        overflow = []
+        for student_id, preferred in day_map[date].items():
+            if student_id in existing[date] or student_id in placed_elsewhere[date]:
+                continue
+            teacher_id = next((t for t in preferred if t in capacity and (date, t) not in off and has_room(t)), None)
+            if teacher_id is None:
+                overflow.append(student_id)
+                continue
+            cells[teacher_id].append(student_id)
+            load[teacher_id] += 1
+
+        # 담당 교사가 휴무/정원 초과/미지정인 학생은 부하가 가장 적은 근무 교사에게 (힙으로 최소 부하 교사 선택)
+        heap = [(load[t], month_load[t], idx, t) for idx, t in enumerate(available) if has_room(t)]
+        heapq.heapify(heap)
+        for student_id in overflow:
+            if not heap:
+                unplaced.append({'date': date.isoformat(), 'student_id': student_id})
+                continue
+            _, _, idx, teacher_id = heapq.heappop(heap)
+            cells[teacher_id].append(student_id)
+            load[teacher_id] += 1
+            substituted += 1
+            if has_room(teacher_id):
+                heapq.heappush(heap, (load[teacher_id], month_load[teacher_id], idx, teacher_id))
+
+        for teacher_id, student_ids in cells.items():
+            month_load[teacher_id] += len(student_ids)
+            assigned += len(student_ids)
+        if cells:
+            draft[date.isoformat()] = dict(cells)
+
+    return {'draft': draft, 'unplaced': unplaced, 'assigned': assigned, 'substituted': substituted}
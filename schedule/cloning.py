@@ -0,0 +1,143 @@
+# schedule/cloning.py
+
+import datetime
+from collections import defaultdict
+from django.db import transaction
+from django.db.models import F
+from teachers.models import TeacherUnavailable
+from teachers.signals import unavailable_changed
+from .models import DailySchedule, DailyLog, ScheduleRevision
+from .attendance import schedule_attendance_rebuild
+
+
+COPIED_OFF_DAY_REASON = '스케줄 복사'
+
+
+def date_range(start, end):
+    return [start + datetime.timedelta(days=i) for i in range((end - start).days + 1)]
+
+
+def weekday_alignment(source_dates, target_dates):
+    """
+    대상 날짜 -> 원본 날짜 (요일 정렬).
+    대상 기간에서 n 번째 월요일은 원본 기간의 n 번째 월요일에 대응하며,
+    원본에 n 번째가 없으면 마지막 같은 요일을 씁니다. (원본이 한 주면 매주 같은 주를 복사)
+    """
+    by_weekday = defaultdict(list)
+    for date in sorted(source_dates):
+        by_weekday[date.weekday()].append(date)
+
+    mapping = {}
+    seen = defaultdict(int)
+    for date in sorted(target_dates):
+        candidates = by_weekday.get(date.weekday())
+        nth = seen[date.weekday()]
+        seen[date.weekday()] += 1
+        if candidates:
+            mapping[date] = candidates[min(nth, len(candidates) - 1)]
+    return mapping
+
+
+def copy_schedule(source_start, source_end, target_start, target_end):
+    """
+    원본 기간의 배정 학생과 교사 휴무를 요일 기준으로 대상 기간에 복사합니다.
+    - 재원(ATTENDING) 학생, 재직(ACTIVE) 교사만 복사
+    - 대상 칸이 비어 있을 때만 채우고, 그날 이미 다른 칸(배정/결석/예외)에 있는 학생은 건너뜀
+    - 대상 날짜에 휴무인 교사 칸에는 학생을 넣지 않음
+    읽기 쿼리 몇 번과 테이블별 bulk INSERT 로 처리합니다.
+
+    :return: {'cells', 'students', 'off_days'} - 새로 채운 칸/학생/휴무 수
+    """
+    alignment = weekday_alignment(date_range(source_start, source_end), date_range(target_start, target_end))
+    if not alignment:
+        return {'cells': 0, 'students': 0, 'off_days': 0}
+    targets_of = defaultdict(list)
+    for target, source in alignment.items():
+        targets_of[source].append(target)
+    target_dates = list(alignment)
+
+    through = DailySchedule.assigned_students.through
+
+    with transaction.atomic():
+        # 1. 원본 (재원 학생 / 재직 교사만)
+        source_cells = defaultdict(list)     # (원본 날짜, 교사) -> [학생]
+        for date, teacher_id, student_id in through.objects.filter(
+            dailyschedule__date__gte=source_start, dailyschedule__date__lte=source_end,
+            dailyschedule__teacher__status='ACTIVE', student__status='ATTENDING',
+        ).order_by('student__name').values_list('dailyschedule__date', 'dailyschedule__teacher_id', 'student_id'):
+            source_cells[(date, teacher_id)].append(student_id)
+        source_off = set(TeacherUnavailable.objects.filter(
+            date__gte=source_start, date__lte=source_end, teacher__status='ACTIVE',
+        ).values_list('date', 'teacher_id'))
+
+        # 2. 대상 기간의 현재 상태
+        filled_cells = set()
+        placed = defaultdict(set)             # 날짜 -> 이미 들어가 있는 학생
+        for date, teacher_id, student_id in through.objects.filter(
+            dailyschedule__date__in=target_dates,
+        ).values_list('dailyschedule__date', 'dailyschedule__teacher_id', 'student_id'):
+            filled_cells.add((date, teacher_id))
+            placed[date].add(student_id)
+        for field in ('absent_students', 'exception_students'):
+            for date, student_id in getattr(DailyLog, field).through.objects.filter(
+                dailylog__date__in=target_dates,
+            ).values_list('dailylog__date', 'student_id'):
+                placed[date].add(student_id)
+        target_off = set(TeacherUnavailable.objects.filter(
+            date__in=target_dates).values_list('date', 'teacher_id'))
+
+        # 3. 복사할 휴무 / 배정 계산
+        new_off = [
+            TeacherUnavailable(date=target, teacher_id=teacher_id, reason=COPIED_OFF_DAY_REASON)
+            for source, teacher_id in source_off
+            for target in targets_of[source]
+            if (target, teacher_id) not in target_off
+        ]
+        off_after = target_off | {(item.date, item.teacher_id) for item in new_off}
+
+        new_cells = {}                        # (대상 날짜, 교사) -> [학생]
+        for (source, teacher_id), student_ids in source_cells.items():
+            for target in targets_of[source]:
+                key = (target, teacher_id)
+                if key in filled_cells or key in off_after:
+                    continue
+                students = [pk for pk in student_ids if pk not in placed[target]]
+                if students:
+                    new_cells[key] = students
+                    placed[target].update(students)
+
+        # 4. bulk INSERT (칸 -> 중간 테이블 -> 휴무)
+        if new_cells:
+            DailySchedule.objects.bulk_create(
+                [DailySchedule(date=date, teacher_id=teacher_id) for date, teacher_id in new_cells],
+                batch_size=500, ignore_conflicts=True,
+            )
+            schedule_ids = {
+                (date, teacher_id): pk
+                for pk, date, teacher_id in DailySchedule.objects.filter(date__in=target_dates)
+                .values_list('pk', 'date', 'teacher_id')
+            }
+            through.objects.bulk_create([
+                through(dailyschedule_id=schedule_ids[key], student_id=student_id)
+                for key, student_ids in new_cells.items()
+                for student_id in student_ids
+            ], batch_size=1000, ignore_conflicts=True)
+            # 편집 중인 다른 화면이 덮어쓰지 않도록 셀 버전 증가
+            DailySchedule.objects.filter(
+                pk__in=[schedule_ids[key] for key in new_cells]
+            ).update(version=F('version') + 1)
+
+        TeacherUnavailable.objects.bulk_create(new_off, batch_size=500)
+
+        changed_dates = {date for date, _ in new_cells} | {item.date for item in new_off}
+        if new_off:
+            # bulk_create 는 save() 를 거치지 않으므로 직접 알림
+            unavailable_changed.send(sender=TeacherUnavailable, dates=sorted({item.date for item in new_off}))
+        ScheduleRevision.bump(changed_dates)
+        schedule_attendance_rebuild(changed_dates, {pk for student_ids in new_cells.values() for pk in student_ids})
+
+    return {
+        'cells': len(new_cells),
+        'students': sum(len(student_ids) for student_ids in new_cells.values()),
+        'off_days': len(new_off),
+    }
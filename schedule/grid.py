@@ -0,0 +1,393 @@
+# schedule/grid.py
+
+import datetime
+from collections import defaultdict
+from django.db import transaction
+from django.db.models import F
+from teachers.models import Teacher, TeacherUnavailable
+from teachers.signals import unavailable_changed
+from students.models import Student
+from .models import DailySchedule, DailyLog, ScheduleRevision
+from .attendance import schedule_attendance_rebuild
+
+
+# 그리드의 근태 열 이름 -> DailyLog M2M 필드
+LOG_FIELDS = {
+    'absent': 'absent_students',
+    'late': 'late_students',
+    'exception': 'exception_students',
+}
+
+OFF_DAY_REASON = '스케줄표에서 설정'
+
+
+def split_names(text):
+    """'홍길동, 김철수' -> ['홍길동', '김철수'] (공백 제거, 중복 제거, 순서 유지)"""
+    names = []
+    for name in (text or '').split(','):
+        name = name.strip()
+        if name and name not in names:
+            names.append(name)
+    return names
+
+
+class StudentNameIndex:
+    """요청당 한 번 만드는 학생 이름 -> ID 색인 (쿼리 1회)"""
+
+    def __init__(self):
+        self.by_name = defaultdict(list)
+        self.names = {}
+        for pk, name, status in Student.objects.values_list('pk', 'name', 'status'):
+            self.by_name[name.strip()].append((pk, status))
+            self.names[pk] = name
+
+    def resolve(self, name, attending_only=False, current_ids=()):
+        """
+        이름을 학생 ID 로 변환합니다.
+        재원생을 우선하며, 동명이인이면 현재 셀에 이미 배정된 학생을 우선합니다.
+
+        :return: (student_id, None) 또는 (None, 'not_found' | 'ambiguous')
+        """
+        candidates = self.by_name.get(name, [])
+        attending = [pk for pk, status in candidates if status == 'ATTENDING']
+        pool = attending if (attending_only or attending) else [pk for pk, _ in candidates]
+
+        if not pool:
+            return None, 'not_found'
+        if len(pool) == 1:
+            return pool[0], None
+
+        kept = [pk for pk in pool if pk in current_ids]
+        if len(kept) == 1:
+            return kept[0], None
+        return None, 'ambiguous'
+
+
+class GridState:
+    """저장 대상 날짜들의 현재 배정/휴무/근태 상태 (테이블당 쿼리 1회)"""
+
+    def __init__(self, dates, teacher_ids):
+        self.dates = dates
+
+        # (날짜, 교사) -> DailySchedule ID
+        self.schedules = {
+            (date, teacher_id): pk
+            for pk, date, teacher_id in DailySchedule.objects.filter(date__in=dates)
+            .values_list('pk', 'date', 'teacher_id')
+        }
+        # DailySchedule ID -> {학생 ID: 중간 테이블 행 ID}
+        self.assigned = defaultdict(dict)
+        for pk, schedule_id, student_id in DailySchedule.assigned_students.through.objects.filter(
+            dailyschedule__date__in=dates
+        ).values_list('pk', 'dailyschedule_id', 'student_id'):
+            self.assigned[schedule_id][student_id] = pk
+
+        # (날짜, 교사) -> [TeacherUnavailable ID]
+        self.off_days = defaultdict(list)
+        for pk, date, teacher_id in TeacherUnavailable.objects.filter(
+            date__in=dates, teacher_id__in=teacher_ids
+        ).values_list('pk', 'date', 'teacher_id'):
+            self.off_days[(date, teacher_id)].append(pk)
+
+        # 날짜 -> DailyLog
+        self.logs = {log.date: log for log in DailyLog.objects.filter(date__in=dates).only('pk', 'date', 'remarks')}
+        # 근태 필드 -> {DailyLog ID: {학생 ID: 중간 테이블 행 ID}}
+        self.log_members = {}
+        for field in LOG_FIELDS.values():
+            members = defaultdict(dict)
+            for pk, log_id, student_id in getattr(DailyLog, field).through.objects.filter(
+                dailylog__date__in=dates
+            ).values_list('pk', 'dailylog_id', 'student_id'):
+                members[log_id][student_id] = pk
+            self.log_members[field] = members
+
+    def cell_student_ids(self, date, teacher_id):
+        schedule_id = self.schedules.get((date, teacher_id))
+        return set(self.assigned.get(schedule_id, {})) if schedule_id else set()
+
+    def log_student_ids(self, date, field):
+        log = self.logs.get(date)
+        return set(self.log_members[field].get(log.pk, {})) if log else set()
+
+
+class M2MDiff:
+    """M2M 중간 테이블에 추가/삭제할 행을 모았다가 한 번에 반영"""
+
+    def __init__(self, through, owner_field):
+        self.through = through
+        self.owner_field = owner_field
+        self.to_add = []        # (owner 키, 학생 ID) - owner 키는 저장 후 ID 로 변환
+        self.to_delete = []     # 중간 테이블 행 ID
+        self.student_ids = set()  # 들어가거나 빠진 학생 (출결 집계 재계산 대상)
+
+    def apply(self, owner_ids):
+        if self.to_delete:
+            self.through.objects.filter(pk__in=self.to_delete).delete()
+        if self.to_add:
+            self.through.objects.bulk_create([
+                self.through(**{f'{self.owner_field}_id': owner_ids[key], 'student_id': student_id})
+                for key, student_id in self.to_add
+            ], batch_size=500)
+
+
+def _diff_members(diff, key, current, desired):
+    """current: {학생 ID: 행 ID}, desired: 학생 ID 집합 -> 바뀐 게 있으면 True"""
+    removed = [row_id for student_id, row_id in current.items() if student_id not in desired]
+    added = [student_id for student_id in desired if student_id not in current]
+    diff.to_delete.extend(removed)
+    diff.to_add.extend((key, student_id) for student_id in added)
+    diff.student_ids.update(added)
+    diff.student_ids.update(student_id for student_id in current if student_id not in desired)
+    return bool(removed or added)
+
+
+def _resolve_names(index, names, attending_only, current_ids, date, column, unresolved):
+    ids = []
+    for name in names:
+        student_id, problem = index.resolve(name, attending_only=attending_only, current_ids=current_ids)
+        if problem:
+            unresolved.append({'date': date.isoformat(), 'column': column, 'name': name, 'reason': problem})
+        elif student_id not in ids:
+            ids.append(student_id)
+    return set(ids)
+
+
+def _write_cells(state, index, teacher_names, cells, log_rows, unresolved):
+    """
+    셀 단위 변경을 현재 상태와 비교해 바뀐 부분만 반영하고 버전을 올립니다.
+
+    :param cells: {(date, teacher_id): {'text': '이름, 이름', 'is_off': bool}}
+    :param log_rows: {date: {'absent': '...', 'late': '...', 'exception': '...', 'remarks': '...'}}
+    :return: (바뀐 교사 셀 키 집합, 바뀐 근태 날짜 집합)
+    """
+    dates = state.dates
+    schedule_diff = M2MDiff(DailySchedule.assigned_students.through, 'dailyschedule')
+    new_schedules = []
+    off_to_create = []
+    off_to_delete = []
+    log_diffs = {field: M2MDiff(getattr(DailyLog, field).through, 'dailylog') for field in LOG_FIELDS.values()}
+    new_logs = []
+    logs_to_update = []
+    changed_cells = set()
+    changed_logs = set()
+
+    # 1. 교사별 배정 / 휴무
+    for key, cell in cells.items():
+        date, teacher_id = key
+        current_ids = state.cell_student_ids(date, teacher_id)
+        desired = _resolve_names(index, split_names(cell.get('text', '')), True, current_ids,
+                                 date, teacher_names[teacher_id], unresolved)
+
+        schedule_id = state.schedules.get(key)
+        current = state.assigned.get(schedule_id, {}) if schedule_id else {}
+        cell_changed = _diff_members(schedule_diff, key, current, desired)
+
+        is_off = bool(cell.get('is_off', False))
+        off_ids = state.off_days.get(key, [])
+        if is_off and not off_ids:
+            off_to_create.append(TeacherUnavailable(date=date, teacher_id=teacher_id, reason=OFF_DAY_REASON))
+            cell_changed = True
+        elif not is_off and off_ids:
+            off_to_delete.extend(off_ids)
+            cell_changed = True
+
+        if cell_changed:
+            changed_cells.add(key)
+            # 휴무만 바뀐 셀도 버전을 관리하기 위해 빈 DailySchedule 을 만듭니다.
+            if schedule_id is None:
+                new_schedules.append(DailySchedule(date=date, teacher_id=teacher_id))
+
+    # 2. 근태 로그
+    for date, logs_data in log_rows.items():
+        log = state.logs.get(date)
+        remarks = logs_data.get('remarks', '') or ''
+        desired_members = {}
+        for column, field in LOG_FIELDS.items():
+            current_ids = state.log_student_ids(date, field)
+            desired_members[field] = _resolve_names(index, split_names(logs_data.get(column, '')), False,
+                                                    current_ids, date, column, unresolved)
+
+        if log is None:
+            if not remarks and not any(desired_members.values()):
+                continue
+            new_logs.append(DailyLog(date=date, remarks=remarks))
+        elif log.remarks != remarks:
+            log.remarks = remarks
+            logs_to_update.append(log)
+
+        log_changed = log is None or log in logs_to_update
+        for field, desired in desired_members.items():
+            current = state.log_members[field].get(log.pk, {}) if log else {}
+            if _diff_members(log_diffs[field], date, current, desired):
+                log_changed = True
+        if log_changed:
+            changed_logs.add(date)
+
+    # 3. 새 DailySchedule / DailyLog 생성 후 ID 확보
+    schedule_ids = dict(state.schedules)
+    if new_schedules:
+        DailySchedule.objects.bulk_create(new_schedules, batch_size=500)
+        schedule_ids.update({
+            (date, teacher_id): pk
+            for pk, date, teacher_id in DailySchedule.objects.filter(date__in=dates)
+            .values_list('pk', 'date', 'teacher_id')
+        })
+    log_ids = {date: log.pk for date, log in state.logs.items()}
+    if new_logs:
+        DailyLog.objects.bulk_create(new_logs, batch_size=500)
+        log_ids.update(DailyLog.objects.filter(date__in=dates).values_list('date', 'pk'))
+
+    # 4. 바뀐 셀만 반영하고 버전 증가
+    schedule_diff.apply(schedule_ids)
+    for diff in log_diffs.values():
+        diff.apply(log_ids)
+    if logs_to_update:
+        DailyLog.objects.bulk_update(logs_to_update, ['remarks'], batch_size=500)
+
+    if changed_cells:
+        DailySchedule.objects.filter(
+            pk__in=[schedule_ids[key] for key in changed_cells]
+        ).update(version=F('version') + 1)
+    if changed_logs:
+        DailyLog.objects.filter(pk__in=[log_ids[date] for date in changed_logs]).update(version=F('version') + 1)
+
+    if off_to_create or off_to_delete:
+        TeacherUnavailable.objects.filter(pk__in=off_to_delete).delete()
+        TeacherUnavailable.objects.bulk_create(off_to_create, batch_size=500)
+        off_dates = {item.date for item in off_to_create} | {
+            date for (date, _), ids in state.off_days.items() if set(ids) & set(off_to_delete)
+        }
+        # bulk 경로는 모델 save/delete 를 거치지 않으므로 직접 알림
+        unavailable_changed.send(sender=TeacherUnavailable, dates=sorted(off_dates))
+
+    changed_dates = {date for date, _ in changed_cells} | changed_logs
+    ScheduleRevision.bump(changed_dates)
+    changed_students = schedule_diff.student_ids.union(*(diff.student_ids for diff in log_diffs.values()))
+    schedule_attendance_rebuild(changed_dates, changed_students)
+    return changed_cells, changed_logs
+
+
+def _teacher_names(teacher_ids):
+    return dict(Teacher.objects.filter(pk__in=teacher_ids).values_list('pk', 'name'))
+
+
+def save_month_grid(rows):
+    """
+    월간 스케줄 그리드 전체 저장.
+    제출된 그리드를 현재 DB 상태와 비교해 바뀐 셀만 bulk insert/delete 로 반영합니다.
+
+    :param rows: [{'date': 'YYYY-MM-DD',
+                   'teachers': {teacher_id: {'text': '이름, 이름', 'is_off': bool}},
+                   'logs': {'absent': '...', 'late': '...', 'exception': '...', 'remarks': '...'}}, ...]
+    :return: {'changed': 바뀐 셀 수, 'changed_dates': [날짜, ...],
+              'unresolved': [{'date', 'column', 'name', 'reason'}, ...]}
+    """
+    cells = {}
+    log_rows = {}
+    for row in rows:
+        date = datetime.date.fromisoformat(row.get('date'))
+        for t_id, cell in (row.get('teachers') or {}).items():
+            cells[(date, int(t_id))] = cell
+        log_rows[date] = row.get('logs') or {}
+
+    index = StudentNameIndex()
+    teacher_names = _teacher_names({teacher_id for _, teacher_id in cells})
+    cells = {key: cell for key, cell in cells.items() if key[1] in teacher_names}
+    unresolved = []
+
+    with transaction.atomic():
+        state = GridState(list(log_rows), set(teacher_names))
+        changed_cells, changed_logs = _write_cells(state, index, teacher_names, cells, log_rows, unresolved)
+
+    return {
+        'changed': len(changed_cells) + len(changed_logs),
+        'changed_dates': sorted({date for date, _ in changed_cells} | changed_logs),
+        'unresolved': unresolved,
+    }
+
+
+def _cell_value(state, index, key):
+    date, teacher_id = key
+    names = sorted(index.names.get(pk, '') for pk in state.cell_student_ids(date, teacher_id))
+    return {'text': ', '.join(names), 'is_off': bool(state.off_days.get(key))}
+
+
+def _log_value(state, index, date):
+    log = state.logs.get(date)
+    value = {'remarks': log.remarks if log else ''}
+    for column, field in LOG_FIELDS.items():
+        names = sorted(index.names.get(pk, '') for pk in state.log_student_ids(date, field))
+        value[column] = ', '.join(names)
+    return value
+
+
+def apply_grid_changes(changes):
+    """
+    셀 단위 변경 저장 (낙관적 버전 관리).
+    클라이언트가 마지막으로 본 버전과 DB 버전이 같은 셀만 반영하고,
+    다른 사용자가 먼저 바꾼 셀은 현재 값과 함께 충돌로 돌려줍니다.
+
+    :param changes: [{'date': 'YYYY-MM-DD', 'teacher': id, 'text': '...', 'is_off': bool, 'version': n},
+                     {'date': 'YYYY-MM-DD', 'log': {'absent', 'late', 'exception', 'remarks'}, 'version': n}, ...]
+    :return: {'applied': [...], 'conflicts': [...], 'unresolved': [...]}
+             applied/conflicts 항목은 요청과 같은 모양이며 서버의 현재 version 을 담습니다.
+    """
+    cell_changes = {}
+    log_changes = {}
+    for change in changes:
+        date = datetime.date.fromisoformat(change.get('date'))
+        version = int(change.get('version') or 0)
+        if 'log' in change:
+            log_changes[date] = (change.get('log') or {}, version)
+        else:
+            cell = {'text': change.get('text', ''), 'is_off': change.get('is_off', False)}
+            cell_changes[(date, int(change.get('teacher')))] = (cell, version)
+
+    index = StudentNameIndex()
+    teacher_names = _teacher_names({teacher_id for _, teacher_id in cell_changes})
+    cell_changes = {key: value for key, value in cell_changes.items() if key[1] in teacher_names}
+    dates = sorted({date for date, _ in cell_changes} | set(log_changes))
+    unresolved = []
+
+    with transaction.atomic():
+        # 1. 버전을 비교할 행을 먼저 만들어 두고(이미 있으면 무시) 잠금 - 동시 저장은 여기서 순서가 정해짐
+        DailySchedule.objects.bulk_create(
+            [DailySchedule(date=date, teacher_id=teacher_id) for date, teacher_id in cell_changes],
+            batch_size=500, ignore_conflicts=True,
+        )
+        DailyLog.objects.bulk_create([DailyLog(date=date) for date in log_changes], batch_size=500,
+                                     ignore_conflicts=True)
+        cell_versions = {
+            (date, teacher_id): version
+            for date, teacher_id, version in DailySchedule.objects.select_for_update()
+            .filter(date__in=dates, teacher_id__in=teacher_names).values_list('date', 'teacher_id', 'version')
+        }
+        log_versions = dict(
+            DailyLog.objects.select_for_update().filter(date__in=log_changes).values_list('date', 'version')
+        )
+        state = GridState(dates, set(teacher_names))
+
+        # 2. 버전이 맞는 셀만 반영
+        cells = {key: cell for key, (cell, version) in cell_changes.items() if cell_versions[key] == version}
+        log_rows = {date: log for date, (log, version) in log_changes.items() if log_versions[date] == version}
+        changed_cells, changed_logs = _write_cells(state, index, teacher_names, cells, log_rows, unresolved)
+
+    applied = []
+    conflicts = []
+    for key in cell_changes:
+        date, teacher_id = key
+        if key in cells:
+            version = cell_versions[key] + (1 if key in changed_cells else 0)
+            applied.append({'date': date.isoformat(), 'teacher': teacher_id, 'version': version})
+        else:
+            conflicts.append({'date': date.isoformat(), 'teacher': teacher_id, 'version': cell_versions[key],
+                              **_cell_value(state, index, key)})
+    for date in log_changes:
+        if date in log_rows:
+            version = log_versions[date] + (1 if date in changed_logs else 0)
+            applied.append({'date': date.isoformat(), 'log': True, 'version': version})
+        else:
+            conflicts.append({'date': date.isoformat(), 'log': _log_value(state, index, date),
+                              'version': log_versions[date]})
+
+    return {'applied': applied, 'conflicts': conflicts, 'unresolved': unresolved}
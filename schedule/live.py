@@ -0,0 +1,165 @@
+# schedule/live.py
+
+import asyncio
+import threading
+from collections import defaultdict
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.dispatch import receiver
+from django.utils.module_loading import import_string
+from teachers.payroll import month_bounds
+from .models import ScheduleRevision
+from .month_data import day_snapshot
+from .signals import schedule_changed
+
+
+# 구독자 한 명이 밀린 이벤트를 이만큼 넘게 쌓으면 전체 다시 읽기(resync)를 요청
+QUEUE_SIZE = 100
+
+
+def _group_by_month(dates):
+    months = defaultdict(list)
+    for date in dates:
+        months[(date.year, date.month)].append(date)
+    return months
+
+
+class InProcessBroker:
+    """
+    단일 프로세스용 pub/sub.
+    저장 요청(동기 코드, 다른 스레드)에서 publish 하면 각 SSE 연결의 이벤트 루프로 안전하게 넘겨줍니다.
+    워커가 여러 개면 다른 워커의 구독자에게는 전달되지 않으므로 DatabasePollingBroker 를 사용하세요.
+    """
+
+    def __init__(self):
+        self._subscribers = defaultdict(set)   # (year, month) -> {(loop, queue), ...}
+        self._lock = threading.Lock()
+
+    def notify(self, dates):
+        """바뀐 날짜를 월별로 나눠, 구독자가 있는 달만 현재 값을 읽어 전달합니다."""
+        for key, month_dates in _group_by_month(dates).items():
+            with self._lock:
+                targets = list(self._subscribers.get(key, ()))
+            if not targets:
+                continue
+            event = {'type': 'cells', **day_snapshot(month_dates)}
+            for loop, queue in targets:
+                loop.call_soon_threadsafe(self._offer, queue, event)
+
+    @staticmethod
+    def _offer(queue, event):
+        try:
+            queue.put_nowait(event)
+        except asyncio.QueueFull:
+            # 너무 밀린 연결은 비우고 전체 다시 읽기 요청
+            while not queue.empty():
+                queue.get_nowait()
+            queue.put_nowait({'type': 'resync'})
+
+    async def subscribe(self, year, month):
+        return InProcessSubscription(self, (year, month), asyncio.get_running_loop())
+
+    def _add(self, key, entry):
+        with self._lock:
+            self._subscribers[key].add(entry)
+
+    def _remove(self, key, entry):
+        with self._lock:
+            self._subscribers[key].discard(entry)
+            if not self._subscribers[key]:
+                del self._subscribers[key]
+
+
+class InProcessSubscription:
+    def __init__(self, broker, key, loop):
+        self.broker = broker
+        self.key = key
+        self.queue = asyncio.Queue(maxsize=QUEUE_SIZE)
+        self.entry = (loop, self.queue)
+        broker._add(key, self.entry)
+
+    async def next_event(self, timeout):
+        """다음 이벤트 (timeout 초 안에 없으면 None)"""
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    def close(self):
+        self.broker._remove(self.key, self.entry)
+
+
+class DatabasePollingBroker:
+    """
+    다중 워커용 백엔드.
+    저장 시 이미 갱신되는 ScheduleRevision(날짜별 리비전)을 각 연결이 주기적으로 읽어
+    리비전이 바뀐 날짜의 현재 값을 내보냅니다. (별도 메시지 서버 불필요)
+    """
+
+    def __init__(self):
+        self.interval = getattr(settings, 'SCHEDULE_EVENTS_POLL_INTERVAL', 2)
+
+    def notify(self, dates):
+        # 리비전 테이블 자체가 전달 수단이므로 할 일 없음
+        pass
+
+    async def subscribe(self, year, month):
+        subscription = PollingSubscription(self, year, month)
+        subscription.revisions = await sync_to_async(subscription.read_revisions)()
+        return subscription
+
+
+class PollingSubscription:
+    def __init__(self, broker, year, month):
+        self.broker = broker
+        self.bounds = month_bounds(year, month)
+        self.revisions = {}
+
+    def read_revisions(self):
+        first_day, next_first_day = self.bounds
+        return dict(ScheduleRevision.objects.filter(
+            date__gte=first_day, date__lt=next_first_day
+        ).values_list('date', 'revision'))
+
+    def _poll(self):
+        revisions = self.read_revisions()
+        changed = [date for date, revision in revisions.items() if self.revisions.get(date) != revision]
+        self.revisions = revisions
+        return {'type': 'cells', **day_snapshot(changed)} if changed else None
+
+    async def next_event(self, timeout):
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        while True:
+            event = await sync_to_async(self._poll)()
+            if event is not None:
+                return event
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                return None
+            await asyncio.sleep(min(self.broker.interval, remaining))
+
+    def close(self):
+        pass
+
+
+_broker = None
+_broker_lock = threading.Lock()
+
+
+def get_broker():
+    """settings.SCHEDULE_EVENTS_BROKER 에 지정된 백엔드 (기본: 프로세스 내 pub/sub)"""
+    global _broker
+    if _broker is None:
+        with _broker_lock:
+            if _broker is None:
+                path = getattr(settings, 'SCHEDULE_EVENTS_BROKER', 'schedule.live.InProcessBroker')
+                _broker = import_string(path)()
+    return _broker
+
+
+@receiver(schedule_changed)
+def push_schedule_changes(sender, dates, **kwargs):
+    """스케줄 변경이 커밋되면 열려 있는 그리드로 전달합니다. (실시간 반영이 꺼져 있으면 아무것도 하지 않음)"""
+    if settings.SCHEDULE_LIVE_UPDATES:
+        get_broker().notify(dates)
@@ -0,0 +1,37 @@
+# schedule/management/commands/rebuild_attendance.py
+
+import datetime
+from django.core.management.base import BaseCommand
+from django.db.models import Min
+from schedule.attendance import month_range, rebuild_monthly_attendance
+from schedule.models import DailySchedule, DailyLog
+
+
+class Command(BaseCommand):
+    help = "학생별 월간 출결 집계를 다시 계산합니다. (매일 밤 cron 으로 실행)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--months', type=int, default=2, help="이번 달부터 거슬러 올라갈 개월 수 (기본: 2)")
+        parser.add_argument('--all', action='store_true', help="기록이 있는 모든 월을 다시 계산")
+
+    def handle(self, *args, **options):
+        end_month = datetime.date.today().replace(day=1)
+
+        if options['all']:
+            firsts = [
+                DailySchedule.objects.aggregate(first=Min('date'))['first'],
+                DailyLog.objects.aggregate(first=Min('date'))['first'],
+            ]
+            firsts = [first for first in firsts if first]
+            start_month = min(firsts).replace(day=1) if firsts else end_month
+        else:
+            start_month = end_month
+            for _ in range(max(options['months'], 1) - 1):
+                start_month = (start_month - datetime.timedelta(days=1)).replace(day=1)
+
+        months = month_range(start_month, end_month)
+        rows = rebuild_monthly_attendance(months)
+
+        self.stdout.write(self.style.SUCCESS(
+            f"{start_month:%Y-%m} ~ {end_month:%Y-%m} ({len(months)}개월) 출결 집계 {rows}건을 생성했습니다."
+        ))
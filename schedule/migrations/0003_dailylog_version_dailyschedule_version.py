@@ -0,0 +1,23 @@
+# Generated by Django 5.2.8 on 2026-10-17 01:07
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('schedule', '0002_remove_dailyschedule_is_day_off'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='dailylog',
+            name='version',
+            field=models.PositiveIntegerField(default=0, verbose_name='버전'),
+        ),
+        migrations.AddField(
+            model_name='dailyschedule',
+            name='version',
+            field=models.PositiveIntegerField(default=0, verbose_name='버전'),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.8 on 2026-10-17 02:10
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('schedule', '0003_dailylog_version_dailyschedule_version'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ScheduleRevision',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField(unique=True, verbose_name='날짜')),
+                ('revision', models.PositiveIntegerField(default=0, verbose_name='리비전')),
+                ('updated_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='수정 시각')),
+            ],
+        ),
+    ]
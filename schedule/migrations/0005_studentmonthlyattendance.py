@@ -0,0 +1,34 @@
+# Generated by Django 5.2.8 on 2026-10-17 02:40
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('schedule', '0004_schedulerevision'),
+        ('students', '0003_student_status'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StudentMonthlyAttendance',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('month', models.DateField(verbose_name='월 (1일)')),
+                ('scheduled_days', models.PositiveIntegerField(default=0, verbose_name='예정일수')),
+                ('absent_days', models.PositiveIntegerField(default=0, verbose_name='결석일수')),
+                ('late_days', models.PositiveIntegerField(default=0, verbose_name='지각일수')),
+                ('exception_days', models.PositiveIntegerField(default=0, verbose_name='예외일수')),
+                ('student', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='monthly_attendance', to='students.student', verbose_name='학생')),
+            ],
+            options={
+                'verbose_name': '월간 출결 집계',
+                'verbose_name_plural': '월간 출결 집계',
+                'ordering': ['-month'],
+                'indexes': [models.Index(fields=['month', 'student'], name='attendance_month_student_idx')],
+                'unique_together': {('student', 'month')},
+            },
+        ),
+    ]
@@ -1,8 +1,34 @@
 # schedule/models.py
 
-from django.db import models
+from django.db import models, transaction
+from django.db.models import F
+from django.utils import timezone
 from teachers.models import Teacher
 from students.models import Student
+from .signals import schedule_changed
+
+
+class ScheduleRevision(models.Model):
+    """날짜별 스케줄 변경 기록 (월간 그리드 캐시/ETag 의 최종 수정 시각 기준)"""
+    date = models.DateField(unique=True, verbose_name="날짜")
+    revision = models.PositiveIntegerField(default=0, verbose_name="리비전")
+    updated_at = models.DateTimeField(default=timezone.now, verbose_name="수정 시각")
+
+    @classmethod
+    def bump(cls, dates):
+        """해당 날짜들의 리비전을 1 올리고 수정 시각을 갱신합니다. (없으면 생성)"""
+        dates = set(dates)
+        if not dates:
+            return
+        now = timezone.now()
+        with transaction.atomic():
+            cls.objects.bulk_create([cls(date=date) for date in dates], ignore_conflicts=True)
+            cls.objects.filter(date__in=dates).update(revision=F('revision') + 1, updated_at=now)
+        # 커밋된 뒤 열려 있는 그리드에 변경을 알림
+        transaction.on_commit(lambda: schedule_changed.send(sender=cls, dates=sorted(dates)))
+
+    def __str__(self):
+        return f"{self.date} (rev {self.revision})"
 
 
 class DailySchedule(models.Model):
@@ -13,6 +39,19 @@ class DailySchedule(models.Model):
     # 배정된 학생들
     assigned_students = models.ManyToManyField(Student, blank=True, related_name='daily_assigned', verbose_name="배정 학생")
 
+    # 셀(배정 학생 + 휴무) 변경 시마다 1씩 증가 - 동시 편집 충돌 감지용
+    version = models.PositiveIntegerField(default=0, verbose_name="버전")
+
+    def save(self, *args, **kwargs):
+        self.date = self._meta.get_field('date').to_python(self.date)
+        super().save(*args, **kwargs)
+        ScheduleRevision.bump([self.date])
+
+    def delete(self, *args, **kwargs):
+        result = super().delete(*args, **kwargs)
+        ScheduleRevision.bump([self.date])
+        return result
+
     class Meta:
         unique_together = ('date', 'teacher')  # 같은 날, 같은 교사 중복 방지
 
@@ -28,6 +67,39 @@ class DailyLog(models.Model):
     exception_students = models.ManyToManyField(Student, blank=True, related_name='daily_exception', verbose_name="예외생")
     remarks = models.TextField(blank=True, verbose_name="특이사항")
 
+    # 근태/특이사항 변경 시마다 1씩 증가 - 동시 편집 충돌 감지용
+    version = models.PositiveIntegerField(default=0, verbose_name="버전")
+
+    def save(self, *args, **kwargs):
+        self.date = self._meta.get_field('date').to_python(self.date)
+        super().save(*args, **kwargs)
+        ScheduleRevision.bump([self.date])
+
+    def delete(self, *args, **kwargs):
+        result = super().delete(*args, **kwargs)
+        ScheduleRevision.bump([self.date])
+        return result
+
     def __str__(self):
         return str(self.date)
 
+
+
+class StudentMonthlyAttendance(models.Model):
+    """학생별 월간 출결 집계 (DailySchedule/DailyLog 로부터 계산, 저장 시 + 매일 밤 재계산)"""
+    student = models.ForeignKey(Student, on_delete=models.CASCADE, related_name='monthly_attendance', verbose_name="학생")
+    month = models.DateField(verbose_name="월 (1일)")
+    scheduled_days = models.PositiveIntegerField(default=0, verbose_name="예정일수")
+    absent_days = models.PositiveIntegerField(default=0, verbose_name="결석일수")
+    late_days = models.PositiveIntegerField(default=0, verbose_name="지각일수")
+    exception_days = models.PositiveIntegerField(default=0, verbose_name="예외일수")
+
+    def __str__(self):
+        return f"{self.student.name} - {self.month:%Y-%m}"
+
+    class Meta:
+        unique_together = ('student', 'month')
+        indexes = [models.Index(fields=['month', 'student'], name='attendance_month_student_idx')]
+        verbose_name = "월간 출결 집계"
+        verbose_name_plural = "월간 출결 집계"
+        ordering = ['-month']
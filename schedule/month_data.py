@@ -0,0 +1,238 @@
+# schedule/month_data.py
+
+import calendar
+import datetime
+import hashlib
+import json
+from collections import defaultdict
+from django.core.cache import cache
+from django.db.models import Max
+from django.dispatch import receiver
+from django.template.loader import render_to_string
+from django.utils.safestring import mark_safe
+from teachers.models import Teacher, TeacherUnavailable
+from teachers.payroll import month_bounds
+from teachers.signals import unavailable_changed
+from students.models import Student
+from students.search import students_last_modified, students_version
+from .models import DailySchedule, DailyLog, ScheduleRevision
+from .grid import LOG_FIELDS
+
+
+# 렌더링된 일자 행 캐시 유지 시간 (날짜 리비전이 바뀌면 키가 달라지므로 내용이 틀려지지는 않음)
+ROW_CACHE_TIMEOUT = 60 * 60 * 24
+
+
+@receiver(unavailable_changed)
+def bump_unavailable_dates(sender, dates, **kwargs):
+    """교사 휴무가 바뀐 날짜의 스케줄 리비전을 올립니다."""
+    ScheduleRevision.bump(dates)
+
+
+def month_last_modified(year, month):
+    """해당 월 스케줄(배정/휴무/근태)과 학생 이름 사전 중 가장 최근 수정 시각 (쿼리 1회)"""
+    first_day, next_first_day = month_bounds(year, month)
+    schedule_modified = ScheduleRevision.objects.filter(
+        date__gte=first_day, date__lt=next_first_day
+    ).aggregate(modified=Max('updated_at'))['modified']
+    names_modified = students_last_modified()
+    return max(schedule_modified, names_modified) if schedule_modified else names_modified
+
+
+def active_teachers():
+    """그리드 열 순서 그대로의 재직 교사 [(id, 이름), ...]"""
+    return list(Teacher.objects.filter(status='ACTIVE').order_by('name').values_list('pk', 'name'))
+
+
+def month_grid_etag(year, month, teachers, last_modified):
+    payload = json.dumps([year, month, teachers, last_modified.isoformat()])
+    return hashlib.md5(payload.encode('utf-8')).hexdigest()
+
+
+def month_grid_payload(year, month, teachers):
+    """
+    월간 그리드를 압축된 배열 형태로 만듭니다. (테이블당 쿼리 1회)
+
+    - teachers: 교사 ID 목록 (열 순서), teacher_names: {id: 이름}
+    - cells[일-1][열] : 배정 학생 ID 목록, off[일-1][열] : 휴무 여부 (0/1)
+    - versions[일-1][열] / log_versions[일-1] : 셀 버전 (변경 저장 시 사용)
+    - logs: {'absent'|'late'|'exception': [일-1][학생 ID 목록], 'remarks': [일-1] 문자열}
+    - students: 위에 나온 학생 ID -> 이름
+    """
+    _, last_day = calendar.monthrange(year, month)
+    first_day, next_first_day = month_bounds(year, month)
+    in_month = {'date__gte': first_day, 'date__lt': next_first_day}
+    column = {teacher_id: idx for idx, (teacher_id, _) in enumerate(teachers)}
+
+    def matrix(fill):
+        return [[fill() for _ in teachers] for _ in range(last_day)]
+
+    cells = matrix(list)
+    off = matrix(int)
+    versions = matrix(int)
+    student_ids = set()
+
+    # 1. 배정 학생
+    for date, teacher_id, student_id in DailySchedule.assigned_students.through.objects.filter(
+        dailyschedule__date__gte=first_day, dailyschedule__date__lt=next_first_day,
+        dailyschedule__teacher_id__in=column,
+    ).order_by('student__name').values_list('dailyschedule__date', 'dailyschedule__teacher_id', 'student_id'):
+        cells[date.day - 1][column[teacher_id]].append(student_id)
+        student_ids.add(student_id)
+
+    # 2. 셀 버전 / 휴무
+    for date, teacher_id, version in DailySchedule.objects.filter(
+        teacher_id__in=column, **in_month
+    ).values_list('date', 'teacher_id', 'version'):
+        versions[date.day - 1][column[teacher_id]] = version
+    for date, teacher_id in TeacherUnavailable.objects.filter(
+        teacher_id__in=column, **in_month
+    ).values_list('date', 'teacher_id'):
+        off[date.day - 1][column[teacher_id]] = 1
+
+    # 3. 근태 로그
+    logs = {name: [[] for _ in range(last_day)] for name in LOG_FIELDS}
+    logs['remarks'] = [''] * last_day
+    log_versions = [0] * last_day
+    for date, remarks, version in DailyLog.objects.filter(**in_month).values_list('date', 'remarks', 'version'):
+        logs['remarks'][date.day - 1] = remarks
+        log_versions[date.day - 1] = version
+    for name, field in LOG_FIELDS.items():
+        for date, student_id in getattr(DailyLog, field).through.objects.filter(
+            dailylog__date__gte=first_day, dailylog__date__lt=next_first_day
+        ).order_by('student__name').values_list('dailylog__date', 'student_id'):
+            logs[name][date.day - 1].append(student_id)
+            student_ids.add(student_id)
+
+    # 4. 학생 이름 사전
+    students = dict(Student.objects.filter(pk__in=student_ids).values_list('pk', 'name'))
+
+    return {
+        'year': year,
+        'month': month,
+        'days': last_day,
+        'weekday_of_first': datetime.date(year, month, 1).weekday(),
+        'teachers': [teacher_id for teacher_id, _ in teachers],
+        'teacher_names': {str(teacher_id): name for teacher_id, name in teachers},
+        'cells': cells,
+        'off': off,
+        'versions': versions,
+        'logs': logs,
+        'log_versions': log_versions,
+        'students': {str(pk): name for pk, name in students.items()},
+    }
+
+
+def day_snapshot(dates, teacher_ids=None):
+    """
+    해당 날짜들의 현재 셀 값 (열린 그리드에 변경을 밀어줄 때 사용, 테이블당 쿼리 1회)
+
+    :return: {'cells': [{'date', 'teacher', 'text', 'is_off', 'version'}, ...],
+              'logs': [{'date', 'log': {'absent', 'late', 'exception', 'remarks'}, 'version'}, ...]}
+    """
+    if teacher_ids is None:
+        teacher_ids = [teacher_id for teacher_id, _ in active_teachers()]
+
+    names = defaultdict(list)
+    for date, teacher_id, name in DailySchedule.assigned_students.through.objects.filter(
+        dailyschedule__date__in=dates, dailyschedule__teacher_id__in=teacher_ids,
+    ).order_by('student__name').values_list('dailyschedule__date', 'dailyschedule__teacher_id', 'student__name'):
+        names[(date, teacher_id)].append(name)
+    versions = {
+        (date, teacher_id): version
+        for date, teacher_id, version in DailySchedule.objects.filter(
+            date__in=dates, teacher_id__in=teacher_ids
+        ).values_list('date', 'teacher_id', 'version')
+    }
+    off = set(TeacherUnavailable.objects.filter(
+        date__in=dates, teacher_id__in=teacher_ids).values_list('date', 'teacher_id'))
+
+    cells = [
+        {'date': date.isoformat(), 'teacher': teacher_id, 'text': ', '.join(names[(date, teacher_id)]),
+         'is_off': (date, teacher_id) in off, 'version': versions.get((date, teacher_id), 0)}
+        for date in sorted(dates) for teacher_id in teacher_ids
+    ]
+
+    logs = {date: {'log': {'remarks': ''}, 'version': 0} for date in dates}
+    for date, remarks, version in DailyLog.objects.filter(date__in=dates).values_list('date', 'remarks', 'version'):
+        logs[date] = {'log': {'remarks': remarks}, 'version': version}
+    for column, field in LOG_FIELDS.items():
+        members = defaultdict(list)
+        for date, name in getattr(DailyLog, field).through.objects.filter(
+            dailylog__date__in=dates
+        ).order_by('student__name').values_list('dailylog__date', 'student__name'):
+            members[date].append(name)
+        for date in dates:
+            logs[date]['log'][column] = ', '.join(members[date])
+
+    return {
+        'cells': cells,
+        'logs': [{'date': date.isoformat(), **value} for date, value in sorted(logs.items())],
+    }
+
+
+def build_day_rows(dates, teachers):
+    """일자별 그리드 행 데이터 (배정/근태/휴무를 해당 날짜들만 읽음)"""
+    schedules = DailySchedule.objects.filter(date__in=dates).prefetch_related('assigned_students')
+    schedule_map = {(s.date, s.teacher_id): s for s in schedules}
+    logs = DailyLog.objects.filter(date__in=dates).prefetch_related('absent_students', 'late_students',
+                                                                     'exception_students')
+    log_map = {l.date: l for l in logs}
+    unavailable_set = set(TeacherUnavailable.objects.filter(date__in=dates).values_list('date', 'teacher_id'))
+
+    rows = {}
+    for d in dates:
+        daily_log = log_map.get(d)
+        row = {'date': d, 'day_name': d.strftime('%a'), 'log': daily_log, 'teacher_cells': []}
+        row_sum = 0
+        for t in teachers:
+            sch = schedule_map.get((d, t.id))
+            student_list = list(sch.assigned_students.all()) if sch else []
+            row_sum += len(student_list)
+            row['teacher_cells'].append({
+                'teacher': t,
+                'schedule': sch,
+                'students': student_list,
+                'is_off': (d, t.id) in unavailable_set,
+            })
+        if daily_log:
+            row_sum += len(daily_log.absent_students.all())
+            row_sum += len(daily_log.exception_students.all())
+        row['total_count'] = row_sum
+        rows[d] = row
+    return rows
+
+
+def render_month_rows(year, month, teachers):
+    """
+    월간 그리드의 일자별 <tr> HTML 목록.
+    (날짜, 교사 열 구성, 날짜 리비전, 학생 이름 수정 시각) 단위로 캐시하므로
+    배정/근태/휴무가 바뀐 날짜만 다시 조회하고 렌더링합니다.
+    """
+    _, last_day = calendar.monthrange(year, month)
+    first_day, next_first_day = month_bounds(year, month)
+    dates = [datetime.date(year, month, day) for day in range(1, last_day + 1)]
+
+    # 1. 캐시 키: 리비전을 먼저 읽어야 렌더링 도중 저장된 변경이 예전 키로 남지 않음
+    revisions = dict(ScheduleRevision.objects.filter(
+        date__gte=first_day, date__lt=next_first_day
+    ).values_list('date', 'revision'))
+    columns = hashlib.md5(','.join(str(t.pk) for t in teachers).encode('utf-8')).hexdigest()[:12]
+    names_version = students_version()
+    keys = {
+        d: f"schedule:row:{d.isoformat()}:{columns}:{revisions.get(d, 0)}:{names_version}"
+        for d in dates
+    }
+
+    # 2. 캐시에 없는 날짜만 렌더링
+    cached = cache.get_many(keys.values())
+    missing = [d for d in dates if keys[d] not in cached]
+    if missing:
+        rendered = {
+            keys[d]: render_to_string('schedule/monthly_grid_row.html', {'date': d, 'row': row})
+            for d, row in build_day_rows(missing, teachers).items()
+        }
+        cache.set_many(rendered, ROW_CACHE_TIMEOUT)
+        cached.update(rendered)
+
+    return [mark_safe(cached[keys[d]]) for d in dates]
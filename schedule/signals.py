@@ -0,0 +1,8 @@
+# schedule/signals.py
+
+from django.dispatch import Signal
+
+
+# 스케줄(배정/휴무/근태)이 바뀐 날짜 알림 - 트랜잭션 커밋 후 발송
+# 인자: dates (datetime.date 리스트)
+schedule_changed = Signal()
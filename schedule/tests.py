@@ -1,3 +1,259 @@
-from django.test import TestCase
+import asyncio
+import contextlib
+import datetime
+import json
+from unittest import mock
 
-# Create your tests here.
+from asgiref.sync import sync_to_async
+from django.core.cache import cache
+from django.middleware.csrf import _get_new_csrf_string
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from students.models import Student
+from teachers.models import Teacher, TeacherUnavailable, TeacherWorkRecord
+from . import live
+from .attendance import rebuild_monthly_attendance, schedule_attendance_rebuild
+from .grid import save_month_grid
+from .models import DailySchedule, StudentMonthlyAttendance
+from .utilization import teacher_utilization
+
+
+def make_teacher(name):
+    return Teacher.objects.create(name=name, gender='F', phone='010-0000-0000',
+                                  bank_name='국민', account_number='000-000')
+
+
+class ScheduleCopyTests(TestCase):
+    def setUp(self):
+        self.teacher = make_teacher('김선생')
+        self.other = make_teacher('박선생')
+        self.kim = Student.objects.create(name='김학생', grade='K7', gender='M')
+        self.lee = Student.objects.create(name='이학생', grade='K7', gender='F')
+        # 원본 주: 2026-09-07(월) ~ 09-13(일)
+        monday = DailySchedule.objects.create(date=datetime.date(2026, 9, 7), teacher=self.teacher)
+        monday.assigned_students.add(self.kim, self.lee)
+        TeacherUnavailable.objects.create(teacher=self.other, date=datetime.date(2026, 9, 9))
+        self.url = reverse('copy_monthly_schedule')
+
+    def post(self, client, payload, **extra):
+        return client.post(self.url, json.dumps(payload), content_type='application/json', **extra)
+
+    def test_requires_csrf_token(self):
+        client = Client(enforce_csrf_checks=True)
+        payload = {'source': '2026-09-07', 'year': 2026, 'month': 10}
+        self.assertEqual(self.post(client, payload).status_code, 403)
+
+        token = _get_new_csrf_string()
+        client.cookies['csrftoken'] = token
+        response = self.post(client, payload, HTTP_X_CSRFTOKEN=token)
+        self.assertEqual(response.status_code, 200)
+
+    def test_copies_week_by_weekday_without_overwriting(self):
+        # 대상 월 첫 월요일(10-05) 칸은 이미 채워져 있음 -> 건너뜀
+        taken = DailySchedule.objects.create(date=datetime.date(2026, 10, 5), teacher=self.teacher)
+        taken.assigned_students.add(self.lee)
+
+        response = self.post(self.client, {'source': '2026-09-07', 'year': 2026, 'month': 10})
+        result = response.json()
+
+        mondays = [datetime.date(2026, 10, day) for day in (12, 19, 26)]
+        self.assertEqual(result['cells'], 3)
+        self.assertEqual(result['off_days'], 4)  # 10월 수요일 네 번
+        for date in mondays:
+            cell = DailySchedule.objects.get(date=date, teacher=self.teacher)
+            self.assertEqual(set(cell.assigned_students.all()), {self.kim, self.lee})
+        self.assertEqual(list(taken.assigned_students.all()), [self.lee])
+        self.assertTrue(TeacherUnavailable.objects.filter(teacher=self.other, date=datetime.date(2026, 10, 7)).exists())
+
+        # 다시 실행해도 이미 채운 칸은 그대로
+        again = self.post(self.client, {'source': '2026-09-07', 'year': 2026, 'month': 10}).json()
+        self.assertEqual((again['cells'], again['off_days']), (0, 0))
+
+    def test_rejects_bad_source(self):
+        response = self.post(self.client, {'source': '9월', 'year': 2026, 'month': 10})
+        self.assertEqual(response.status_code, 400)
+
+
+class MonthlyGridStudentsTests(TestCase):
+    def setUp(self):
+        self.teacher = make_teacher('김선생')
+        self.kim = Student.objects.create(name='김학생', grade='K7', gender='M')
+        Student.objects.create(name='다른재원생', grade='K7', gender='F')
+        cell = DailySchedule.objects.create(date=datetime.date(2026, 10, 5), teacher=self.teacher)
+        cell.assigned_students.add(self.kim)
+
+    def test_page_does_not_embed_student_list(self):
+        response = self.client.get(reverse('monthly_schedule'), {'year': 2026, 'month': 10})
+        self.assertNotIn('all_students', response.context)
+        self.assertNotContains(response, '다른재원생')
+        self.assertContains(response, reverse('monthly_schedule_data'))
+        self.assertContains(response, reverse('student_search_api'))
+
+    def test_data_endpoint_lists_month_students(self):
+        response = self.client.get(reverse('monthly_schedule_data'), {'year': 2026, 'month': 10})
+        self.assertEqual(response.json()['students'], {str(self.kim.pk): '김학생'})
+
+
+class ScheduleEventsTests(TestCase):
+    def setUp(self):
+        self.teacher = make_teacher('김선생')
+        self.url = reverse('monthly_schedule_events') + '?year=2026&month=10'
+        live._broker = None
+
+    def tearDown(self):
+        live._broker = None
+
+    def test_disabled_by_default(self):
+        self.assertEqual(self.client.get(self.url).status_code, 404)
+        page = self.client.get(reverse('monthly_schedule') + '?year=2026&month=10')
+        self.assertNotContains(page, 'new EventSource')
+
+    @override_settings(SCHEDULE_LIVE_UPDATES=True)
+    def test_grid_subscribes_when_enabled(self):
+        page = self.client.get(reverse('monthly_schedule') + '?year=2026&month=10')
+        self.assertContains(page, 'new EventSource')
+
+    @staticmethod
+    async def next_chunk(stream, skip_ping=True):
+        while True:
+            chunk = (await anext(stream)).decode('utf-8')
+            if not (skip_ping and chunk == ': ping\n\n'):
+                return chunk
+
+    @staticmethod
+    async def disconnect(stream):
+        """브라우저가 연결을 끊은 경우: ASGI 서버가 응답 전송 작업을 취소함"""
+        task = asyncio.ensure_future(anext(stream))
+        await asyncio.sleep(0)
+        task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await task
+
+    @staticmethod
+    def parse_event(chunk):
+        """'event: x\\ndata: {...}\\n\\n' -> (x, dict)"""
+        assert chunk.endswith('\n\n'), chunk
+        fields = dict(line.split(': ', 1) for line in chunk.rstrip('\n').split('\n'))
+        return fields['event'], json.loads(fields['data'])
+
+    @override_settings(SCHEDULE_LIVE_UPDATES=True)
+    @mock.patch('schedule.views.EVENT_HEARTBEAT_SECONDS', 0.01)
+    async def test_stream_framing(self):
+        response = await self.async_client.get(self.url)
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        stream = aiter(response.streaming_content)
+
+        # 재연결 간격 안내 -> 이벤트가 없으면 주석(ping)으로 연결 유지
+        self.assertEqual(await self.next_chunk(stream), 'retry: 3000\n\n')
+        self.assertEqual(await self.next_chunk(stream, skip_ping=False), ': ping\n\n')
+
+        date = datetime.date(2026, 10, 5)
+        await sync_to_async(TeacherUnavailable.objects.create)(teacher=self.teacher, date=date)
+        await sync_to_async(live.get_broker().notify)([date])
+
+        event, data = self.parse_event(await self.next_chunk(stream))
+        self.assertEqual(event, 'cells')
+        self.assertEqual(data['cells'], [{'date': '2026-10-05', 'teacher': self.teacher.pk, 'text': '',
+                                          'is_off': True, 'version': 0}])
+        await self.disconnect(stream)
+
+    @override_settings(SCHEDULE_LIVE_UPDATES=True)
+    @mock.patch('schedule.views.EVENT_HEARTBEAT_SECONDS', 0.01)
+    async def test_overflow_asks_for_resync_and_reconnect_resubscribes(self):
+        response = await self.async_client.get(self.url)
+        stream = aiter(response.streaming_content)
+        await self.next_chunk(stream)
+        broker = live.get_broker()
+
+        # 밀린 이벤트가 큐 크기를 넘으면 비우고 resync 하나만 남김
+        (_, queue), = broker._subscribers[(2026, 10)]
+        for _ in range(live.QUEUE_SIZE + 1):
+            broker._offer(queue, {'type': 'cells', 'cells': [], 'logs': []})
+        self.assertEqual(self.parse_event(await self.next_chunk(stream)), ('resync', {'type': 'resync'}))
+
+        # 연결이 끊기면 구독이 정리되고, 다시 연결하면 처음부터 새로 구독
+        await self.disconnect(stream)
+        self.assertNotIn((2026, 10), broker._subscribers)
+
+        response = await self.async_client.get(self.url)
+        stream = aiter(response.streaming_content)
+        self.assertEqual(await self.next_chunk(stream), 'retry: 3000\n\n')
+        self.assertEqual(len(broker._subscribers[(2026, 10)]), 1)
+        await self.disconnect(stream)
+
+
+class TeacherUtilizationTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.kim = make_teacher('김선생')
+        self.park = make_teacher('박선생')
+        student = Student.objects.create(name='김학생', grade='K7', gender='M')
+        for teacher in (self.kim, self.park):
+            cell = DailySchedule.objects.create(date=datetime.date(2026, 9, 7), teacher=teacher)
+            cell.assigned_students.add(student)
+            TeacherWorkRecord.objects.create(teacher=teacher, date=datetime.date(2026, 9, 7))
+        self.today = datetime.date(2026, 10, 17)
+
+    def test_teacher_deleted_after_month_was_cached(self):
+        start, end = datetime.date(2026, 9, 1), datetime.date(2026, 9, 30)
+        self.assertEqual(len(teacher_utilization(start, end, today=self.today)['teachers']), 2)
+
+        # 마감된 9월은 캐시에서 읽으므로 삭제된 교사의 일자 기록이 그대로 남아 있음
+        self.park.delete()
+        report = teacher_utilization(start, end, today=self.today)
+
+        self.assertEqual([row['teacher'] for row in report['teachers']], [self.kim])
+        self.assertEqual(report['teachers'][0]['student_hours'], 2.0)
+
+
+class AttendanceRebuildTests(TestCase):
+    def setUp(self):
+        self.teacher = make_teacher('김선생')
+        self.student = Student.objects.create(name='김학생', grade='K7', gender='M')
+
+    def save_cell(self):
+        cell = DailySchedule.objects.create(date=datetime.date(2026, 10, 5), teacher=self.teacher)
+        cell.assigned_students.add(self.student)
+        schedule_attendance_rebuild([cell.date], [self.student.pk])
+
+    def test_rebuilds_after_commit(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.save_cell()
+        row = StudentMonthlyAttendance.objects.get(student=self.student)
+        self.assertEqual((row.month, row.scheduled_days), (datetime.date(2026, 10, 1), 1))
+
+    def test_failure_after_commit_is_logged_not_raised(self):
+        with mock.patch('schedule.attendance.rebuild_monthly_attendance', side_effect=RuntimeError('db gone')), \
+                self.assertLogs('schedule.attendance', level='ERROR') as logs, \
+                self.captureOnCommitCallbacks(execute=True):
+            self.save_cell()
+        self.assertIn('2026-10', logs.output[0])
+        self.assertTrue(DailySchedule.objects.filter(date=datetime.date(2026, 10, 5)).exists())
+
+    def test_grid_save_rebuilds_only_changed_students(self):
+        other = Student.objects.create(name='이학생', grade='K7', gender='F')
+        date = datetime.date(2026, 10, 5)
+        cell = DailySchedule.objects.create(date=date, teacher=self.teacher)
+        cell.assigned_students.add(self.student, other)
+        rebuild_monthly_attendance([date])
+        # 다른 학생의 집계가 다시 계산되지 않았는지 확인하기 위해 값을 바꿔 둠
+        StudentMonthlyAttendance.objects.filter(student=other).update(late_days=7)
+
+        rows = [{'date': '2026-10-05', 'teachers': {str(self.teacher.pk): {'text': '이학생'}}, 'logs': {}},
+                {'date': '2026-10-06', 'teachers': {str(self.teacher.pk): {'text': '김학생'}}, 'logs': {}},
+                {'date': '2026-10-07', 'teachers': {}, 'logs': {'absent': '김학생'}}]
+        with self.captureOnCommitCallbacks(execute=True):
+            save_month_grid(rows)
+
+        row = StudentMonthlyAttendance.objects.get(student=self.student)
+        self.assertEqual((row.scheduled_days, row.absent_days), (2, 1))
+        self.assertEqual(StudentMonthlyAttendance.objects.get(student=other).late_days, 7)
+
+        # 학생이 모든 칸에서 빠지면 그 학생의 집계 행만 삭제
+        rows = [{'date': '2026-10-06', 'teachers': {str(self.teacher.pk): {'text': ''}}, 'logs': {}},
+                {'date': '2026-10-07', 'teachers': {}, 'logs': {'absent': ''}}]
+        with self.captureOnCommitCallbacks(execute=True):
+            save_month_grid(rows)
+        self.assertFalse(StudentMonthlyAttendance.objects.filter(student=self.student).exists())
+        self.assertTrue(StudentMonthlyAttendance.objects.filter(student=other).exists())
@@ -4,4 +4,10 @@ from . import views
 urlpatterns = [
     path('', views.monthly_schedule, name='monthly_schedule'),
     path('save/', views.save_monthly_schedule, name='save_monthly_schedule'),
+    path('data/', views.monthly_schedule_data, name='monthly_schedule_data'),
+    path('events/', views.monthly_schedule_events, name='monthly_schedule_events'),
+    path('autofill/', views.monthly_schedule_autofill, name='monthly_schedule_autofill'),
+    path('copy/', views.copy_monthly_schedule, name='copy_monthly_schedule'),
+    path('attendance/', views.attendance_report_view, name='attendance_report'),
+    path('utilization/', views.teacher_utilization_view, name='teacher_utilization'),
 ]
\ No newline at end of file
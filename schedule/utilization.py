@@ -0,0 +1,163 @@
+# schedule/utilization.py
+
+import datetime
+from django.core.cache import cache
+from django.db.models import Count, Sum
+from django.dispatch import receiver
+from teachers.models import Teacher, TeacherWorkRecord
+from teachers.payroll import month_bounds
+from teachers.signals import work_records_changed
+from .models import DailySchedule
+from .signals import schedule_changed
+from .attendance import month_range
+
+
+# 마감된 달의 일자별 집계 캐시 유지 시간 (스케줄/근무 기록이 바뀌면 즉시 무효화됨)
+UTILIZATION_CACHE_TIMEOUT = 60 * 60 * 24
+
+# 일자별 불일치 종류
+NO_WORK_RECORD = 'NO_WORK_RECORD'     # 배정 학생은 있는데 근무 기록이 없음
+NO_ASSIGNMENT = 'NO_ASSIGNMENT'       # 근무 기록은 있는데 배정 학생이 없음
+
+
+def _month_key(month):
+    return f"schedule:utilization:{month:%Y-%m}"
+
+
+@receiver(schedule_changed)
+def invalidate_schedule_months(sender, dates, **kwargs):
+    """스케줄이 바뀐 달의 가동률 캐시를 지웁니다."""
+    cache.delete_many({_month_key(date.replace(day=1)) for date in dates})
+
+
+@receiver(work_records_changed)
+def invalidate_work_months(sender, months, **kwargs):
+    """근무 기록이 바뀐 달의 가동률 캐시를 지웁니다."""
+    cache.delete_many({_month_key(month) for month in months})
+
+
+def daily_utilization(start, end):
+    """
+    start 이상 end 미만 기간의 (교사, 날짜)별 배정 학생 수와 근무 시간.
+    배정은 중간 테이블, 근무는 근무 기록에서 각각 그룹 쿼리 1회로 셉니다.
+
+    :return: [{'teacher_id', 'date', 'students', 'records', 'minutes', 'flag'}, ...] (날짜, 교사순)
+    """
+    assigned = (
+        DailySchedule.assigned_students.through.objects.filter(
+            dailyschedule__date__gte=start, dailyschedule__date__lt=end
+        )
+        .values('dailyschedule__teacher_id', 'dailyschedule__date')
+        .annotate(students=Count('student_id'))
+        .order_by()
+    )
+    worked = (
+        TeacherWorkRecord.objects.filter(date__gte=start, date__lt=end)
+        .values('teacher_id', 'date')
+        .annotate(records=Count('id'), minutes=Sum('duration_minutes'))
+        .order_by()
+    )
+
+    days = {}
+    for row in assigned:
+        key = (row['dailyschedule__teacher_id'], row['dailyschedule__date'])
+        days[key] = {'teacher_id': key[0], 'date': key[1], 'students': row['students'], 'records': 0, 'minutes': 0}
+    for row in worked:
+        key = (row['teacher_id'], row['date'])
+        day = days.setdefault(key, {'teacher_id': key[0], 'date': key[1], 'students': 0})
+        day['records'] = row['records']
+        day['minutes'] = row['minutes'] or 0
+
+    for day in days.values():
+        if day['students'] and not day['records']:
+            day['flag'] = NO_WORK_RECORD
+        elif day['records'] and not day['students']:
+            day['flag'] = NO_ASSIGNMENT
+        else:
+            day['flag'] = None
+    return sorted(days.values(), key=lambda day: (day['date'], day['teacher_id']))
+
+
+def _month_days(months, today):
+    """
+    월별 일자 집계. 마감된 달(이번 달 이전)은 캐시에서 읽고,
+    캐시에 없는 달은 한 번의 기간 조회로 계산한 뒤 마감된 달만 캐시합니다.
+    """
+    current_month = today.replace(day=1)
+    closed = [month for month in months if month < current_month]
+    cached = cache.get_many([_month_key(month) for month in closed])
+
+    by_month = {month: cached[_month_key(month)] for month in closed if _month_key(month) in cached}
+    missing = [month for month in months if month not in by_month]
+    if missing:
+        computed = {month: [] for month in missing}
+        for day in daily_utilization(missing[0], month_bounds(missing[-1].year, missing[-1].month)[1]):
+            month = day['date'].replace(day=1)
+            if month in computed:
+                computed[month].append(day)
+        cache.set_many({_month_key(month): computed[month] for month in missing if month in closed},
+                       UTILIZATION_CACHE_TIMEOUT)
+        by_month.update(computed)
+    return [day for month in months for day in by_month[month]]
+
+
+def teacher_utilization(start, end, today=None):
+    """
+    기간(start ~ end, 양끝 포함) 교사별 가동률 보고서.
+
+    - 학생·시간 = 날짜별 (배정 학생 수 x 근무 시간) 의 합
+    - 인건비 = 근무 시간(분) x 시급 추정치 (추가 급여 제외, 실제 급여는 기록별 시간 반올림)
+    - 학생·시간당 비용 = 인건비 / 학생·시간
+
+    :return: {'teachers': [교사별 합계], 'flagged': [불일치 일자]}
+    """
+    today = today or datetime.date.today()
+    days = [
+        day for day in _month_days(month_range(start, end), today)
+        if start <= day['date'] <= end
+    ]
+
+    teachers = {
+        teacher.pk: teacher
+        for teacher in Teacher.objects.filter(pk__in={day['teacher_id'] for day in days})
+        .only('pk', 'name', 'status', 'base_pay')
+    }
+    # 마감된 달 캐시에는 그 뒤 삭제된 교사의 기록이 남아 있을 수 있으므로 건너뜀
+    days = [day for day in days if day['teacher_id'] in teachers]
+
+    totals = {}
+    for day in days:
+        total = totals.setdefault(day['teacher_id'], {
+            'teacher': teachers[day['teacher_id']],
+            'assigned_days': 0, 'worked_days': 0, 'student_days': 0,
+            'minutes': 0, 'student_minutes': 0,
+            'no_work_record': 0, 'no_assignment': 0,
+        })
+        total['assigned_days'] += 1 if day['students'] else 0
+        total['worked_days'] += 1 if day['records'] else 0
+        total['student_days'] += day['students']
+        total['minutes'] += day['minutes']
+        total['student_minutes'] += day['students'] * day['minutes']
+        total['no_work_record'] += day['flag'] == NO_WORK_RECORD
+        total['no_assignment'] += day['flag'] == NO_ASSIGNMENT
+
+    rows = []
+    for total in totals.values():
+        teacher = total['teacher']
+        cost = int(total['minutes'] * teacher.base_pay / 60)
+        student_hours = total['student_minutes'] / 60
+        rows.append({
+            **total,
+            'work_hours': round(total['minutes'] / 60, 2),
+            'student_hours': round(student_hours, 2),
+            'avg_students': round(total['student_days'] / total['assigned_days'], 1) if total['assigned_days'] else 0,
+            'cost': cost,
+            'cost_per_student_hour': round(cost / student_hours) if student_hours else None,
+        })
+    rows.sort(key=lambda row: row['teacher'].name)
+
+    flagged = [
+        {**day, 'teacher': teachers[day['teacher_id']]}
+        for day in days if day['flag']
+    ]
+    return {'teachers': rows, 'flagged': flagged}
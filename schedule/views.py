@@ -1,10 +1,14 @@
 # schedule/views.py
 
+from django.conf import settings
 from django.shortcuts import render
 from django.utils import timezone
-from django.http import JsonResponse
+from django.http import Http404, JsonResponse, StreamingHttpResponse
+from django.core.serializers.json import DjangoJSONEncoder
 from django.views.decorators.csrf import csrf_exempt
-from django.db import transaction
+from django.views.decorators.http import require_GET
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
 import calendar
 import datetime
 import json
@@ -12,6 +16,13 @@ import json
 from teachers.models import Teacher, TeacherUnavailable  # [추가] 휴무 모델 임포트
 from students.models import Student
 from .models import DailySchedule, DailyLog
+from .grid import save_month_grid, apply_grid_changes
+from .autofill import build_month_draft
+from .cloning import copy_schedule
+from .attendance import attendance_report, default_report_range
+from .utilization import teacher_utilization
+from .live import get_broker
+from .month_data import active_teachers, month_last_modified, month_grid_etag, month_grid_payload, render_month_rows
 
 
 def monthly_schedule(request):
@@ -20,151 +31,240 @@ def monthly_schedule(request):
     year = int(request.GET.get('year', today.year))
     month = int(request.GET.get('month', today.month))
 
-    _, last_day = calendar.monthrange(year, month)
-    dates = [datetime.date(year, month, day) for day in range(1, last_day + 1)]
+    teachers = list(Teacher.objects.filter(status='ACTIVE').order_by('name'))
 
-    teachers = Teacher.objects.filter(status='ACTIVE').order_by('name')
-    all_students = Student.objects.filter(status='ATTENDING').order_by('name')
-
-    # 1. 스케줄 데이터 로드
-    schedules = DailySchedule.objects.filter(date__year=year, date__month=month).prefetch_related('assigned_students')
-    schedule_map = {(s.date, s.teacher_id): s for s in schedules}
-
-    # 2. 로그 데이터 로드
-    logs = DailyLog.objects.filter(date__year=year, date__month=month).prefetch_related('absent_students',
-                                                                                        'late_students',
-                                                                                        'exception_students')
-    log_map = {l.date: l for l in logs}
-
-    # 3. [핵심] 휴무 데이터 로드 (TeacherUnavailable)
-    unavailables = TeacherUnavailable.objects.filter(date__year=year, date__month=month)
-    # (날짜, 교사ID)를 키로 하는 집합(Set) 생성 -> 빠른 조회용
-    unavailable_set = {(u.date, u.teacher_id) for u in unavailables}
+    # 일자별 행은 날짜 리비전 단위로 캐시 (바뀐 날짜만 다시 렌더링)
+    # 학생 선택 목록은 페이지에 싣지 않고 브라우저가 /schedule/data/ 와 학생 검색 API 로 채움
+    context = {
+        'year': year,
+        'month': month,
+        'teachers': teachers,
+        'rows': render_month_rows(year, month, teachers),
+        'live_updates': settings.SCHEDULE_LIVE_UPDATES,
+    }
 
-    schedule_data = {}
+    return render(request, 'schedule/monthly_grid.html', context)
 
-    for d in dates:
-        daily_log = log_map.get(d)
 
-        row = {
-            'date': d,
-            'day_name': d.strftime('%a'),
-            'log': daily_log,
-            'teacher_cells': []
-        }
+@require_GET
+def monthly_schedule_autofill(request):
+    """
+    월간 자동 배정 초안 API (?year=2026&month=3)
+    수업 요일/담당 교사, 교사 휴무, 교사별 일일 정원을 바탕으로 빈 칸에 넣을 학생 이름을 제안합니다.
+    저장은 하지 않으며, 그리드에서 확인 후 저장하기를 눌러야 반영됩니다.
+    """
+    today = timezone.localtime(timezone.now()).date()
+    try:
+        year = int(request.GET.get('year', today.year))
+        month = int(request.GET.get('month', today.month))
+        calendar.monthrange(year, month)
+    except (ValueError, calendar.IllegalMonthError):
+        return JsonResponse({'status': 'error', 'message': '잘못된 년/월'}, status=400)
+
+    result = build_month_draft(year, month)
+
+    student_ids = {pk for cells in result['draft'].values() for ids in cells.values() for pk in ids}
+    student_ids.update(item['student_id'] for item in result['unplaced'])
+    names = dict(Student.objects.filter(pk__in=student_ids).values_list('pk', 'name'))
+
+    return JsonResponse({
+        'status': 'success',
+        'draft': {
+            date: {str(teacher_id): [names[pk] for pk in ids] for teacher_id, ids in cells.items()}
+            for date, cells in result['draft'].items()
+        },
+        'unplaced': [{'date': item['date'], 'name': names[item['student_id']]} for item in result['unplaced']],
+        'assigned': result['assigned'],
+        'substituted': result['substituted'],
+    })
+
+
+def copy_monthly_schedule(request):
+    """
+    이전 달/주 스케줄을 요일 기준으로 복사 (AJAX POST)
+    {'source': 'YYYY-MM' (그 달 전체) 또는 'YYYY-MM-DD' (그 날짜가 속한 월~일 한 주),
+     'year': 대상 년, 'month': 대상 월}
+    """
+    if request.method != 'POST':
+        return JsonResponse({'status': 'error', 'message': 'Invalid request'}, status=400)
+
+    try:
+        data = json.loads(request.body)
+        year, month = int(data['year']), int(data['month'])
+        _, last_day = calendar.monthrange(year, month)
+        source = data.get('source', '').strip()
+        if len(source) == 7:
+            source_start = datetime.datetime.strptime(source, '%Y-%m').date()
+            source_end = source_start.replace(day=calendar.monthrange(source_start.year, source_start.month)[1])
+        else:
+            picked = datetime.datetime.strptime(source, '%Y-%m-%d').date()
+            source_start = picked - datetime.timedelta(days=picked.weekday())
+            source_end = source_start + datetime.timedelta(days=6)
+    except (KeyError, ValueError, calendar.IllegalMonthError):
+        return JsonResponse({'status': 'error', 'message': '원본은 YYYY-MM 또는 YYYY-MM-DD 형식으로 입력하세요.'},
+                            status=400)
+
+    result = copy_schedule(source_start, source_end, datetime.date(year, month, 1), datetime.date(year, month, last_day))
+    return JsonResponse({
+        'status': 'success',
+        'message': f"{result['cells']}칸 (학생 {result['students']}명), 휴무 {result['off_days']}건을 복사했습니다.",
+        **result,
+    })
+
+
+def attendance_report_view(request):
+    """학생별 출석률 보고서 (?start=2026-01&end=2026-03&status=ATTENDING&order=asc)"""
+    start_month, end_month = default_report_range(timezone.localtime(timezone.now()).date())
+    try:
+        if request.GET.get('start'):
+            start_month = datetime.datetime.strptime(request.GET['start'], '%Y-%m').date()
+        if request.GET.get('end'):
+            end_month = datetime.datetime.strptime(request.GET['end'], '%Y-%m').date()
+    except ValueError:
+        pass
+    if start_month > end_month:
+        start_month, end_month = end_month, start_month
+
+    status = request.GET.get('status', 'ATTENDING')
+    order = request.GET.get('order', 'asc')
 
-        row_sum = 0
+    context = {
+        'rows': attendance_report(start_month, end_month, status=status or None, descending=(order == 'desc')),
+        'start_month': start_month,
+        'end_month': end_month,
+        'status': status,
+        'order': order,
+        'status_choices': Student.STATUS_CHOICES,
+    }
+    return render(request, 'schedule/attendance_report.html', context)
 
-        for t in teachers:
-            sch = schedule_map.get((d, t.id))
-            student_list = []
-            if sch:
-                student_list = list(sch.assigned_students.all())
-                row_sum += len(student_list)
 
-            # [핵심] 휴무 여부 판단: unavailable_set에 있는지 확인
-            is_day_off = (d, t.id) in unavailable_set
+def teacher_utilization_view(request):
+    """교사별 가동률/학생·시간당 비용 보고서 (?start=2026-03-01&end=2026-03-31)"""
+    today = timezone.localtime(timezone.now()).date()
+    start, end = today.replace(day=1), today
+    try:
+        if request.GET.get('start'):
+            start = datetime.datetime.strptime(request.GET['start'], '%Y-%m-%d').date()
+        if request.GET.get('end'):
+            end = datetime.datetime.strptime(request.GET['end'], '%Y-%m-%d').date()
+    except ValueError:
+        pass
+    if start > end:
+        start, end = end, start
+
+    report = teacher_utilization(start, end, today=today)
+    context = {
+        'rows': report['teachers'],
+        'flagged': report['flagged'],
+        'start': start,
+        'end': end,
+    }
+    return render(request, 'schedule/teacher_utilization.html', context)
 
-            row['teacher_cells'].append({
-                'teacher': t,
-                'schedule': sch,
-                'students': student_list,
-                'is_off': is_day_off  # 템플릿에 전달
-            })
 
-        if daily_log:
-            row_sum += daily_log.absent_students.count()
-            row_sum += daily_log.exception_students.count()
+@require_GET
+def monthly_schedule_data(request):
+    """
+    월간 스케줄 JSON API (?year=2026&month=3)
+    교사 ID 목록, 일 x 교사 학생 ID 행렬, 근태 열, 학생 이름 사전을 반환합니다.
+    월의 최종 수정 시각 기반 ETag/Last-Modified 를 지원하므로 변경이 없으면 304 로 응답합니다.
+    """
+    today = timezone.localtime(timezone.now()).date()
+    try:
+        year = int(request.GET.get('year', today.year))
+        month = int(request.GET.get('month', today.month))
+        calendar.monthrange(year, month)
+    except (ValueError, calendar.IllegalMonthError):
+        return JsonResponse({'status': 'error', 'message': '잘못된 년/월'}, status=400)
+
+    teachers = active_teachers()
+    last_modified = month_last_modified(year, month)
+    etag = quote_etag(month_grid_etag(year, month, teachers, last_modified))
+
+    # 변경이 없으면 304 응답 (브라우저 캐시 사용)
+    response = get_conditional_response(request, etag=etag, last_modified=int(last_modified.timestamp()))
+    if response is None:
+        response = JsonResponse(month_grid_payload(year, month, teachers))
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(last_modified.timestamp())
+    response['Cache-Control'] = 'no-cache'
+    return response
+
+
+# SSE 연결 유지를 위한 주석 전송 간격 (초)
+EVENT_HEARTBEAT_SECONDS = 15
+
+
+async def monthly_schedule_events(request):
+    """
+    월간 스케줄 변경 스트림 (Server-Sent Events, ?year=2026&month=3)
+    다른 사용자가 저장한 셀의 현재 값을 'cells' 이벤트로 밀어줍니다.
+    연결을 계속 붙잡고 있으므로 ASGI 서버(smart_manager/asgi.py)로 실행하고
+    settings.SCHEDULE_LIVE_UPDATES 를 켠 경우에만 제공합니다. (WSGI 에서는 스레드를 계속 점유함)
+    """
+    if not settings.SCHEDULE_LIVE_UPDATES:
+        raise Http404("실시간 반영이 꺼져 있습니다.")
 
-        row['total_count'] = row_sum
-        schedule_data[d] = row
+    today = timezone.localtime(timezone.now()).date()
+    try:
+        year = int(request.GET.get('year', today.year))
+        month = int(request.GET.get('month', today.month))
+        calendar.monthrange(year, month)
+    except (ValueError, calendar.IllegalMonthError):
+        return JsonResponse({'status': 'error', 'message': '잘못된 년/월'}, status=400)
 
-    context = {
-        'year': year,
-        'month': month,
-        'teachers': teachers,
-        'schedule_data': schedule_data,
-        'dates': dates,
-        'all_students': all_students,
-    }
+    subscription = await get_broker().subscribe(year, month)
 
-    return render(request, 'schedule/monthly_grid.html', context)
+    async def stream():
+        try:
+            yield "retry: 3000\n\n"
+            while True:
+                event = await subscription.next_event(EVENT_HEARTBEAT_SECONDS)
+                if event is None:
+                    yield ": ping\n\n"
+                    continue
+                data = json.dumps(event, cls=DjangoJSONEncoder, ensure_ascii=False)
+                yield f"event: {event['type']}\ndata: {data}\n\n"
+        finally:
+            subscription.close()
+
+    response = StreamingHttpResponse(stream(), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'  # nginx 버퍼링 끄기
+    return response
 
 
 @csrf_exempt
 def save_monthly_schedule(request):
-    """AJAX 저장 (휴무 정보는 TeacherUnavailable 모델에 저장)"""
+    """
+    AJAX 저장 (휴무 정보는 TeacherUnavailable 모델에 저장)
+    - {'changes': [...]}: 편집한 셀만 버전과 함께 전송 (충돌 셀은 현재 값으로 반환)
+    - {'schedules': [...]}: 월 전체 그리드 전송 (버전 확인 없이 바뀐 셀만 반영)
+    """
     if request.method == 'POST':
         try:
             data = json.loads(request.body)
-            schedule_list = data.get('schedules', [])
-
-            with transaction.atomic():
-                for row in schedule_list:
-                    date_str = row.get('date')
-
-                    # 1. 교사별 데이터 처리
-                    teachers_data = row.get('teachers', {})
-                    for teacher_id, cell_data in teachers_data.items():
-                        student_names_str = cell_data.get('text', '')
-                        is_day_off = cell_data.get('is_off', False)
-                        teacher = Teacher.objects.get(pk=teacher_id)
-
-                        # A. 학생 배정 처리 (DailySchedule)
-                        # 이름이 있을 때만 DailySchedule 생성/업데이트
-                        if student_names_str.strip():
-                            schedule, _ = DailySchedule.objects.get_or_create(
-                                date=date_str,
-                                teacher=teacher
-                            )
-                            names = [n.strip() for n in student_names_str.split(',') if n.strip()]
-                            students_to_add = []
-                            for name in names:
-                                stu = Student.objects.filter(name=name, status='ATTENDING').first()
-                                if stu: students_to_add.append(stu)
-                            schedule.assigned_students.set(students_to_add)
-                        else:
-                            # 이름이 없으면 스케줄 객체가 굳이 필요 없을 수도 있지만,
-                            # 기존에 있었다면 학생 명단을 비워줍니다.
-                            schedule = DailySchedule.objects.filter(date=date_str, teacher=teacher).first()
-                            if schedule:
-                                schedule.assigned_students.clear()
-
-                        # B. [핵심] 휴무 처리 (TeacherUnavailable)
-                        if is_day_off:
-                            # 휴무라면 레코드 생성 (없으면 만듦)
-                            TeacherUnavailable.objects.get_or_create(
-                                date=date_str,
-                                teacher=teacher,
-                                defaults={'reason': '스케줄표에서 설정'}
-                            )
-                        else:
-                            # 휴무가 아니라면 기존 레코드 삭제 (있으면 지움)
-                            TeacherUnavailable.objects.filter(
-                                date=date_str,
-                                teacher=teacher
-                            ).delete()
-
-                    # 2. 로그(근태) 저장
-                    logs_data = row.get('logs', {})
-                    daily_log, _ = DailyLog.objects.get_or_create(date=date_str)
-
-                    def update_log_m2m(field_name, names_str):
-                        names = [n.strip() for n in names_str.split(',') if n.strip()]
-                        students = []
-                        for name in names:
-                            stu = Student.objects.filter(name=name).first()
-                            if stu: students.append(stu)
-                        getattr(daily_log, field_name).set(students)
-
-                    update_log_m2m('absent_students', logs_data.get('absent', ''))
-                    update_log_m2m('late_students', logs_data.get('late', ''))
-                    update_log_m2m('exception_students', logs_data.get('exception', ''))
-
-                    daily_log.remarks = logs_data.get('remarks', '')
-                    daily_log.save()
-
-            return JsonResponse({'status': 'success', 'message': '저장되었습니다.'})
+
+            if 'changes' in data:
+                result = apply_grid_changes(data['changes'])
+                message = f"저장되었습니다. ({len(result['applied'])}건)"
+                if result['conflicts']:
+                    message += f" 다른 사용자가 먼저 수정한 셀 {len(result['conflicts'])}건은 반영되지 않았습니다."
+                return JsonResponse({'status': 'success', 'message': message, **result})
+
+            result = save_month_grid(data.get('schedules', []))
+
+            message = f"저장되었습니다. (변경 {result['changed']}건)"
+            if result['unresolved']:
+                message += f" 확인 필요한 이름 {len(result['unresolved'])}건이 있습니다."
+
+            return JsonResponse({
+                'status': 'success',
+                'message': message,
+                'changed': result['changed'],
+                'unresolved': result['unresolved'],
+            })
 
         except Exception as e:
             return JsonResponse({'status': 'error', 'message': str(e)}, status=500)
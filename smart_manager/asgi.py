@@ -5,6 +5,16 @@ It exposes the ASGI callable as a module-level variable named ``application``.
 
 For more information on this file, see
 https://docs.djangoproject.com/en/5.1/howto/deployment/asgi/
+
+The schedule grid's live updates (/schedule/events/) hold a long-lived
+server-sent-events connection. They are off by default; to use them, set
+SCHEDULE_LIVE_UPDATES = True and serve the project through this entry point
+with an ASGI server, e.g.
+
+    uvicorn smart_manager.asgi:application --workers 1
+
+With several workers set SCHEDULE_EVENTS_BROKER to
+'schedule.live.DatabasePollingBroker'.
 """
 
 import os
@@ -97,6 +97,30 @@ DATABASES = {
 }
 
 
+# Cache
+# https://docs.djangoproject.com/en/5.1/topics/cache/
+# 생성된 PDF, 연간 급여 대장 등 계산 결과 캐시 (여러 워커가 공유하려면 Redis/Memcached 등으로 교체)
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'smart-manager',
+        'OPTIONS': {'MAX_ENTRIES': 1000},
+    }
+}
+
+# 시간표 실시간 반영(SSE, /schedule/events/)
+# 연결을 계속 붙잡고 있으므로 ASGI 서버(smart_manager/asgi.py)로 실행할 때만 켜세요.
+# 꺼져 있으면(기본) 그리드는 저장/새로고침으로만 갱신됩니다. (WSGI runserver/gunicorn)
+SCHEDULE_LIVE_UPDATES = False
+
+# 실시간 반영 백엔드
+# - 'schedule.live.InProcessBroker' : 단일 프로세스 (기본)
+# - 'schedule.live.DatabasePollingBroker' : 워커가 여러 개일 때 (DB 리비전을 주기적으로 확인)
+SCHEDULE_EVENTS_BROKER = 'schedule.live.InProcessBroker'
+SCHEDULE_EVENTS_POLL_INTERVAL = 2  # 초
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.1/ref/settings/#auth-password-validators
 
@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class StudentsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'students'
+
+    def ready(self):
+        # 학생 저장/삭제 시 검색 색인 갱신용 수신기 등록
+        from . import search  # noqa: F401
@@ -0,0 +1,89 @@
+# students/export.py
+
+import codecs
+import csv
+import io
+from django.utils import timezone
+from openpyxl import Workbook
+from .models import Student
+
+
+# (엑셀 헤더, 필드)
+EXPORT_COLUMNS = [
+    ('고유번호', 'student_number'),
+    ('이름', 'name'),
+    ('학교', 'school'),
+    ('학년', 'grade'),
+    ('성별', 'gender'),
+    ('학생 전화번호', 'student_phone'),
+    ('부모님 전화번호', 'parent_phone'),
+    ('이메일', 'email'),
+    ('현금영수증 번호', 'receipt_phone'),
+    ('인터뷰 날짜', 'interview_date'),
+    ('인터뷰 성적', 'interview_score'),
+    ('인터뷰 정보', 'interview_info'),
+    ('첫 수업 날짜', 'first_class_date'),
+    ('그만 둔 날짜', 'last_class_date'),
+    ('기타', 'misc'),
+    ('등록일', 'created_at'),
+]
+
+# 한 번에 읽는 학생 수 (MySQL 드라이버는 결과 전체를 메모리에 올리므로 pk 구간 단위로 나눠 조회)
+EXPORT_CHUNK_SIZE = 2000
+
+# CSV 스트림 조각 크기 (문자 수)
+CSV_FLUSH_SIZE = 64 * 1024
+
+
+def iter_student_rows(chunk_size=EXPORT_CHUNK_SIZE):
+    """최근 등록순으로 학생 행(값 목록)을 chunk_size 개씩 나눠 읽어 내보냅니다."""
+    genders = dict(Student._meta.get_field('gender').choices)
+    fields = [field for _, field in EXPORT_COLUMNS]
+    created_idx = fields.index('created_at')
+    gender_idx = fields.index('gender')
+
+    last_pk = None
+    while True:
+        queryset = Student.objects.order_by('-pk')
+        if last_pk is not None:
+            queryset = queryset.filter(pk__lt=last_pk)
+        chunk = list(queryset.values_list('pk', *fields)[:chunk_size])
+        if not chunk:
+            return
+        for pk, *row in chunk:
+            row[gender_idx] = genders.get(row[gender_idx], row[gender_idx])
+            row[created_idx] = timezone.localtime(row[created_idx]).strftime('%Y-%m-%d')
+            yield row
+        last_pk = chunk[-1][0]
+
+
+def iter_students_csv(chunk_size=EXPORT_CHUNK_SIZE):
+    """학생 목록 CSV 를 읽는 대로 바이트 조각으로 내보냅니다. (엑셀에서 한글이 깨지지 않도록 UTF-8 BOM 포함)"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow([header for header, _ in EXPORT_COLUMNS])
+    yield codecs.BOM_UTF8 + buffer.getvalue().encode('utf-8')
+
+    buffer.seek(0)
+    buffer.truncate()
+    for row in iter_student_rows(chunk_size):
+        writer.writerow(['' if value is None else value for value in row])
+        # 행마다 보내지 않고 약 64KB 씩 모아서 전송
+        if buffer.tell() >= CSV_FLUSH_SIZE:
+            yield buffer.getvalue().encode('utf-8')
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue().encode('utf-8')
+
+
+def write_students_xlsx(fileobj, chunk_size=EXPORT_CHUNK_SIZE):
+    """
+    학생 목록 엑셀을 fileobj 에 씁니다.
+    openpyxl 쓰기 전용 모드는 행을 바로 임시 파일로 내보내므로 학생 수와 관계없이 메모리가 일정합니다.
+    """
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet('학생 목록')
+    sheet.append([header for header, _ in EXPORT_COLUMNS])
+    for row in iter_student_rows(chunk_size):
+        sheet.append(row)
+    workbook.save(fileobj)
@@ -0,0 +1,133 @@
+# students/importer.py
+
+import pandas as pd
+from django.db import transaction
+from .models import Student, GRADE_CHOICES, generate_student_numbers
+from .search import touch_students
+
+
+# 엑셀 헤더 -> 모델 필드
+COLUMNS = {
+    '이름': 'name',
+    '학교': 'school',
+    '학년': 'grade',
+    '성별': 'gender',
+    '학생 전화번호': 'student_phone',
+    '부모님 전화번호': 'parent_phone',
+    '이메일': 'email',
+}
+REQUIRED_COLUMNS = ['이름', '학년', '성별']
+OPTIONAL_FIELDS = ['school', 'student_phone', 'parent_phone', 'email']
+
+GENDERS = {'남': 'M', 'M': 'M', 'MALE': 'M', '여': 'F', 'F': 'F', 'FEMALE': 'F'}
+GRADES = [value for value, _ in GRADE_CHOICES]
+EMAIL_PATTERN = r'^[^@\s]+@[^@\s]+\.[^@\s]+$'
+
+# bulk INSERT 한 번에 넣는 행 수
+IMPORT_CHUNK_SIZE = 500
+
+
+class RosterError(Exception):
+    """파일 자체를 읽을 수 없거나 필수 컬럼이 없는 경우"""
+
+
+def read_roster(upload_file):
+    """업로드 파일을 문자열 컬럼으로 읽습니다. (전화번호 앞자리 0, 학년 숫자가 변형되지 않도록)"""
+    try:
+        if upload_file.name.endswith('.csv'):
+            df = pd.read_csv(upload_file, dtype=str, keep_default_na=False)
+        else:
+            df = pd.read_excel(upload_file, dtype=str, keep_default_na=False)
+    except Exception as e:
+        raise RosterError(f'파일을 읽을 수 없습니다: {e}')
+
+    df.columns = [str(column).strip() for column in df.columns]
+    missing = [column for column in REQUIRED_COLUMNS if column not in df.columns]
+    if missing:
+        raise RosterError(f"필수 컬럼이 없습니다: {', '.join(missing)}")
+    return df
+
+
+def normalize_roster(df):
+    """
+    컬럼 단위로 값을 정리하고 검사합니다. (행 반복 없이 pandas 벡터 연산)
+
+    :return: (frame, errors) - frame 은 모델 필드명 컬럼의 정리된 값,
+             errors 는 {행 번호(엑셀 기준): [오류 메시지, ...]}
+    """
+    frame = pd.DataFrame(index=df.index)
+    for header, field in COLUMNS.items():
+        column = df[header] if header in df.columns else pd.Series('', index=df.index)
+        frame[field] = column.fillna('').astype(str).str.strip()
+
+    # 완전히 빈 줄은 무시
+    frame = frame[frame.ne('').any(axis=1)]
+
+    # 1. 값 정리: 학년 '5' / 'k5' -> 'K5', 성별 '남' / 'male' -> 'M', 전화번호는 숫자와 '-' 만
+    frame['grade'] = frame['grade'].str.upper().str.replace(r'^(\d+)$', r'K\1', regex=True)
+    frame['gender'] = frame['gender'].str.upper().map(GENDERS).fillna('')
+    for field in ('student_phone', 'parent_phone'):
+        frame[field] = frame[field].str.replace(r'[^\d-]', '', regex=True)
+
+    # 2. 규칙별 위반 행 마스크
+    checks = [
+        (frame['name'].eq(''), '이름이 비어 있습니다.'),
+        (frame['name'].str.len() > 100, '이름이 100자를 넘습니다.'),
+        (~frame['grade'].isin(GRADES), 'K5 ~ K12 형식의 학년이 아닙니다.'),
+        (frame['gender'].eq(''), '성별은 남/여(M/F)로 입력해 주세요.'),
+        (frame['school'].str.len() > 100, '학교명이 100자를 넘습니다.'),
+        (frame['student_phone'].str.len() > 20, '학생 전화번호가 너무 깁니다.'),
+        (frame['parent_phone'].str.len() > 20, '부모님 전화번호가 너무 깁니다.'),
+        (frame['email'].ne('') & ~frame['email'].str.match(EMAIL_PATTERN), '이메일 형식이 올바르지 않습니다.'),
+    ]
+    errors = {}
+    for mask, message in checks:
+        for index in mask[mask].index:
+            # 엑셀 행 번호 = 데이터 인덱스 + 2 (1행은 헤더)
+            errors.setdefault(index + 2, []).append(message)
+    return frame, dict(sorted(errors.items()))
+
+
+def import_students(frame):
+    """
+    정리된 행을 한 트랜잭션 안에서 묶음 단위 bulk INSERT 로 등록합니다.
+    학생 고유 번호는 전체 행 수만큼 미리 할당합니다.
+
+    :return: 등록된 학생 수
+    """
+    records = frame.to_dict('records')
+    if not records:
+        return 0
+    for field in OPTIONAL_FIELDS:
+        for record in records:
+            record[field] = record[field] or None
+
+    with transaction.atomic():
+        numbers = generate_student_numbers(len(records))
+        created = Student.objects.bulk_create(
+            [Student(student_number=number, **record) for number, record in zip(numbers, records)],
+            batch_size=IMPORT_CHUNK_SIZE,
+        )
+        # bulk_create 는 post_save 를 보내지 않으므로 검색 색인 갱신 기준을 직접 기록
+        touch_students(sender=Student)
+    return len(created)
+
+
+def import_roster(upload_file):
+    """
+    학생 명단 파일 일괄 등록.
+    한 행이라도 오류가 있으면 아무것도 등록하지 않고 행별 오류를 반환합니다. (부분 등록 방지)
+
+    :return: {'created': 등록 수, 'errors': [{'row', 'name', 'messages'}, ...]}
+    """
+    frame, errors = normalize_roster(read_roster(upload_file))
+    if errors:
+        names = frame['name']
+        return {
+            'created': 0,
+            'errors': [
+                {'row': row, 'name': names.get(row - 2, ''), 'messages': messages}
+                for row, messages in errors.items()
+            ],
+        }
+    return {'created': import_students(frame), 'errors': []}
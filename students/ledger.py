@@ -0,0 +1,48 @@
+# students/ledger.py
+
+from django.db.models import F, IntegerField, OuterRef, Prefetch, Subquery, Sum
+from django.db.models.functions import Coalesce
+from django.shortcuts import get_object_or_404
+from bookstore.models import BookSale
+from classes.models import ClassInfo, TuitionLog
+from .models import Student, StudentFile
+
+
+def unpaid_book_total_expression():
+    """학생별 미납 교재비 (단가 x 수량 합계) 서브쿼리"""
+    unpaid_sales = (
+        BookSale.objects.filter(student=OuterRef('pk'), is_paid=False)
+        .order_by()
+        .values('student')
+        .annotate(total=Sum(F('price') * F('quantity')))
+        .values('total')
+    )
+    return Coalesce(Subquery(unpaid_sales, output_field=IntegerField()), 0)
+
+
+def build_student_ledger(pk):
+    """
+    학생 상세 화면 데이터 (수강 수업, 교재 판매, 수강료 청구, 첨부 파일, 미납 내역).
+    학생 조회 1회(미납 교재비 서브쿼리 포함) + 관계별 prefetch 1회씩이므로
+    판매/청구 기록이 늘어나도 쿼리 수가 일정합니다.
+    """
+    student = get_object_or_404(
+        Student.objects
+        .annotate(unpaid_book_total=unpaid_book_total_expression())
+        .prefetch_related(
+            Prefetch('enrolled_classes', queryset=ClassInfo.objects.select_related('teacher')),
+            Prefetch('book_sales', queryset=BookSale.objects.select_related('book')),
+            Prefetch('tuition_logs', queryset=TuitionLog.objects.select_related('class_info')),
+            Prefetch('files', queryset=StudentFile.objects.order_by('-uploaded_at')),
+        ),
+        pk=pk,
+    )
+
+    # 미납 총액(unpaid_amount)에는 환불 등 조정이 반영되어 있으므로 수강료 미납은 총액에서 교재 미납을 뺀 값
+    return {
+        'student': student,
+        'files': student.files.all(),
+        'unpaid_book_total': student.unpaid_book_total,
+        'unpaid_tuition_total': max(0, student.unpaid_amount - student.unpaid_book_total),
+    }
+
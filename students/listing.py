@@ -0,0 +1,85 @@
+# students/listing.py
+
+import base64
+import json
+from django.db.models import Q
+from .models import Student
+
+
+# 한 페이지에 보여주는 학생 수
+STUDENT_PAGE_SIZE = 50
+
+# 상태 필터에서 '전체' 를 뜻하는 값
+ALL_STATUSES = 'ALL'
+
+
+def encode_cursor(student):
+    """(이름, pk) 정렬 위치를 URL 에 넣을 수 있는 문자열로 만듭니다."""
+    raw = json.dumps([student.name, student.pk], ensure_ascii=False).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+
+def decode_cursor(value):
+    """잘못된 커서는 None (첫 페이지로 처리)"""
+    try:
+        name, pk = json.loads(base64.urlsafe_b64decode(value + '=' * (-len(value) % 4)))
+        return str(name), int(pk)
+    except (ValueError, TypeError):
+        return None
+
+
+def filter_students(status='ATTENDING', grade='', school='', query=''):
+    """
+    학생 목록 필터.
+    상태(기본 재원) + 학년 조건은 (status, grade, name) / (status, name) 인덱스를 그대로 탑니다.
+    검색어가 숫자면 전화번호 일부, 아니면 이름 앞부분으로 찾습니다.
+    """
+    students = Student.objects.all()
+    if status and status != ALL_STATUSES:
+        students = students.filter(status=status)
+    if grade:
+        students = students.filter(grade=grade)
+    if school:
+        students = students.filter(school__startswith=school)
+
+    query = ''.join(query.split())
+    if query:
+        if query.replace('-', '').isdigit():
+            students = students.filter(Q(student_phone__contains=query) | Q(parent_phone__contains=query))
+        else:
+            students = students.filter(name__startswith=query)
+    return students
+
+
+def keyset_page(students, after=None, before=None, size=STUDENT_PAGE_SIZE):
+    """
+    (이름, pk) 순서의 커서 기반 페이지. OFFSET 없이 인덱스에서 바로 다음/이전 size 명을 읽습니다.
+
+    :param after: 이 커서 다음 페이지, before: 이 커서 이전 페이지 (둘 다 없으면 첫 페이지)
+    :return: {'students', 'next_cursor', 'prev_cursor'}
+    """
+    after = decode_cursor(after) if after else None
+    before = decode_cursor(before) if before else None
+
+    if before:
+        name, pk = before
+        rows = list(
+            students.filter(Q(name__lt=name) | Q(name=name, pk__lt=pk))
+            .order_by('-name', '-pk')[:size + 1]
+        )
+        has_more_before, rows = len(rows) > size, rows[:size]
+        rows.reverse()
+        has_more_after = True
+    else:
+        if after:
+            name, pk = after
+            students = students.filter(Q(name__gt=name) | Q(name=name, pk__gt=pk))
+        rows = list(students.order_by('name', 'pk')[:size + 1])
+        has_more_after, rows = len(rows) > size, rows[:size]
+        has_more_before = after is not None
+
+    return {
+        'students': rows,
+        'next_cursor': encode_cursor(rows[-1]) if rows and has_more_after else None,
+        'prev_cursor': encode_cursor(rows[0]) if rows and has_more_before else None,
+    }
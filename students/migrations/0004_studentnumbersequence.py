@@ -0,0 +1,31 @@
+# Generated by Django 5.2.8 on 2026-10-17 13:00
+
+from django.db import migrations, models
+
+
+def create_sequence(apps, schema_editor):
+    """발급 순번 행을 미리 만들어 둡니다. (동시 첫 발급 시 생성 경합 방지)"""
+    StudentNumberSequence = apps.get_model('students', 'StudentNumberSequence')
+    StudentNumberSequence.objects.get_or_create(pk=1, defaults={'next_index': 0})
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('students', '0003_student_status'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StudentNumberSequence',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('next_index', models.BigIntegerField(default=0, verbose_name='다음 발급 순번')),
+            ],
+            options={
+                'verbose_name': '학생 번호 발급 순번',
+                'verbose_name_plural': '학생 번호 발급 순번',
+            },
+        ),
+        migrations.RunPython(create_sequence, migrations.RunPython.noop),
+    ]
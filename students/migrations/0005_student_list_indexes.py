@@ -0,0 +1,21 @@
+# Generated by Django 5.2.8 on 2026-10-17 14:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('students', '0004_studentnumbersequence'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='student',
+            index=models.Index(fields=['status', 'grade', 'name'], name='student_status_grade_name_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='student',
+            index=models.Index(fields=['status', 'name'], name='student_status_name_idx'),
+        ),
+    ]
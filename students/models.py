@@ -1,8 +1,9 @@
 # students/models.py
 
 import os
-import random
-from django.db import models
+import threading
+from collections import deque
+from django.db import models, transaction
 from django.utils import timezone
 
 
@@ -19,16 +20,109 @@ def student_file_upload_path(instance, filename):
     return f'students/{instance.student.id}/{filename}'
 
 
-def generate_student_number():
+# 학생 고유 번호 범위: 10000000 ~ 99999999 (0으로 시작하지 않는 8자리)
+STUDENT_NUMBER_MIN = 10000000
+STUDENT_NUMBER_SPACE = 90000000
+
+# 프로세스별로 한 번에 예약해 두는 번호 수
+STUDENT_NUMBER_BLOCK_SIZE = 50
+
+# 순번을 섞는 Feistel 순열 (2^28 >= 번호 범위, 바꾸면 이미 발급된 번호와 겹칠 수 있으므로 고정)
+_FEISTEL_HALF_BITS = 14
+_FEISTEL_MASK = (1 << _FEISTEL_HALF_BITS) - 1
+_FEISTEL_KEYS = (0x2F1B, 0x0D57, 0x3A8C, 0x1664)
+
+
+def _feistel(value):
+    left, right = value >> _FEISTEL_HALF_BITS, value & _FEISTEL_MASK
+    for key in _FEISTEL_KEYS:
+        mixed = ((right * 0x9E3779B1 + key) >> 7) & _FEISTEL_MASK
+        left, right = right, left ^ mixed
+    return (left << _FEISTEL_HALF_BITS) | right
+
+
+def student_number_for(index):
     """
-    0으로 시작하지 않는 8자리 고유 번호(10000000 ~ 99999999)를 생성합니다.
-    중복된 번호가 있으면 다시 생성합니다.
+    발급 순번 -> 학생 고유 번호 (순번마다 서로 다른 번호가 1:1 로 대응)
+    순열 결과가 범위를 벗어나면 범위 안에 들어올 때까지 다시 섞습니다. (cycle walking)
     """
+    value = index
     while True:
-        number = random.randint(10000000, 99999999)
-        # 이미 존재하는 번호인지 확인 (Student 모델이 정의되기 전이라 클래스 내부에서 호출될 때 처리)
-        if not Student.objects.filter(student_number=number).exists():
-            return number
+        value = _feistel(value)
+        if value < STUDENT_NUMBER_SPACE:
+            return STUDENT_NUMBER_MIN + value
+
+
+def _reserve_numbers(count):
+    """
+    순번 count 개를 예약해 학생 번호로 바꿉니다.
+    예전 무작위 방식으로 이미 발급된 번호와 겹치면 건너뛰고 모자란 만큼 더 예약합니다.
+    """
+    numbers = []
+    while len(numbers) < count:
+        candidates = [student_number_for(index) for index in StudentNumberSequence.reserve(count - len(numbers))]
+        taken = set()
+        for i in range(0, len(candidates), 900):
+            taken.update(Student.objects.filter(
+                student_number__in=candidates[i:i + 900]
+            ).values_list('student_number', flat=True))
+        numbers.extend(number for number in candidates if number not in taken)
+    return numbers
+
+
+_number_pool = deque()
+_number_pool_lock = threading.Lock()
+
+
+def _refill_pool(numbers):
+    with _number_pool_lock:
+        _number_pool.extend(numbers)
+
+
+def generate_student_number():
+    """
+    새 학생 고유 번호 (Student.student_number 기본값).
+    프로세스별로 미리 예약해 둔 묶음에서 꺼내므로 대부분 쿼리가 없고,
+    묶음이 비었을 때만 STUDENT_NUMBER_BLOCK_SIZE 개를 한 트랜잭션으로 예약합니다.
+    """
+    with _number_pool_lock:
+        if _number_pool:
+            return _number_pool.popleft()
+
+    numbers = _reserve_numbers(STUDENT_NUMBER_BLOCK_SIZE)
+    # 바깥 트랜잭션이 롤백되면 예약도 취소되므로 남은 번호는 커밋된 뒤에만 풀에 넣음
+    rest = numbers[1:]
+    transaction.on_commit(lambda: _refill_pool(rest))
+    return numbers[0]
+
+
+def generate_student_numbers(count):
+    """일괄 등록용: 새 학생 고유 번호 count 개를 한 번에 예약합니다. (호출한 트랜잭션과 함께 커밋/롤백)"""
+    return _reserve_numbers(count) if count > 0 else []
+
+
+class StudentNumberSequence(models.Model):
+    """학생 고유 번호 발급 순번 (한 행). 순번은 student_number_for() 로 섞여 번호가 됩니다."""
+    next_index = models.BigIntegerField(default=0, verbose_name="다음 발급 순번")
+
+    @classmethod
+    def reserve(cls, count):
+        """순번 count 개를 행 잠금과 함께 예약합니다. (동시에 예약해도 겹치지 않음)"""
+        with transaction.atomic():
+            sequence, _ = cls.objects.select_for_update().get_or_create(pk=1)
+            start = sequence.next_index
+            if start + count > STUDENT_NUMBER_SPACE:
+                raise ValueError("발급 가능한 학생 고유 번호가 모두 소진되었습니다.")
+            sequence.next_index = start + count
+            sequence.save(update_fields=['next_index'])
+        return range(start, start + count)
+
+    def __str__(self):
+        return f"다음 순번 {self.next_index}"
+
+    class Meta:
+        verbose_name = "학생 번호 발급 순번"
+        verbose_name_plural = "학생 번호 발급 순번"
 
 
 class Student(models.Model):
@@ -80,6 +174,24 @@ class Student(models.Model):
     # 상태 필드 (기본값: 재원)
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='ATTENDING', verbose_name="재원 상태")
 
+    # 검색 색인/스케줄 이름 사전에 쓰이는 필드 (이 값이 바뀔 때만 학생 버전을 올림, students/search.py)
+    INDEXED_FIELDS = ('name', 'status', 'grade', 'school', 'student_phone', 'parent_phone')
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance.remember_indexed_values()
+        return instance
+
+    def remember_indexed_values(self):
+        """DB 에서 읽은(또는 저장한) 색인 필드 값을 기억해 둡니다. (지연 로딩 필드는 제외)"""
+        self._indexed_values = {field: self.__dict__[field] for field in self.INDEXED_FIELDS if field in self.__dict__}
+
+    def indexed_fields_changed(self):
+        """마지막으로 읽은/저장한 뒤 색인 필드가 바뀌었는지 (읽은 기록이 없으면 바뀐 것으로 봄)"""
+        loaded = getattr(self, '_indexed_values', {})
+        return any(field not in loaded or loaded[field] != getattr(self, field) for field in self.INDEXED_FIELDS)
+
     def __str__(self):
         # 관리자 페이지 등에서 고유 번호도 같이 보이게 수정
         return f"[{self.student_number}] {self.name} ({self.grade})"
@@ -87,6 +199,11 @@ class Student(models.Model):
     class Meta:
         verbose_name = "학생"
         verbose_name_plural = "학생 목록"
+        indexes = [
+            # 학생 목록: 상태(+학년) 필터 후 이름순 커서 페이지
+            models.Index(fields=['status', 'grade', 'name'], name='student_status_grade_name_idx'),
+            models.Index(fields=['status', 'name'], name='student_status_name_idx'),
+        ]
 
 
 class StudentFile(models.Model):
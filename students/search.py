@@ -0,0 +1,176 @@
+# students/search.py
+
+import threading
+from bisect import bisect_left
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from core.models import DataVersion
+from .models import Student
+
+
+# 한글 음절의 초성 (가 = 0xAC00, 초성 하나당 21 * 28 = 588 글자)
+CHOSEONG = 'ㄱㄲㄴㄷㄸㄹㅁㅂㅃㅅㅆㅇㅈㅉㅊㅋㅌㅍㅎ'
+HANGUL_FIRST, HANGUL_LAST = 0xAC00, 0xD7A3
+
+# 학생 정보 버전 키 (DataVersion). DB 에 있으므로 어느 워커에서 바꿔도 모든 워커의 색인이 갱신됨
+STUDENTS_VERSION_KEY = "students"
+
+# 한 번에 돌려주는 최대 결과 수
+DEFAULT_LIMIT = 20
+
+
+def choseong(text):
+    """'김민준' -> 'ㄱㅁㅈ' (한글 음절이 아닌 글자는 그대로 둡니다)"""
+    return ''.join(
+        CHOSEONG[(ord(ch) - HANGUL_FIRST) // 588] if HANGUL_FIRST <= ord(ch) <= HANGUL_LAST else ch
+        for ch in text
+    )
+
+
+def _normalize(text):
+    return ''.join((text or '').split()).lower()
+
+
+def _phone_last4(phone):
+    digits = ''.join(ch for ch in (phone or '') if ch.isdigit())
+    return digits[-4:] if len(digits) >= 4 else ''
+
+
+def _matches_mixed(name, query):
+    """'김ㅁ' 처럼 음절과 초성이 섞인 검색어: 글자마다 음절이면 일치, 자음이면 초성 일치"""
+    if len(query) > len(name):
+        return False
+    for ch, q in zip(name, query):
+        if ch != q and choseong(ch) != q:
+            return False
+    return True
+
+
+@receiver([post_save, post_delete], sender=Student)
+def touch_students(sender, instance=None, created=False, update_fields=None, **kwargs):
+    """
+    학생이 추가/삭제되거나 색인 필드(Student.INDEXED_FIELDS)가 바뀌면 버전을 올립니다.
+    (검색 색인, 스케줄 이름 사전/행 캐시 갱신 기준)
+    미납금만 바뀌는 저장(수강료 청구, 교재 판매 등)은 버전을 올리지 않으므로 캐시가 유지됩니다.
+    save() 를 거치지 않는 변경(bulk_create 등)은 같은 트랜잭션 안에서 instance 없이 직접 호출하세요.
+    """
+    if instance is not None and kwargs.get('signal') is post_save:
+        if update_fields is not None:
+            changed = created or bool(set(update_fields) & set(Student.INDEXED_FIELDS))
+        else:
+            changed = created or instance.indexed_fields_changed()
+            instance.remember_indexed_values()
+        if not changed:
+            return
+    DataVersion.bump(STUDENTS_VERSION_KEY)
+
+
+def students_version():
+    return DataVersion.versions(STUDENTS_VERSION_KEY)[STUDENTS_VERSION_KEY]
+
+
+def students_last_modified():
+    return DataVersion.last_modified(STUDENTS_VERSION_KEY)
+
+
+class StudentSearchIndex:
+    """
+    학생 타입어헤드 색인.
+    이름, 초성, 전화번호 뒤 4자리를 각각 정렬된 리스트로 두고 bisect 로 접두어 범위를 찾습니다.
+    """
+
+    def __init__(self, rows):
+        self.students = {}
+        name_keys, choseong_keys, phone_keys = [], [], []
+
+        for pk, name, status, grade, school, student_phone, parent_phone in rows:
+            key = _normalize(name)
+            self.students[pk] = {
+                'id': pk, 'name': name, 'status': status, 'grade': grade, 'school': school or '',
+                'phone_last4': _phone_last4(student_phone) or _phone_last4(parent_phone),
+            }
+            name_keys.append((key, pk))
+            choseong_keys.append((choseong(key), pk))
+            for phone in {_phone_last4(student_phone), _phone_last4(parent_phone)}:
+                if phone:
+                    phone_keys.append((phone, pk))
+
+        self.by_name = sorted(name_keys)
+        self.by_choseong = sorted(choseong_keys)
+        self.by_phone = sorted(phone_keys)
+
+    @staticmethod
+    def _prefix_range(keys, prefix):
+        """접두어가 prefix 인 (key, pk) 를 정렬 순서대로 내보냅니다."""
+        lo = bisect_left(keys, (prefix,))
+        hi = bisect_left(keys, (prefix + '\uffff',), lo)
+        for i in range(lo, hi):
+            yield keys[i]
+
+    def search(self, query, limit=DEFAULT_LIMIT, status=None):
+        """
+        검색어 종류에 따라 색인을 고릅니다.
+        - 숫자: 전화번호 뒤 4자리 접두어
+        - 초성만: 초성 접두어 ('ㄱㅁ' -> 김민준)
+        - 음절 + 초성 혼합: 초성 범위에서 글자별 비교 ('김ㅁ' -> 김민준)
+        - 그 외: 이름 접두어
+        재원생을 먼저, 같은 상태끼리는 이름순으로 반환합니다. (재원생이 limit 명 모이면 바로 중단)
+        """
+        query = _normalize(query)
+        if not query:
+            return []
+
+        if query.isdigit():
+            matches = self._prefix_range(self.by_phone, query)
+        elif query == choseong(query) and any(ch in CHOSEONG for ch in query):
+            matches = self._prefix_range(self.by_choseong, query)
+        elif any(ch in CHOSEONG for ch in query):
+            matches = (
+                (key, pk) for key, pk in self._prefix_range(self.by_choseong, choseong(query))
+                if _matches_mixed(_normalize(self.students[pk]['name']), query)
+            )
+        else:
+            matches = self._prefix_range(self.by_name, query)
+
+        attending, others, seen = [], [], set()
+        for _, pk in matches:
+            if pk in seen:
+                continue
+            seen.add(pk)
+            row = self.students[pk]
+            if status and row['status'] != status:
+                continue
+            if row['status'] == 'ATTENDING':
+                attending.append(row)
+                if len(attending) >= limit:
+                    break
+            elif len(others) < limit:
+                others.append(row)
+        return (attending + others)[:limit]
+
+
+_index = None
+_index_version = None
+_lock = threading.Lock()
+
+
+def get_search_index():
+    """프로세스별 색인을 반환합니다. 학생 버전이 바뀌었으면 다시 만듭니다. (버전 확인 쿼리 1회 + 재구성 시 1회)"""
+    global _index, _index_version
+
+    version = students_version()
+    if _index is not None and _index_version == version:
+        return _index
+
+    with _lock:
+        if _index is None or _index_version != version:
+            rows = Student.objects.values_list(
+                'pk', 'name', 'status', 'grade', 'school', 'student_phone', 'parent_phone'
+            )
+            _index = StudentSearchIndex(list(rows))
+            _index_version = version
+    return _index
+
+
+def search_students(query, limit=DEFAULT_LIMIT, status=None):
+    return get_search_index().search(query, limit=limit, status=status)
@@ -1,3 +1,208 @@
+import datetime
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import transaction
+from django.db.models import F
 from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from core.models import DataVersion
+from .importer import import_roster
+from .listing import decode_cursor, encode_cursor, filter_students, keyset_page
+from . import models as student_models
+from .models import (
+    STUDENT_NUMBER_MIN, STUDENT_NUMBER_SPACE, Student, StudentNumberSequence,
+    generate_student_number, generate_student_numbers, student_number_for,
+)
+from .search import STUDENTS_VERSION_KEY, students_last_modified
+
+
+class StudentSearchTests(TestCase):
+    def setUp(self):
+        Student.objects.create(name='김민준', grade='K7', gender='M', parent_phone='010-1234-5678')
+        self.url = reverse('student_search_api')
+
+    def search(self, q):
+        return [row['name'] for row in self.client.get(self.url, {'q': q}).json()['results']]
+
+    def test_name_choseong_and_phone(self):
+        self.assertEqual(self.search('김민'), ['김민준'])
+        self.assertEqual(self.search('ㄱㅁㅈ'), ['김민준'])
+        self.assertEqual(self.search('김ㅁ'), ['김민준'])
+        self.assertEqual(self.search('5678'), ['김민준'])
+
+    def test_index_follows_db_version(self):
+        self.assertEqual(self.search('ㄱ'), ['김민준'])
+
+        # 다른 워커의 변경: 시그널 없이 DB 만 바뀌고 버전이 올라감
+        Student.objects.filter(name='김민준').update(name='김서준')
+        self.assertEqual(self.search('김서'), [])
+        DataVersion.objects.filter(key=STUDENTS_VERSION_KEY).update(version=F('version') + 1)
+        self.assertEqual(self.search('김서'), ['김서준'])
+
+        # 이 워커의 저장은 시그널로 버전이 올라감
+        Student.objects.create(name='김하준', grade='K7', gender='M')
+        self.assertEqual(self.search('ㄱㅎ'), ['김하준'])
+
+    def test_last_modified_moves_on_save(self):
+        DataVersion.objects.update_or_create(key=STUDENTS_VERSION_KEY,
+                                             defaults={'updated_at': timezone.now() - datetime.timedelta(days=1)})
+        before = students_last_modified()
+        student = Student.objects.get()
+        student.school = '한빛중'
+        student.save()
+        self.assertGreater(students_last_modified(), before)
+
+    def test_student_list_uses_typeahead(self):
+        self.assertContains(self.client.get(reverse('student_list')), self.url)
+
+
+class StudentVersionTests(TestCase):
+    def setUp(self):
+        self.student = Student.objects.create(name='박지우', grade='K8', gender='F')
+
+    def version(self):
+        return DataVersion.versions(STUDENTS_VERSION_KEY)[STUDENTS_VERSION_KEY]
+
+    def test_unpaid_amount_save_keeps_version(self):
+        before = self.version()
+        student = Student.objects.get(pk=self.student.pk)
+        student.unpaid_amount += 10000
+        student.save()
+        self.student.unpaid_amount = 5000
+        self.student.save()
+        self.assertEqual(self.version(), before)
+
+    def test_indexed_field_change_bumps_version(self):
+        before = self.version()
+        student = Student.objects.get(pk=self.student.pk)
+        student.status = 'BREAK'
+        student.save()
+        self.assertEqual(self.version(), before + 1)
+
+        student.save()  # 같은 값으로 다시 저장
+        self.assertEqual(self.version(), before + 1)
+
+        student.delete()
+        self.assertEqual(self.version(), before + 2)
+
+
+class RosterImportTests(TestCase):
+    HEADER = '이름,학교,학년,성별,학생 전화번호,부모님 전화번호,이메일\n'
+
+    def upload(self, *rows):
+        content = self.HEADER + ''.join(row + '\n' for row in rows)
+        return import_roster(SimpleUploadedFile('roster.csv', content.encode('utf-8')))
+
+    def test_normalizes_grade_and_gender(self):
+        result = self.upload('김하나,한빛중,5,남,010 1234 5678,,',
+                             '이두리,한빛중,k7,female,,,')
+        self.assertEqual(result, {'created': 2, 'errors': []})
+        self.assertEqual(
+            list(Student.objects.order_by('name').values_list('name', 'grade', 'gender', 'student_phone', 'school')),
+            [('김하나', 'K5', 'M', '01012345678', '한빛중'), ('이두리', 'K7', 'F', None, '한빛중')],
+        )
+        numbers = list(Student.objects.values_list('student_number', flat=True))
+        self.assertEqual(len(set(numbers)), 2)
+
+    def test_blank_rows_are_skipped(self):
+        result = self.upload('김하나,,K5,M,,,', ',,,,,,', '이두리,,K6,F,,,')
+        self.assertEqual(result['created'], 2)
+
+    def test_error_rows_use_sheet_numbers_and_nothing_is_inserted(self):
+        result = self.upload('김하나,,K5,M,,,',
+                             '이두리,,K13,F,,,',
+                             ',,K6,M,,,',
+                             '박세나,,K7,F,,,not-an-email')
+
+        self.assertEqual(result['created'], 0)
+        self.assertEqual([(error['row'], error['name']) for error in result['errors']],
+                         [(3, '이두리'), (4, ''), (5, '박세나')])
+        self.assertEqual(result['errors'][0]['messages'], ['K5 ~ K12 형식의 학년이 아닙니다.'])
+        self.assertFalse(Student.objects.exists())
+
+
+class StudentNumberTests(TestCase):
+    def setUp(self):
+        student_models._number_pool.clear()
+        self.addCleanup(student_models._number_pool.clear)
+
+    def test_numbers_are_distinct_and_in_range(self):
+        indexes = list(range(5000)) + list(range(STUDENT_NUMBER_SPACE - 100, STUDENT_NUMBER_SPACE))
+        numbers = [student_number_for(index) for index in indexes]
+        self.assertEqual(len(set(numbers)), len(numbers))
+        self.assertTrue(all(STUDENT_NUMBER_MIN <= number < STUDENT_NUMBER_MIN + STUDENT_NUMBER_SPACE
+                            for number in numbers))
+
+    def test_reserved_block_skips_numbers_in_use(self):
+        # 예전 무작위 방식으로 이미 발급된 번호와 겹치는 순번은 건너뜀
+        Student.objects.create(name='기존학생', grade='K7', gender='M', student_number=student_number_for(1))
+
+        numbers = generate_student_numbers(3)
+
+        self.assertEqual(numbers, [student_number_for(index) for index in (0, 2, 3)])
+        self.assertEqual(StudentNumberSequence.objects.get().next_index, 4)
+
+    def test_rolled_back_reservation_is_not_pooled(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            try:
+                with transaction.atomic():
+                    first = generate_student_number()
+                    raise RuntimeError('rollback')
+            except RuntimeError:
+                pass
+        self.assertEqual(len(student_models._number_pool), 0)
+
+        # 예약 자체가 롤백되었으므로 같은 순번부터 다시 예약하고, 커밋된 뒤에만 나머지 번호가 풀에 들어감
+        with self.captureOnCommitCallbacks(execute=True):
+            second = generate_student_number()
+        self.assertEqual(second, first)
+        self.assertEqual(StudentNumberSequence.objects.get().next_index, student_models.STUDENT_NUMBER_BLOCK_SIZE)
+        self.assertEqual(len(set(student_models._number_pool)), student_models.STUDENT_NUMBER_BLOCK_SIZE - 1)
+        self.assertNotIn(second, student_models._number_pool)
+
+
+class StudentListingTests(TestCase):
+    def setUp(self):
+        # 같은 이름 두 명은 pk 로 순서가 정해짐
+        names = ['가영', '나래', '나래', '다인', '라희']
+        self.students = [Student.objects.create(name=name, grade='K7', gender='F') for name in names]
+        Student.objects.create(name='가람', grade='K7', gender='M', status='DISCHARGED')
+
+    def names(self, page):
+        return [(student.name, student.pk) for student in page['students']]
+
+    def expected(self, *indexes):
+        return [(self.students[i].name, self.students[i].pk) for i in indexes]
+
+    def test_default_filter_is_attending_only(self):
+        self.assertEqual(filter_students().count(), 5)
+        self.assertEqual(filter_students(status='ALL').count(), 6)
+
+    def test_next_then_previous_page_breaks_name_ties_by_pk(self):
+        first = keyset_page(filter_students(), size=2)
+        self.assertEqual(self.names(first), self.expected(0, 1))
+        self.assertIsNone(first['prev_cursor'])
+
+        second = keyset_page(filter_students(), after=first['next_cursor'], size=2)
+        self.assertEqual(self.names(second), self.expected(2, 3))
+
+        last = keyset_page(filter_students(), after=second['next_cursor'], size=2)
+        self.assertEqual(self.names(last), self.expected(4))
+        self.assertIsNone(last['next_cursor'])
+
+        back = keyset_page(filter_students(), before=second['prev_cursor'], size=2)
+        self.assertEqual(self.names(back), self.expected(0, 1))
+        self.assertIsNone(back['prev_cursor'])
+        self.assertEqual(back['next_cursor'], encode_cursor(self.students[1]))
+
+    def test_malformed_cursor_falls_back_to_first_page(self):
+        for cursor in ('not-base64!', encode_cursor(self.students[0])[:-3], 'eyJhIjogMX0'):
+            self.assertIsNone(decode_cursor(cursor))
+            page = keyset_page(filter_students(), after=cursor, size=2)
+            self.assertEqual(self.names(page), self.expected(0, 1))
 
-# Create your tests here.
+        response = self.client.get(reverse('student_list'), {'after': 'garbage'})
+        self.assertEqual(len(response.context['students']), 5)
+        self.assertNotContains(response, '가람')
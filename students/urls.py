@@ -7,6 +7,9 @@ urlpatterns = [
     # 학생 목록 페이지 ( /students/ )
     path('', views.student_list, name='student_list'),
 
+    # 학생 검색 API (타입어헤드) ( /students/search/?q=ㄱㅁㅈ )
+    path('search/', views.student_search_api, name='student_search_api'),
+
     # 학생 등록 페이지 ( /students/new/ )
     path('new/', views.student_create, name='student_create'),
 
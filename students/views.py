@@ -1,32 +1,75 @@
 # students/views.py
 
 from django.shortcuts import render, redirect, get_object_or_404
-from .models import Student, StudentFile
+from .models import Student, StudentFile, GRADE_CHOICES
 from .forms import StudentForm, StudentFileForm, SMSForm, StudentClassForm
-import pandas as pd
-from django.http import HttpResponse
+from django.http import HttpResponse, JsonResponse, StreamingHttpResponse, FileResponse
 from datetime import datetime
 from django.contrib import messages
 from core.utils import send_sms # 문자 발송 함수
 from django.db import transaction
 from django.utils import timezone
-from classes.models import TuitionLog
+from classes.models import TuitionLog, billing_period_of
 from classes.models import ClassInfo
+from .search import search_students
+from .importer import import_roster, RosterError
+from .export import iter_students_csv, write_students_xlsx
+from .listing import filter_students, keyset_page, ALL_STATUSES
+from .ledger import build_student_ledger
 import calendar # 이번 달이 며칠까지 있는지 알기 위해 필요
+import tempfile
 
 
 def student_list(request):
-    """학생 목록 조회 뷰 (R)"""
-    # 모든 학생 객체를 'created_at'(등록일)의 역순으로 가져옵니다.
-    students = Student.objects.all().order_by('-created_at')
+    """
+    학생 목록 조회 뷰 (R)
+    상태(기본: 재원)/학년/학교/이름·전화번호로 거르고, 이름순 커서 페이지로 나눠 보여줍니다.
+    """
+    filters = {
+        'status': request.GET.get('status', 'ATTENDING'),
+        'grade': request.GET.get('grade', ''),
+        'school': request.GET.get('school', '').strip(),
+        'query': request.GET.get('q', '').strip(),
+    }
+    page = keyset_page(
+        filter_students(**filters),
+        after=request.GET.get('after'),
+        before=request.GET.get('before'),
+    )
+
+    # 페이지 이동 링크에 붙일 현재 필터
+    filter_params = request.GET.copy()
+    for key in ('after', 'before'):
+        filter_params.pop(key, None)
 
-    # 'student_list.html' 템플릿에 학생 목록을 담아 전달합니다.
     context = {
-        'students': students,
+        'students': page['students'],
+        'next_cursor': page['next_cursor'],
+        'prev_cursor': page['prev_cursor'],
+        'filters': filters,
+        'filter_query': filter_params.urlencode(),
+        'status_choices': Student.STATUS_CHOICES,
+        'grade_choices': GRADE_CHOICES,
+        'all_statuses': ALL_STATUSES,
     }
     return render(request, 'students/student_list.html', context)
 
 
+def student_search_api(request):
+    """
+    학생 타입어헤드 API (?q=ㄱㅁㅈ&limit=20&status=ATTENDING)
+    이름 접두어, 초성 접두어, 전화번호 뒤 4자리로 검색합니다. (프로세스 메모리 색인 사용)
+    """
+    query = request.GET.get('q', '')
+    try:
+        limit = min(max(int(request.GET.get('limit', 20)), 1), 50)
+    except ValueError:
+        limit = 20
+    status = request.GET.get('status') or None
+
+    return JsonResponse({'results': search_students(query, limit=limit, status=status)})
+
+
 def student_create(request):
     """학생 등록 뷰 (C)"""
     if request.method == 'POST':
@@ -73,10 +116,9 @@ def student_update(request, pk):
 
 def student_detail(request, pk):
     """학생 상세 정보 및 파일/교재/수강료 관리"""
-    student = get_object_or_404(Student, pk=pk)
-
     # [수정] 파일 업로드 처리 로직 (다중 파일 지원)
     if request.method == 'POST' and request.FILES:
+        student = get_object_or_404(Student, pk=pk)
         # 폼 데이터 가져오기 (설명은 공통으로 적용됨)
         description = request.POST.get('description', '')
 
@@ -94,24 +136,11 @@ def student_detail(request, pk):
             messages.success(request, f"{len(files)}개의 파일이 업로드되었습니다.")
             return redirect('student_detail', pk=pk)
 
+    # 학생 + 수강/교재/수강료/파일 + 미납 내역 (기록 수와 관계없이 쿼리 수 일정)
+    context = build_student_ledger(pk)
     # GET 요청이거나 파일 업로드가 아닐 때 기본 폼 로드
-    file_form = StudentFileForm()
-
-    # 1. 파일 목록
-    files = student.files.all().order_by('-uploaded_at')
-
-    # 2. 미납금 상세 내역 계산
-    unpaid_book_sales = student.book_sales.filter(is_paid=False)
-    unpaid_book_total = sum(sale.get_total_price() for sale in unpaid_book_sales)
-    unpaid_tuition_total = max(0, student.unpaid_amount - unpaid_book_total)
-
-    return render(request, 'students/student_detail.html', {
-        'student': student,
-        'files': files,
-        'file_form': file_form,
-        'unpaid_book_total': unpaid_book_total,
-        'unpaid_tuition_total': unpaid_tuition_total,
-    })
+    context['file_form'] = StudentFileForm()
+    return render(request, 'students/student_detail.html', context)
 
 
 def student_delete(request, pk):
@@ -149,97 +178,48 @@ def delete_student_file(request, file_pk):
 
 
 def student_bulk_upload(request):
-    """엑셀/CSV 파일을 통한 학생 일괄 등록 뷰"""
+    """엑셀/CSV 파일을 통한 학생 일괄 등록 뷰 (오류가 있으면 행별 오류 목록을 보여주고 등록하지 않음)"""
     if request.method == 'POST' and request.FILES.get('upload_file'):
-        upload_file = request.FILES['upload_file']
-
         try:
-            # 파일 확장자에 따라 읽기 방식 분기
-            if upload_file.name.endswith('.csv'):
-                df = pd.read_csv(upload_file)
-            else:
-                df = pd.read_excel(upload_file)
-
-            # 데이터프레임의 각 행(row)을 반복하며 학생 생성
-            # [주의] 엑셀 파일의 컬럼명(헤더)이 아래와 같아야 합니다.
-            success_count = 0
-            for index, row in df.iterrows():
-                # 필수 값(이름, 학년, 성별)이 없으면 건너뜀 (에러 방지)
-                if pd.isna(row.get('이름')) or pd.isna(row.get('학년')):
-                    continue
-
-                # 성별 변환 (예: '남' -> 'M', '여' -> 'F')
-                gender_input = str(row.get('성별', '')).strip()
-                gender = 'M' if gender_input in ['남', 'M', 'Male'] else 'F'
-
-                Student.objects.create(
-                    name=row.get('이름'),
-                    school=row.get('학교', ''),
-                    grade=row.get('학년'),  # K5 ~ K12
-                    gender=gender,
-                    student_phone=row.get('학생 전화번호', ''),
-                    parent_phone=row.get('부모님 전화번호', ''),
-                    email=row.get('이메일', ''),
-                    # 필요한 필드 추가 매핑 가능
-                )
-                success_count += 1
+            result = import_roster(request.FILES['upload_file'])
+        except RosterError as e:
+            messages.error(request, str(e))
+            return redirect('student_bulk_upload')
 
-            messages.success(request, f'{success_count}명의 학생이 성공적으로 등록되었습니다.')
-            return redirect('student_list')
+        if result['errors']:
+            messages.error(request, f"{len(result['errors'])}개 행에 오류가 있어 등록하지 않았습니다. 수정 후 다시 업로드해 주세요.")
+            return render(request, 'students/student_upload.html', {'row_errors': result['errors']})
 
-        except Exception as e:
-            # 에러 발생 시 메시지 표시
-            messages.error(request, f'파일 업로드 중 오류가 발생했습니다: {e}')
-            return redirect('student_bulk_upload')
+        messages.success(request, f"{result['created']}명의 학생이 성공적으로 등록되었습니다.")
+        return redirect('student_list')
 
     return render(request, 'students/student_upload.html')
 
 
 def student_export(request):
-    """학생 데이터를 엑셀 파일로 내보내는 뷰"""
-    # 1. 모든 학생 데이터 조회
-    students = Student.objects.all().order_by('-created_at')
-
-    # 2. 데이터프레임 생성을 위한 리스트 만들기
-    data = []
-    for s in students:
-        data.append({
-            '고유번호': s.student_number,
-            '이름': s.name,
-            '학교': s.school,
-            '학년': s.grade,
-            '성별': s.get_gender_display(),
-            '학생 전화번호': s.student_phone,
-            '부모님 전화번호': s.parent_phone,
-            '이메일': s.email,
-            '현금영수증 번호': s.receipt_phone,
-            '인터뷰 날짜': s.interview_date,
-            '인터뷰 성적': s.interview_score,
-            '인터뷰 정보': s.interview_info,
-            '첫 수업 날짜': s.first_class_date,
-            '그만 둔 날짜': s.last_class_date,
-            '기타': s.misc,
-            '등록일': s.created_at.strftime('%Y-%m-%d'),
-        })
-
-    # 3. Pandas DataFrame 생성
-    df = pd.DataFrame(data)
-
-    # 4. 응답(Response) 객체 생성 (엑셀 파일 형식)
-    response = HttpResponse(content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet')
-
-    # 5. 파일 이름 생성 (현재 날짜와 시간 이용)
-    # 예: Student_DB_20251119_143000.xlsx
+    """
+    학생 데이터를 엑셀(기본) 또는 CSV(?format=csv) 파일로 내보내는 뷰.
+    학생을 묶음 단위로 읽어 쓰므로 학생 수가 많아도 메모리가 일정합니다.
+    - CSV: 읽는 대로 바로 전송 (다운로드 즉시 시작)
+    - 엑셀: openpyxl 쓰기 전용 모드로 임시 파일에 쓴 뒤 파일을 조각 단위로 전송
+    """
+    # 파일 이름 생성 (현재 날짜와 시간 이용) 예: Student_DB_20251119_143000.xlsx
     current_time = datetime.now().strftime('%Y%m%d_%H%M%S')
-    filename = f'Student_DB_{current_time}.xlsx'
 
-    # 6. 헤더 설정 (다운로드 창 띄우기)
-    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    if request.GET.get('format') == 'csv':
+        response = StreamingHttpResponse(iter_students_csv(), content_type='text/csv; charset=utf-8')
+        response['Content-Disposition'] = f'attachment; filename="Student_DB_{current_time}.csv"'
+        return response
 
-    # 7. 데이터프레임을 엑셀로 변환하여 응답에 쓰기
-    df.to_excel(response, index=False)
-
-    return response
+    export_file = tempfile.TemporaryFile()
+    write_students_xlsx(export_file)
+    export_file.seek(0)
+    return FileResponse(
+        export_file,
+        as_attachment=True,
+        filename=f'Student_DB_{current_time}.xlsx',
+        content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+    )
 
 
 def student_sms_send(request, pk):
@@ -314,8 +294,16 @@ def student_class_edit(request, pk):
 
             try:
                 with transaction.atomic():
+                    # 같은 청구월에 이미 청구서가 있는 수업(재등록 등)은 다시 청구하지 않음
+                    period = billing_period_of(start_date)
+                    already_charged = set(TuitionLog.objects.filter(
+                        student=student, class_info__in=to_add, billing_period=period
+                    ).values_list('class_info_id', flat=True))
+
                     # [로직 1] 추가된 수업: 'start_date' 기준으로 일할 계산
                     for class_obj in to_add:
+                        if class_obj.pk in already_charged:
+                            continue
                         # 1일이면 전액, 아니면 일할 계산
                         if start_date.day == 1:
                             charge_amount = class_obj.tuition_fee
@@ -338,6 +326,7 @@ def student_class_edit(request, pk):
                             # [중요] 오늘 날짜가 아니라 '선택한 날짜'로 기록
                             charge_date=start_date,
                             month=f"{start_date.month}월 수강료",
+                            billing_period=period,
                             memo=memo_text
                         )
                         student.unpaid_amount += charge_amount
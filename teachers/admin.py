@@ -2,7 +2,24 @@
 
 from django.contrib import admin
 from .models import Teacher, TeacherWorkRecord, TeacherUnavailable
+from .signals import unavailable_changed
 
 admin.site.register(Teacher)
-admin.site.register(TeacherWorkRecord)
-admin.site.register(TeacherUnavailable)
\ No newline at end of file
+
+
+@admin.register(TeacherWorkRecord)
+class TeacherWorkRecordAdmin(admin.ModelAdmin):
+    def delete_queryset(self, request, queryset):
+        # 일괄 삭제 시에도 월간 근무 집계가 갱신되도록 개별 delete() 호출
+        for record in queryset:
+            record.delete()
+
+@admin.register(TeacherUnavailable)
+class TeacherUnavailableAdmin(admin.ModelAdmin):
+    def delete_queryset(self, request, queryset):
+        # queryset.delete() 는 모델 delete() 를 거치지 않으므로 삭제된 날짜를 직접 알림
+        # (근무 불가 Last-Modified, 스케줄 날짜 리비전/그리드 캐시 갱신)
+        dates = sorted(set(queryset.values_list('date', flat=True)))
+        queryset.delete()
+        if dates:
+            unavailable_changed.send(sender=TeacherUnavailable, dates=dates)
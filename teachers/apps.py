@@ -4,3 +4,11 @@ from django.apps import AppConfig
 class TeachersConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'teachers'
+
+    def ready(self):
+        # PDF 용 한글 폰트는 요청마다가 아니라 프로세스 시작 시 한 번만 등록
+        from .pdf import register_fonts
+        register_fonts()
+
+        # 근무 불가 일정 변경 알림 수신기 등록
+        from . import availability  # noqa: F401
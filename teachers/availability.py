@@ -0,0 +1,76 @@
+# teachers/availability.py
+
+import hashlib
+import json
+from django.dispatch import receiver
+from core.models import DataVersion
+from .models import TeacherUnavailable
+from .payroll import month_bounds
+from .signals import unavailable_changed
+
+
+def _version_key(year, month):
+    return f"unavailable:{year}-{month:02d}"
+
+
+@receiver(unavailable_changed)
+def touch_unavailable_months(sender, dates, **kwargs):
+    """
+    근무 불가 일정이 바뀐 달의 버전/수정 시각을 올립니다. (Last-Modified 용)
+    DB 에 기록하므로 워커가 여러 개여도 모두 같은 값을 보며, 저장 트랜잭션과 함께 커밋/롤백됩니다.
+    """
+    DataVersion.bump(*{_version_key(d.year, d.month) for d in dates})
+
+
+def month_last_modified(year, month):
+    """해당 월 근무 불가 일정의 최종 수정 시각 (기록이 없으면 지금 시각으로 시작)"""
+    return DataVersion.last_modified(_version_key(year, month))
+
+
+def month_unavailable_bitmap(year, month):
+    """
+    해당 월의 교사별 근무 불가일 비트맵을 쿼리 1회로 만듭니다.
+    비트 (일 - 1) 이 1 이면 그 날 근무 불가. 예: 1일, 3일 불가 -> 0b101 = 5
+
+    :return: {teacher_id: bitmap}
+    """
+    first_day, next_first_day = month_bounds(year, month)
+    bitmap = {}
+    for teacher_id, date in TeacherUnavailable.objects.filter(
+        date__gte=first_day, date__lt=next_first_day
+    ).values_list('teacher_id', 'date'):
+        bitmap[teacher_id] = bitmap.get(teacher_id, 0) | (1 << (date.day - 1))
+    return bitmap
+
+
+def bitmap_etag(year, month, bitmap):
+    payload = json.dumps([year, month, sorted(bitmap.items())])
+    return hashlib.md5(payload.encode('utf-8')).hexdigest()
+
+
+def create_unavailable_range(teacher_ids, dates, reason=None):
+    """
+    여러 교사의 근무 불가 일정을 기간 단위로 한 번에 등록합니다.
+    이미 등록된 (교사, 날짜)는 건너뜁니다.
+
+    :return: (created_count, skipped_count)
+    """
+    if not teacher_ids or not dates:
+        return 0, 0
+
+    existing = set(TeacherUnavailable.objects.filter(
+        teacher_id__in=teacher_ids, date__in=dates
+    ).values_list('teacher_id', 'date'))
+
+    new_items = [
+        TeacherUnavailable(teacher_id=teacher_id, date=date, reason=reason)
+        for teacher_id in teacher_ids
+        for date in dates
+        if (teacher_id, date) not in existing
+    ]
+    TeacherUnavailable.objects.bulk_create(new_items, batch_size=500)
+
+    if new_items:
+        # bulk_create 는 save() 를 거치지 않으므로 직접 알림
+        unavailable_changed.send(sender=TeacherUnavailable, dates=sorted({item.date for item in new_items}))
+    return len(new_items), len(existing)
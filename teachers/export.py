@@ -0,0 +1,111 @@
+# teachers/export.py
+
+import os
+import zipfile
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from itertools import groupby
+from .models import TeacherWorkRecord, calculate_shift_minutes
+from .payroll import month_bounds
+from .pdf import draw_work_history_pdf, register_fonts
+
+
+def collect_work_history_jobs(year, month):
+    """
+    재직 중인 모든 교사의 해당 월 근무 기록을 쿼리 1회로 가져와
+    교사별 PDF 작업 목록 [(파일명, 교사명, 'YYYY-MM', rows), ...] 으로 묶습니다.
+    (근무 기록이 없는 교사는 제외)
+    """
+    first_day, next_first_day = month_bounds(year, month)
+    date_str = f"{year}-{month:02d}"
+
+    records = (
+        TeacherWorkRecord.objects.filter(
+            teacher__status='ACTIVE', date__gte=first_day, date__lt=next_first_day
+        )
+        .order_by('teacher__name', 'teacher_id', '-date')
+        .values_list('teacher_id', 'teacher__name', 'date', 'start_time', 'end_time', 'memo')
+    )
+
+    jobs = []
+    for (teacher_id, teacher_name), rows in groupby(records, key=lambda r: (r[0], r[1])):
+        pdf_rows = [
+            (date, start, end, round(calculate_shift_minutes(start, end) / 60, 2), memo or "")
+            for _, _, date, start, end, memo in rows
+        ]
+        filename = f"WorkHistory_{teacher_name}_{teacher_id}_{date_str}.pdf"
+        jobs.append((filename, teacher_name, date_str, pdf_rows))
+    return jobs
+
+
+def _init_worker():
+    """작업 프로세스 시작 시 Django 설정과 폰트를 한 번만 준비합니다."""
+    import django
+    from django.apps import apps
+    if not apps.ready:
+        django.setup()
+    register_fonts()
+
+
+def _render_job(job):
+    filename, teacher_name, date_str, rows = job
+    return filename, draw_work_history_pdf(teacher_name, date_str, rows)
+
+
+def _render_parallel(jobs, workers):
+    """
+    프로세스 풀에서 PDF 를 렌더링하고 완료된 순서대로 돌려줍니다.
+    동시에 처리 중인 작업 수를 workers * 2 로 제한해 교사 수가 많아도 메모리가 일정합니다.
+    """
+    if workers <= 1 or len(jobs) <= 1:
+        for job in jobs:
+            yield _render_job(job)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+        pending = set()
+        job_iter = iter(jobs)
+        for job in job_iter:
+            pending.add(pool.submit(_render_job, job))
+            if len(pending) >= workers * 2:
+                break
+
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield future.result()
+            for job in job_iter:
+                pending.add(pool.submit(_render_job, job))
+                if len(pending) >= workers * 2:
+                    break
+
+
+class _ZipChunkBuffer:
+    """zipfile 이 쓰는 바이트를 모아두었다가 스트리밍 응답으로 흘려보내기 위한 버퍼 (seek 불가)"""
+
+    def __init__(self):
+        self._chunks = []
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def pop(self):
+        data = b''.join(self._chunks)
+        self._chunks = []
+        return data
+
+
+def iter_work_history_zip(year, month, workers=None):
+    """해당 월 전체 교사 근무 기록 PDF 를 만들어지는 대로 ZIP 스트림 조각으로 내보냅니다."""
+    jobs = collect_work_history_jobs(year, month)
+    workers = workers or os.cpu_count() or 1
+
+    buffer = _ZipChunkBuffer()
+    with zipfile.ZipFile(buffer, 'w', compression=zipfile.ZIP_DEFLATED) as zf:
+        for filename, pdf in _render_parallel(jobs, workers):
+            zf.writestr(filename, pdf)
+            yield buffer.pop()
+    yield buffer.pop()
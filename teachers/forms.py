@@ -2,6 +2,7 @@
 
 from django import forms
 from .models import Teacher, TeacherWorkRecord, TeacherUnavailable
+from .work_entry import check_date_range
 
 class TeacherForm(forms.ModelForm):
     class Meta:
@@ -9,7 +10,7 @@ class TeacherForm(forms.ModelForm):
         fields = [
             'name', 'gender', 'phone', 'email',
             'hire_date', 'resign_date', 'status',
-            'base_pay', 'extra_pay',
+            'base_pay', 'extra_pay', 'daily_capacity',
             'bank_name', 'account_number'
         ]
         widgets = {
@@ -32,6 +33,23 @@ class WorkRecordForm(forms.ModelForm):
 
 class UnavailableForm(forms.ModelForm):
     """근무 불가 일정 입력 폼"""
+    # 기간 등록용 종료 날짜 (DB 저장 안 함, 입력 시 시작~종료일 일괄 등록)
+    end_date = forms.DateField(
+        widget=forms.DateInput(attrs={'type': 'date'}),
+        label="종료 날짜",
+        required=False,
+    )
+
+    def clean(self):
+        cleaned_data = super().clean()
+        start_date, end_date = cleaned_data.get('date'), cleaned_data.get('end_date')
+        if start_date and end_date and end_date > start_date:
+            try:
+                check_date_range(start_date, end_date)
+            except ValueError as e:
+                self.add_error('end_date', str(e))
+        return cleaned_data
+
     class Meta:
         model = TeacherUnavailable
         fields = ['date', 'reason']
@@ -0,0 +1,21 @@
+# teachers/management/commands/backfill_work_minutes.py
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from teachers.models import TeacherWorkRecord, TeacherMonthlyWork, shift_minutes_expression
+
+
+class Command(BaseCommand):
+    help = "기존 근무 기록의 근무 시간(분)을 채우고 교사별 월간 근무 집계를 다시 만듭니다."
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            # 1. 근무 시간(분)을 DB 에서 한 번의 UPDATE 로 계산
+            updated = TeacherWorkRecord.objects.update(duration_minutes=shift_minutes_expression())
+
+            # 2. 월별 집계 재생성
+            rollups = TeacherMonthlyWork.rebuild()
+
+        self.stdout.write(self.style.SUCCESS(
+            f"근무 기록 {updated}건의 근무 시간을 갱신하고, 월간 집계 {rollups}건을 생성했습니다."
+        ))
@@ -0,0 +1,30 @@
+# teachers/management/commands/export_work_history.py
+
+import datetime
+from django.core.management.base import BaseCommand, CommandError
+from teachers.export import iter_work_history_zip
+
+
+class Command(BaseCommand):
+    help = "재직 교사 전체의 월간 근무 기록 PDF 를 병렬로 만들어 하나의 ZIP 파일로 저장합니다."
+
+    def add_arguments(self, parser):
+        today = datetime.date.today()
+        parser.add_argument('--year', type=int, default=today.year, help="년도 (기본: 올해)")
+        parser.add_argument('--month', type=int, default=today.month, help="월 (기본: 이번 달)")
+        parser.add_argument('--workers', type=int, default=None, help="PDF 렌더링 프로세스 수 (기본: CPU 코어 수)")
+        parser.add_argument('--output', default=None, help="저장할 ZIP 경로 (기본: WorkHistory_YYYY_MM.zip)")
+
+    def handle(self, *args, **options):
+        year, month = options['year'], options['month']
+        if not 1 <= month <= 12:
+            raise CommandError("월은 1~12 사이여야 합니다.")
+
+        output = options['output'] or f"WorkHistory_{year}_{month:02d}.zip"
+        size = 0
+        with open(output, 'wb') as f:
+            for chunk in iter_work_history_zip(year, month, workers=options['workers']):
+                f.write(chunk)
+                size += len(chunk)
+
+        self.stdout.write(self.style.SUCCESS(f"{output} 저장 완료 ({size:,} bytes)"))
@@ -0,0 +1,66 @@
+# Generated by Django 5.2.8 on 2026-10-17 01:00
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Case, Count, F, IntegerField, Sum, Value, When
+from django.db.models.functions import ExtractHour, ExtractMinute, TruncMonth
+
+
+def backfill_work_minutes(apps, schema_editor):
+    """기존 근무 기록의 근무 시간(분)과 월간 집계를 채웁니다. (manage.py backfill_work_minutes 와 동일)"""
+    TeacherWorkRecord = apps.get_model('teachers', 'TeacherWorkRecord')
+    TeacherMonthlyWork = apps.get_model('teachers', 'TeacherMonthlyWork')
+
+    # 모델 코드가 바뀌어도 이 마이그레이션 결과가 달라지지 않도록 계산식을 여기에 고정 (자정을 넘기면 24시간 더함)
+    diff = (ExtractHour('end_time') * 60 + ExtractMinute('end_time')) - (
+        ExtractHour('start_time') * 60 + ExtractMinute('start_time')
+    )
+    TeacherWorkRecord.objects.update(duration_minutes=Case(
+        When(end_time__lt=F('start_time'), then=diff + Value(24 * 60)),
+        default=diff,
+        output_field=IntegerField(),
+    ))
+
+    rows = (
+        TeacherWorkRecord.objects.annotate(work_month=TruncMonth('date'))
+        .values('teacher_id', 'work_month')
+        .annotate(days=Count('id'), minutes=Sum('duration_minutes'))
+        .order_by()
+    )
+    TeacherMonthlyWork.objects.bulk_create([
+        TeacherMonthlyWork(teacher_id=row['teacher_id'], month=row['work_month'],
+                           work_days=row['days'], total_minutes=row['minutes'])
+        for row in rows
+    ], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('teachers', '0003_teacher_status'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='teacherworkrecord',
+            name='duration_minutes',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='근무 시간(분)'),
+        ),
+        migrations.CreateModel(
+            name='TeacherMonthlyWork',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('month', models.DateField(verbose_name='해당 월')),
+                ('work_days', models.IntegerField(default=0, verbose_name='근무 건수')),
+                ('total_minutes', models.IntegerField(default=0, verbose_name='총 근무 시간(분)')),
+                ('teacher', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='monthly_work', to='teachers.teacher', verbose_name='교사')),
+            ],
+            options={
+                'verbose_name': '월간 근무 집계',
+                'verbose_name_plural': '월간 근무 집계',
+                'ordering': ['-month'],
+                'unique_together': {('teacher', 'month')},
+            },
+        ),
+        migrations.RunPython(backfill_work_minutes, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.8 on 2026-10-17 03:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('teachers', '0004_teachermonthlywork_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='teacher',
+            name='daily_capacity',
+            field=models.PositiveSmallIntegerField(default=0, help_text='0 이면 제한 없음', verbose_name='일일 최대 담당 학생 수'),
+        ),
+    ]
@@ -1,8 +1,33 @@
 # teachers/models.py
 
-from django.db import models
+from django.db import models, transaction, IntegrityError
+from django.db.models import Case, Count, F, IntegerField, Sum, Value, When
+from django.db.models.functions import ExtractHour, ExtractMinute, TruncMonth
 from django.utils import timezone
 import datetime
+from core.models import DataVersion
+from .signals import unavailable_changed, work_records_changed
+
+
+def calculate_shift_minutes(start_time, end_time):
+    """근무 시간(분) 계산. 종료 시간이 시작 시간보다 빠르면 다음날로 간주합니다. (야간 근무 등)"""
+    start = start_time.hour * 60 + start_time.minute
+    end = end_time.hour * 60 + end_time.minute
+    if end < start:
+        end += 24 * 60
+    return end - start
+
+
+def shift_minutes_expression(prefix=''):
+    """calculate_shift_minutes 와 같은 계산을 DB 에서 수행하는 표현식"""
+    start = f'{prefix}start_time'
+    end = f'{prefix}end_time'
+    diff = (ExtractHour(end) * 60 + ExtractMinute(end)) - (ExtractHour(start) * 60 + ExtractMinute(start))
+    return Case(
+        When(**{f'{end}__lt': F(start)}, then=diff + Value(24 * 60)),
+        default=diff,
+        output_field=IntegerField(),
+    )
 
 
 class Teacher(models.Model):
@@ -27,12 +52,30 @@ class Teacher(models.Model):
     base_pay = models.PositiveIntegerField(default=0, verbose_name="급여 기준(시급/건별)")
     extra_pay = models.PositiveIntegerField(default=0, verbose_name="추가 급여")
 
+    # 스케줄 자동 배정 시 하루 최대 담당 학생 수 (0 = 제한 없음)
+    daily_capacity = models.PositiveSmallIntegerField(default=0, verbose_name="일일 최대 담당 학생 수",
+                                                      help_text="0 이면 제한 없음")
+
     # 계좌 정보
     bank_name = models.CharField(max_length=50, verbose_name="거래은행")
     account_number = models.CharField(max_length=50, verbose_name="급여계좌번호")
 
     created_at = models.DateTimeField(auto_now_add=True, verbose_name="등록일")
 
+    # 교사 이름/상태가 바뀌면 연간 급여 대장 등 교사 정보가 들어간 캐시를 무효화하는 버전 키
+    VERSION_KEY = 'teachers'
+
+    def save(self, *args, **kwargs):
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            DataVersion.bump(self.VERSION_KEY)
+
+    def delete(self, *args, **kwargs):
+        with transaction.atomic():
+            result = super().delete(*args, **kwargs)
+            DataVersion.bump(self.VERSION_KEY)
+        return result
+
     def __str__(self):
         return self.name
 
@@ -50,23 +93,40 @@ class TeacherWorkRecord(models.Model):
     start_time = models.TimeField(verbose_name="시작 시간", default=datetime.time(18, 0))
     end_time = models.TimeField(verbose_name="종료 시간", default=datetime.time(20, 0))
 
-    # 실제 근무 시간 (분 단위 혹은 시간 단위로 계산하여 저장할 수도 있지만, 시작/종료 시간으로 계산 가능)
+    # 실제 근무 시간 (분 단위) - 저장 시 시작/종료 시간으로 자동 계산
+    duration_minutes = models.PositiveIntegerField(default=0, editable=False, verbose_name="근무 시간(분)")
 
     memo = models.CharField(max_length=200, blank=True, null=True, verbose_name="비고")
 
     def get_work_hours(self):
         """근무 시간 계산 (시간 단위, 소수점 포함)"""
-        # 날짜를 임의로 결합하여 시간 차이 계산
-        dummy_date = datetime.date(2000, 1, 1)
-        start = datetime.datetime.combine(dummy_date, self.start_time)
-        end = datetime.datetime.combine(dummy_date, self.end_time)
+        return round(calculate_shift_minutes(self.start_time, self.end_time) / 60, 2)  # 시간을 소수점 2자리까지 반환
+
+    def save(self, *args, **kwargs):
+        # 폼/POST 문자열 값이 들어와도 계산할 수 있도록 파이썬 객체로 변환
+        for field_name in ('date', 'start_time', 'end_time'):
+            field = self._meta.get_field(field_name)
+            setattr(self, field_name, field.to_python(getattr(self, field_name)))
+        self.duration_minutes = calculate_shift_minutes(self.start_time, self.end_time)
+
+        with transaction.atomic():
+            old = None
+            if self.pk:
+                old = TeacherWorkRecord.objects.filter(pk=self.pk).values(
+                    'teacher_id', 'date', 'duration_minutes'
+                ).first()
+            super().save(*args, **kwargs)
 
-        # 종료 시간이 시작 시간보다 빠르면 다음날로 간주 (야간 근무 등)
-        if end < start:
-            end += datetime.timedelta(days=1)
+            # 월별 집계 테이블 증분 갱신 (수정이면 이전 값을 빼고 새 값을 더함)
+            if old:
+                TeacherMonthlyWork.add(old['teacher_id'], old['date'], -1, -old['duration_minutes'])
+            TeacherMonthlyWork.add(self.teacher_id, self.date, 1, self.duration_minutes)
 
-        diff = end - start
-        return round(diff.total_seconds() / 3600, 2)  # 시간을 소수점 2자리까지 반환
+    def delete(self, *args, **kwargs):
+        with transaction.atomic():
+            result = super().delete(*args, **kwargs)
+            TeacherMonthlyWork.add(self.teacher_id, self.date, -1, -self.duration_minutes)
+        return result
 
     def __str__(self):
         return f"{self.teacher.name} - {self.date} ({self.start_time}~{self.end_time})"
@@ -77,12 +137,111 @@ class TeacherWorkRecord(models.Model):
         ordering = ['-date']  # 최신 날짜 순 정렬
 
 
+class TeacherMonthlyWork(models.Model):
+    """교사별 월간 근무 집계 (TeacherWorkRecord 저장/삭제 시 증분 갱신)"""
+    teacher = models.ForeignKey(Teacher, on_delete=models.CASCADE, related_name="monthly_work", verbose_name="교사")
+    month = models.DateField(verbose_name="해당 월")  # 해당 월 1일
+    work_days = models.IntegerField(default=0, verbose_name="근무 건수")
+    total_minutes = models.IntegerField(default=0, verbose_name="총 근무 시간(분)")
+
+    @property
+    def total_hours(self):
+        return round(self.total_minutes / 60, 2)
+
+    @classmethod
+    def add(cls, teacher_id, date, days, minutes):
+        """(교사, 월) 집계에 근무 건수/시간 증감분을 반영합니다."""
+        month = date.replace(day=1)
+        transaction.on_commit(lambda: work_records_changed.send(sender=cls, months=[month]))
+        updated = cls.objects.filter(teacher_id=teacher_id, month=month).update(
+            work_days=F('work_days') + days,
+            total_minutes=F('total_minutes') + minutes,
+        )
+        if updated:
+            return
+        try:
+            with transaction.atomic():
+                cls.objects.create(teacher_id=teacher_id, month=month, work_days=days, total_minutes=minutes)
+        except IntegrityError:
+            # 동시에 다른 요청이 먼저 생성한 경우
+            cls.objects.filter(teacher_id=teacher_id, month=month).update(
+                work_days=F('work_days') + days,
+                total_minutes=F('total_minutes') + minutes,
+            )
+
+    @classmethod
+    def add_many(cls, deltas):
+        """
+        여러 (교사, 월) 집계에 증감분을 한 번에 반영합니다. (bulk_create 된 근무 기록용)
+        :param deltas: {(teacher_id, month_first_day): (days, minutes)}
+        """
+        if not deltas:
+            return
+        months = sorted({month for _, month in deltas})
+        transaction.on_commit(lambda: work_records_changed.send(sender=cls, months=months))
+        with transaction.atomic():
+            existing = {
+                (obj.teacher_id, obj.month): obj
+                for obj in cls.objects.select_for_update().filter(
+                    teacher_id__in={key[0] for key in deltas},
+                    month__in={key[1] for key in deltas},
+                )
+            }
+            to_update, to_create = [], []
+            for (teacher_id, month), (days, minutes) in deltas.items():
+                obj = existing.get((teacher_id, month))
+                if obj:
+                    obj.work_days += days
+                    obj.total_minutes += minutes
+                    to_update.append(obj)
+                else:
+                    to_create.append(cls(teacher_id=teacher_id, month=month, work_days=days, total_minutes=minutes))
+            cls.objects.bulk_update(to_update, ['work_days', 'total_minutes'], batch_size=500)
+            cls.objects.bulk_create(to_create, batch_size=500)
+
+    @classmethod
+    def rebuild(cls):
+        """전체 근무 기록으로부터 월별 집계를 다시 계산합니다. (그룹 쿼리 1회)"""
+        rows = (
+            TeacherWorkRecord.objects.annotate(work_month=TruncMonth('date'))
+            .values('teacher_id', 'work_month')
+            .annotate(days=Count('id'), minutes=Sum('duration_minutes'))
+            .order_by()
+        )
+        with transaction.atomic():
+            cls.objects.all().delete()
+            return len(cls.objects.bulk_create([
+                cls(teacher_id=row['teacher_id'], month=row['work_month'],
+                    work_days=row['days'], total_minutes=row['minutes'])
+                for row in rows
+            ], batch_size=500))
+
+    def __str__(self):
+        return f"{self.teacher.name} - {self.month:%Y-%m} ({self.total_hours}h)"
+
+    class Meta:
+        unique_together = ('teacher', 'month')
+        verbose_name = "월간 근무 집계"
+        verbose_name_plural = "월간 근무 집계"
+        ordering = ['-month']
+
+
 class TeacherUnavailable(models.Model):
     """근무 불가능한 날짜 관리"""
     teacher = models.ForeignKey(Teacher, on_delete=models.CASCADE, related_name="unavailable_dates", verbose_name="교사")
     date = models.DateField(verbose_name="근무 불가 날짜")
     reason = models.CharField(max_length=200, blank=True, null=True, verbose_name="사유")
 
+    def save(self, *args, **kwargs):
+        self.date = self._meta.get_field('date').to_python(self.date)
+        super().save(*args, **kwargs)
+        unavailable_changed.send(sender=TeacherUnavailable, dates=[self.date])
+
+    def delete(self, *args, **kwargs):
+        result = super().delete(*args, **kwargs)
+        unavailable_changed.send(sender=TeacherUnavailable, dates=[self.date])
+        return result
+
     def __str__(self):
         return f"{self.teacher.name} - {self.date} (불가)"
 
@@ -107,5 +266,26 @@ class TeacherPaymentRecord(models.Model):
         verbose_name_plural = "급여 지급 기록"
         ordering = ['-payment_date']
 
+    @staticmethod
+    def year_version_key(year):
+        """연간 급여 대장 버전 키 (DataVersion)"""
+        return f"payroll:{year}"
+
+    @classmethod
+    def invalidate_year(cls, *years):
+        """해당 연도 급여 대장 버전을 올립니다. (모든 워커의 캐시가 함께 무효화됨)"""
+        DataVersion.bump(*[cls.year_version_key(year) for year in years])
+
+    def save(self, *args, **kwargs):
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            self.invalidate_year(self.year)
+
+    def delete(self, *args, **kwargs):
+        with transaction.atomic():
+            result = super().delete(*args, **kwargs)
+            self.invalidate_year(self.year)
+        return result
+
     def __str__(self):
         return f"{self.teacher.name} - {self.year}-{self.month} ({'지급 완료' if self.is_paid else '미지급'})"
\ No newline at end of file
@@ -0,0 +1,209 @@
+# teachers/payroll.py
+
+import datetime
+from collections import defaultdict, namedtuple
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.db.models import Count, Q, Sum
+from django.db.models.functions import Coalesce
+from core.models import DataVersion
+from .models import Teacher, TeacherPaymentRecord, TeacherWorkRecord
+
+
+# 급여 화면/PDF/일괄 지급이 공유하는 한 줄 단위 급여 데이터
+PayrollRow = namedtuple('PayrollRow', [
+    'teacher', 'bank_name', 'account_number',
+    'work_days', 'work_minutes', 'work_hours',
+    'base_pay_rate', 'base_salary', 'extra_pay', 'total_salary',
+    'is_paid', 'payment_date',
+])
+
+
+def month_bounds(year, month):
+    """해당 월의 첫날과 다음 달 첫날을 반환합니다."""
+    first_day = datetime.date(year, month, 1)
+    if month == 12:
+        return first_day, datetime.date(year + 1, 1, 1)
+    return first_day, datetime.date(year, month + 1, 1)
+
+
+def paid_centi_hours(minutes):
+    """근무 기록 1건의 급여 시간 (0.01시간 단위). 기록별로 round(분 / 60, 2) 한 값과 같습니다."""
+    return round(minutes * 100 / 60)
+
+
+def calculate_payroll_data(year, month):
+    """
+    급여 계산 공통 함수.
+    교사별 근무 건수/근무 시간은 월간 집계(TeacherMonthlyWork)에서 쿼리 1회,
+    급여 시간은 근무 기록의 (교사, 근무 시간)별 건수에서 쿼리 1회,
+    지급 상태는 쿼리 1회로 가져옵니다.
+
+    기본급 = (기록별로 소수점 둘째 자리에서 반올림한 근무 시간의 합) x 시급 (원 미만 버림)
+    예: 20분 근무, 시급 15,000 -> 0.33시간 x 15,000 = 4,950원
+    이미 지급된 달의 금액(amount_paid)과 맞도록 기존 계산 방식을 그대로 유지합니다.
+    """
+    first_day, next_first_day = month_bounds(year, month)
+    in_month = Q(monthly_work__month=first_day)
+
+    # 1. 교사 + 월간 근무 집계 (입사월이 계산 월 이후인 교사는 제외)
+    teachers = (
+        Teacher.objects.filter(hire_date__lt=next_first_day)
+        .annotate(
+            month_work_days=Coalesce(Sum('monthly_work__work_days', filter=in_month), 0),
+            month_work_minutes=Coalesce(Sum('monthly_work__total_minutes', filter=in_month), 0),
+        )
+        .order_by('name')
+    )
+
+    # 2. 교사별 급여 시간 (0.01시간 단위 정수) - 같은 근무 시간끼리 묶어 기록별 반올림을 합산
+    centi_hours = defaultdict(int)
+    for teacher_id, minutes, count in (
+        TeacherWorkRecord.objects.filter(date__gte=first_day, date__lt=next_first_day)
+        .values('teacher_id', 'duration_minutes').annotate(count=Count('id'))
+        .values_list('teacher_id', 'duration_minutes', 'count').order_by()
+    ):
+        centi_hours[teacher_id] += paid_centi_hours(minutes) * count
+
+    # 3. 해당 월 지급 기록
+    payments = {
+        teacher_id: (is_paid, payment_date)
+        for teacher_id, is_paid, payment_date in TeacherPaymentRecord.objects.filter(
+            year=year, month=month
+        ).values_list('teacher_id', 'is_paid', 'payment_date')
+    }
+
+    payroll_data = []
+    for teacher in teachers:
+        work_days = teacher.month_work_days
+        if work_days == 0 and teacher.extra_pay == 0:
+            continue
+
+        minutes = teacher.month_work_minutes
+        hours = centi_hours[teacher.pk]
+        base_salary = hours * teacher.base_pay // 100
+        is_paid, payment_date = payments.get(teacher.pk, (False, None))
+
+        payroll_data.append(PayrollRow(
+            teacher=teacher,
+            bank_name=teacher.bank_name,
+            account_number=teacher.account_number,
+            work_days=work_days,
+            work_minutes=minutes,
+            work_hours=hours / 100,
+            base_pay_rate=teacher.base_pay,
+            base_salary=base_salary,
+            extra_pay=teacher.extra_pay,
+            total_salary=base_salary + teacher.extra_pay,
+            # 지급 상태 정보
+            is_paid=is_paid,
+            payment_date=payment_date,
+        ))
+    return payroll_data
+
+
+def bulk_process_payments(year, month, payment_date):
+    """
+    미지급 급여를 일괄 지급 처리합니다.
+    (teacher, year, month) 유니크 키에 대한 다중 행 upsert 한 번으로 처리하며,
+    새로 생성된 건과 기존 기록이 갱신된 건을 구분해 반환합니다.
+
+    :return: (inserted, updated) - 각각 PayrollRow 리스트
+    """
+    payroll_data = calculate_payroll_data(year, month)
+    # 미지급 상태이고, 근무 기록 또는 추가 급여가 있는 경우에만 처리
+    targets = [row for row in payroll_data if not row.is_paid and (row.work_hours > 0 or row.extra_pay > 0)]
+    if not targets:
+        return [], []
+
+    upsert_options = {
+        'update_conflicts': True,
+        'update_fields': ['amount_paid', 'payment_date', 'is_paid'],
+    }
+    # PostgreSQL/SQLite 는 충돌 기준 컬럼 지정 필요 (MySQL/MariaDB 는 유니크 키로 자동 판단)
+    if connection.features.supports_update_conflicts_with_target:
+        upsert_options['unique_fields'] = ['teacher', 'year', 'month']
+
+    with transaction.atomic():
+        # 대상 교사 행을 먼저 잠가 동시에 실행된 일괄 지급을 교사 단위로 직렬화
+        # (아직 지급 기록이 없는 교사는 잠글 기록 행이 없으므로)
+        list(Teacher.objects.select_for_update().filter(pk__in=[row.teacher.pk for row in targets])
+             .order_by('pk').values_list('pk', flat=True))
+        # 기존 기록 상태를 잠금과 함께 1회 조회 - 그 사이 다른 요청이 지급 처리한 교사는 제외
+        existing = dict(
+            TeacherPaymentRecord.objects.select_for_update()
+            .filter(year=year, month=month, teacher__in=[row.teacher for row in targets])
+            .values_list('teacher_id', 'is_paid')
+        )
+        targets = [row for row in targets if not existing.get(row.teacher.pk, False)]
+        if not targets:
+            return [], []
+
+        TeacherPaymentRecord.objects.bulk_create([
+            TeacherPaymentRecord(
+                teacher=row.teacher, year=year, month=month,
+                amount_paid=row.total_salary, payment_date=payment_date, is_paid=True,
+            )
+            for row in targets
+        ], batch_size=500, **upsert_options)
+        TeacherPaymentRecord.invalidate_year(year)
+
+    # 새로 생성된 건 / 미지급 상태로 남아 있던 기록이 갱신된 건
+    inserted = [row for row in targets if row.teacher.pk not in existing]
+    updated = [row for row in targets if row.teacher.pk in existing]
+    return inserted, updated
+
+
+# 연간 급여 대장 캐시 유지 시간 (지급 기록/교사 저장/삭제 시 버전이 바뀌어 즉시 무효화됨)
+PAYROLL_YEAR_CACHE_TIMEOUT = 60 * 60
+
+
+def payroll_year_matrix(year):
+    """
+    연간 급여 대장 (교사별/월별 매트릭스).
+    (교사, 월) 그룹 쿼리 1회로 가져와 행 합계, 월별 합계, 총계를 한 번에 계산하고 연도별로 캐시합니다.
+    캐시 키에 DB 에 저장된 버전(해당 연도 지급 기록, 교사 정보)을 넣으므로
+    어느 워커에서 변경해도 모든 워커가 다음 요청에서 새로 계산합니다.
+    """
+    year_key = TeacherPaymentRecord.year_version_key(year)
+    versions = DataVersion.versions(year_key, Teacher.VERSION_KEY)
+    key = f"payroll:year:{year}:{versions[year_key]}:{versions[Teacher.VERSION_KEY]}"
+    data = cache.get(key)
+    if data is not None:
+        return data
+
+    rows = (
+        TeacherPaymentRecord.objects.filter(year=year, is_paid=True, month__gte=1, month__lte=12)
+        .values('teacher_id', 'teacher__name', 'month')
+        .annotate(amount=Sum('amount_paid'))
+        .order_by('teacher__name', 'teacher_id', 'month')
+    )
+
+    report_data = []
+    # 월별 총합을 저장할 리스트 (0~11 인덱스 사용)
+    monthly_totals = [0] * 12
+    grand_total = 0
+    current = None
+
+    for row in rows:
+        if current is None or current['teacher']['id'] != row['teacher_id']:
+            current = {
+                'teacher': {'id': row['teacher_id'], 'name': row['teacher__name']},
+                'monthly_amounts': [0] * 12,  # [1월액, 2월액, ... 12월액]
+                'row_total': 0,
+            }
+            report_data.append(current)
+
+        idx = row['month'] - 1
+        current['monthly_amounts'][idx] = row['amount']
+        current['row_total'] += row['amount']
+        monthly_totals[idx] += row['amount']
+        grand_total += row['amount']
+
+    data = {
+        'report_data': report_data,
+        'monthly_totals': monthly_totals,
+        'grand_total': grand_total,
+    }
+    cache.set(key, data, PAYROLL_YEAR_CACHE_TIMEOUT)
+    return data
@@ -0,0 +1,184 @@
+# teachers/pdf.py
+
+import hashlib
+import io
+import os
+from django.conf import settings
+from django.core.cache import cache
+# PDF 생성을 위한 필수 라이브러리 임포트
+from reportlab.pdfgen import canvas
+from reportlab.lib.pagesizes import A4
+from reportlab.pdfbase import pdfmetrics
+from reportlab.pdfbase.ttfonts import TTFont
+
+
+KOREAN_FONT_NAME = 'MaruBuri-Regular'
+FALLBACK_FONT_NAME = 'Helvetica'
+
+# 생성된 PDF 캐시 유지 시간 (키에 그리기 인자 해시가 포함되므로 내용이 바뀌면 자동으로 새 키가 됨)
+PDF_CACHE_TIMEOUT = 60 * 60 * 24 * 7
+
+_registered_font_name = None
+
+
+def register_fonts():
+    """
+    한글 폰트를 프로세스당 한 번만 등록합니다. (앱 시작 시 TeachersConfig.ready 에서 호출)
+    폰트 파일이 없으면 기본 영문 폰트로 폴백합니다.
+    """
+    global _registered_font_name
+    if _registered_font_name:
+        return _registered_font_name
+
+    font_path = os.path.join(settings.BASE_DIR, 'static', 'fonts', f'{KOREAN_FONT_NAME}.ttf')
+    try:
+        pdfmetrics.registerFont(TTFont(KOREAN_FONT_NAME, font_path))
+        _registered_font_name = KOREAN_FONT_NAME
+    except Exception:
+        # 폰트 파일이 없을 경우 기본 영문 폰트로 폴백 (에러 방지)
+        print(f"Warning: {KOREAN_FONT_NAME} font not found.")
+        _registered_font_name = FALLBACK_FONT_NAME
+    return _registered_font_name
+
+
+def _args_digest(args):
+    return hashlib.sha1(repr(args).encode('utf-8')).hexdigest()
+
+
+def render_cached(report_type, teacher_id, year, month, draw, *args):
+    """
+    (보고서 종류, 교사, 년, 월, 그리기 인자 해시) 단위로 PDF 를 캐시합니다.
+    교사 이름, 표시 날짜처럼 PDF 에 찍히는 값은 모두 draw(*args) 인자로 받으므로 어느 하나라도 바뀌면 새 키가 됩니다.
+    같은 인자로 다시 요청하면 캔버스를 다시 그리지 않고 캐시된 바이트를 반환합니다.
+    """
+    key = f"pdf:{report_type}:{teacher_id or 'all'}:{year}-{month:02d}:{_args_digest(args)}"
+    pdf = cache.get(key)
+    if pdf is None:
+        pdf = draw(*args)
+        cache.set(key, pdf, PDF_CACHE_TIMEOUT)
+    return pdf
+
+
+def payroll_pdf_rows(payroll_data):
+    """PayrollRow 목록을 PDF 에 필요한 값만 담은 튜플 목록으로 변환합니다."""
+    return [(row.teacher.name, row.work_days, row.work_hours, row.total_salary) for row in payroll_data]
+
+
+def draw_payroll_pdf(year, month, rows):
+    """월간 급여 보고서 PDF 를 그려 바이트로 반환합니다."""
+    buffer = io.BytesIO()
+    c = canvas.Canvas(buffer, pagesize=A4)
+    width, height = A4
+    font_name = register_fonts()
+
+    # 문서 제목
+    c.setFont(font_name, 16)
+    c.drawString(200, height - 50, f"{year}년 {month}월 월간 급여 보고서")
+
+    y = height - 80
+    c.setFont(font_name, 10)
+
+    c.line(30, y + 10, 560, y + 10)
+
+    # 테이블 헤더
+    c.drawString(30, y, "이름")
+
+    c.line(30, y + 10, 560, y + 10)
+
+    c.drawString(280, y, "근무일")
+    c.drawString(320, y, "시간")
+    c.drawString(380, y, "지급액")
+
+    y -= 20
+    c.setFont(font_name, 10)
+
+    total_payout = 0
+    for name, work_days, work_hours, total_salary in rows:
+        if y < 50: # 페이지 분할
+            c.showPage()
+            y = height - 50
+
+        c.drawString(30, y, str(name))
+        c.drawString(280, y, str(work_days))
+        c.drawString(320, y, f"{work_hours}h")
+        # 천 단위 콤마 처리는 PDF에서 직접 하기 어려우므로 intcomma 대신 f-string 포맷 사용
+        c.drawString(380, y, f"{total_salary:,}원")
+
+        total_payout += total_salary
+        y -= 20
+
+    c.line(30, y + 10, 560, y + 10)
+    c.setFont(font_name, 12)
+    c.drawString(30, y - 10, "총 지급액:")
+    c.drawString(380, y - 10, f"{total_payout:,}원")
+
+    c.showPage()
+    c.save()
+    return buffer.getvalue()
+
+
+def work_history_pdf_rows(records):
+    """근무 기록 쿼리셋을 PDF 에 필요한 값만 담은 튜플 목록으로 변환합니다."""
+    return [
+        (record.date, record.start_time, record.end_time, record.get_work_hours(), record.memo or "")
+        for record in records
+    ]
+
+
+def draw_work_history_pdf(teacher_name, date_str, rows):
+    """교사 개인별 월간 근무 기록 PDF 를 그려 바이트로 반환합니다."""
+    buffer = io.BytesIO()
+    c = canvas.Canvas(buffer, pagesize=A4)
+    width, height = A4
+    font_name = register_fonts()
+
+    # 제목
+    c.setFont(font_name, 16)  # 등록한 한글 폰트 사용
+    c.drawString(250, height - 50, f"근무 기록")
+
+    c.setFont(font_name, 12)
+    c.drawString(30, height - 80, f"이름: {teacher_name}")
+    c.drawString(30, height - 100, f"기간: {date_str}")
+
+    # 테이블 헤더
+    y = height - 140
+    c.setFont(font_name, 10)
+    c.drawString(30, y, "날짜")
+    c.drawString(120, y, "시작")
+    c.drawString(200, y, "종료")
+    c.drawString(280, y, "시간")
+    c.drawString(350, y, "비고")
+    c.line(30, y - 5, 550, y - 5)
+
+    # 데이터 출력
+    y -= 25
+    c.setFont(font_name, 10)
+
+    total_hours = 0.0
+
+    for date, start_time, end_time, hours, memo in rows:
+        if y < 50:  # 페이지 넘김
+            c.showPage()
+            c.setFont(font_name, 10)  # 새 페이지에서도 폰트 재설정
+            y = height - 50
+
+        total_hours += hours
+
+        # 날짜 형식 (YYYY-MM-DD)
+        c.drawString(30, y, date.strftime('%Y-%m-%d'))
+        c.drawString(120, y, start_time.strftime('%H:%M'))
+        c.drawString(200, y, end_time.strftime('%H:%M'))
+        c.drawString(280, y, f"{hours} 시간")
+        c.drawString(350, y, str(memo))
+
+        y -= 20
+
+    # 총계
+    c.line(30, y + 10, 550, y + 10)
+    c.setFont(font_name, 12)  # 강조를 위해 폰트 크기 키움
+    c.drawString(30, y - 10, "총 근무 시간:")
+    c.drawString(280, y - 10, f"{round(total_hours, 2)} 시간")
+
+    c.showPage()
+    c.save()
+    return buffer.getvalue()
@@ -0,0 +1,11 @@
+# teachers/signals.py
+
+from django.dispatch import Signal
+
+
+# 근무 불가 일정이 추가/삭제되었을 때 발생 (인자: dates - 변경된 날짜 목록)
+# bulk_create / queryset.delete() 처럼 모델 save/delete 를 거치지 않는 경로에서는 직접 send 해야 합니다.
+unavailable_changed = Signal()
+
+# 근무 기록이 추가/수정/삭제되어 월간 근무 집계가 바뀌었을 때 커밋 후 발생 (인자: months - 바뀐 월의 1일 목록)
+work_records_changed = Signal()
@@ -1,3 +1,280 @@
+import datetime
+import importlib
+from unittest import mock
+
+from django.apps import apps
+from django.contrib import admin
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import F
 from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from core.models import DataVersion
+from .models import Teacher, TeacherMonthlyWork, TeacherPaymentRecord, TeacherUnavailable, TeacherWorkRecord
+from .admin import TeacherUnavailableAdmin
+from .forms import UnavailableForm
+from .payroll import bulk_process_payments, calculate_payroll_data, payroll_year_matrix
+from .signals import unavailable_changed
+from .work_entry import MAX_RANGE_DAYS, bulk_create_work_records
+
+
+def make_teacher(name='김선생'):
+    return Teacher.objects.create(name=name, gender='F', phone='010-0000-0000',
+                                  bank_name='국민', account_number='000-000')
+
+
+class WorkMinutesMigrationTests(TestCase):
+    def test_backfill_matches_incremental_aggregates(self):
+        migration = importlib.import_module('teachers.migrations.0004_teachermonthlywork_and_more')
+        teacher = make_teacher()
+        shifts = [
+            (datetime.date(2026, 9, 30), datetime.time(18, 0), datetime.time(20, 30)),
+            (datetime.date(2026, 10, 1), datetime.time(22, 0), datetime.time(1, 15)),  # 자정 넘김
+            (datetime.date(2026, 10, 2), datetime.time(9, 5), datetime.time(12, 0)),
+        ]
+        for date, start, end in shifts:
+            TeacherWorkRecord.objects.create(teacher=teacher, date=date, start_time=start, end_time=end)
+        expected_minutes = dict(TeacherWorkRecord.objects.values_list('pk', 'duration_minutes'))
+        expected_months = set(TeacherMonthlyWork.objects.values_list('month', 'work_days', 'total_minutes'))
+
+        # 마이그레이션 직전 상태: 근무 시간 0, 집계 없음
+        TeacherWorkRecord.objects.update(duration_minutes=0)
+        TeacherMonthlyWork.objects.all().delete()
+        migration.backfill_work_minutes(apps, None)
+
+        self.assertEqual(dict(TeacherWorkRecord.objects.values_list('pk', 'duration_minutes')), expected_minutes)
+        self.assertEqual(sorted(expected_minutes.values()), [150, 175, 195])
+        self.assertEqual(set(TeacherMonthlyWork.objects.values_list('month', 'work_days', 'total_minutes')),
+                         expected_months)
+
+
+class PayrollYearCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.teacher = make_teacher('이선생')
+        TeacherPaymentRecord.objects.create(teacher=self.teacher, year=2026, month=3, amount_paid=100000)
+
+    def test_cached_until_version_changes(self):
+        payroll_year_matrix(2026)
+        with self.assertNumQueries(1):  # 버전 조회만
+            data = payroll_year_matrix(2026)
+        self.assertEqual(data['grand_total'], 100000)
+
+    def test_change_from_another_worker_invalidates(self):
+        payroll_year_matrix(2026)
+        # 다른 워커의 저장: 이 프로세스 캐시는 건드리지 않고 DB 만 바뀜
+        with mock.patch('core.models.DataVersion.bump'):
+            TeacherPaymentRecord.objects.create(teacher=self.teacher, year=2026, month=4, amount_paid=50000)
+        DataVersion.objects.filter(key='payroll:2026').update(version=F('version') + 1)
+
+        self.assertEqual(payroll_year_matrix(2026)['grand_total'], 150000)
+
+    def test_teacher_rename_invalidates(self):
+        payroll_year_matrix(2026)
+        self.teacher.name = '이선생님'
+        self.teacher.save()
+
+        self.assertEqual(payroll_year_matrix(2026)['report_data'][0]['teacher']['name'], '이선생님')
+
+    def test_rollback_keeps_version(self):
+        before = DataVersion.versions('payroll:2026')
+        with self.assertRaises(RuntimeError), transaction.atomic():
+            TeacherPaymentRecord.objects.create(teacher=self.teacher, year=2026, month=5, amount_paid=1)
+            raise RuntimeError
+        self.assertEqual(DataVersion.versions('payroll:2026'), before)
+
+
+class AvailabilityMonthApiTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.teacher = make_teacher()
+        self.url = reverse('availability_month_api')
+
+    def post(self, teacher_ids, **extra):
+        return self.client.post(self.url, {'teacher_ids': teacher_ids, 'start_date': '2026-11-02',
+                                           'end_date': '2026-11-08', **extra})
+
+    def test_rejects_bad_or_unknown_teacher_ids(self):
+        self.assertEqual(self.post(['abc']).status_code, 400)
+        self.assertEqual(self.post([]).status_code, 400)
+        response = self.post([self.teacher.pk, 9999])
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()['teacher_ids'], [9999])
+        self.assertEqual(self.post([self.teacher.pk], weekdays=['7']).status_code, 400)
+        self.assertFalse(TeacherUnavailable.objects.exists())
+
+    def test_creates_range(self):
+        response = self.post([self.teacher.pk], weekdays=['0', '2'])
+        self.assertEqual(response.json(), {'status': 'success', 'created': 2, 'skipped': 0})
+
+    def test_last_modified_is_shared_and_moves_on_change(self):
+        first = self.client.get(self.url, {'year': 2026, 'month': 11})['Last-Modified']
+        cache.clear()  # 다른 워커: 로컬 캐시 없음
+        self.assertEqual(self.client.get(self.url, {'year': 2026, 'month': 11})['Last-Modified'], first)
+
+        DataVersion.objects.filter(key='unavailable:2026-11').update(
+            updated_at=timezone.now() - datetime.timedelta(days=1))
+        stale = self.client.get(self.url, {'year': 2026, 'month': 11})['Last-Modified']
+        self.post([self.teacher.pk])
+        response = self.client.get(self.url, {'year': 2026, 'month': 11}, HTTP_IF_MODIFIED_SINCE=stale)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['Last-Modified'], stale)
+
+
+class WorkHistoryPdfCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.teacher = make_teacher('최선생')
+        TeacherWorkRecord.objects.create(teacher=self.teacher, date=datetime.date(2026, 10, 5))
+        self.url = reverse('teacher_work_history_pdf', args=[self.teacher.pk]) + '?date=2026-10'
+
+    def test_rename_draws_new_pdf(self):
+        with mock.patch('teachers.views.draw_work_history_pdf', return_value=b'%PDF') as draw:
+            self.client.get(self.url)
+            self.client.get(self.url)
+            self.assertEqual(draw.call_count, 1)
+
+            self.teacher.name = '최선생님'
+            self.teacher.save()
+            self.client.get(self.url)
+        self.assertEqual(draw.call_count, 2)
+        self.assertEqual(draw.call_args.args[0], '최선생님')
+
+
+class DateRangeLimitTests(TestCase):
+    def setUp(self):
+        self.teacher = make_teacher()
+
+    def test_bulk_work_rejects_long_range(self):
+        response = self.client.post(reverse('teacher_bulk_work'), {
+            'date': '2026-01-01', 'end_date': '2027-12-31', 'teacher_ids': [self.teacher.pk],
+            f'start_time_{self.teacher.pk}': '18:00', f'end_time_{self.teacher.pk}': '20:00',
+        }, follow=True)
+        self.assertIn(f'최대 {MAX_RANGE_DAYS}일', ' '.join(str(m) for m in response.context['messages']))
+        self.assertFalse(TeacherWorkRecord.objects.exists())
+
+    def test_bulk_work_accepts_range_within_limit(self):
+        self.client.post(reverse('teacher_bulk_work'), {
+            'date': '2026-10-01', 'end_date': '2026-10-31', 'weekdays': ['0'], 'teacher_ids': [self.teacher.pk],
+            f'start_time_{self.teacher.pk}': '18:00', f'end_time_{self.teacher.pk}': '20:00',
+        })
+        self.assertEqual(TeacherWorkRecord.objects.count(), 4)
+
+    def test_availability_api_and_form_reject_long_range(self):
+        response = self.client.post(reverse('availability_month_api'), {
+            'teacher_ids': [self.teacher.pk], 'start_date': '2026-01-01', 'end_date': '2030-01-01',
+        })
+        self.assertEqual(response.status_code, 400)
+
+        form = UnavailableForm({'date': '2026-01-01', 'end_date': '2026-12-31'})
+        self.assertFalse(form.is_valid())
+        self.assertIn('end_date', form.errors)
+        self.assertFalse(TeacherUnavailable.objects.exists())
+
+
+class BulkWorkEntryTests(TestCase):
+    def setUp(self):
+        self.teacher = make_teacher()
+        self.evening = {self.teacher.pk: (datetime.time(18, 0), datetime.time(20, 0))}
+
+    def test_resubmitting_same_shift_is_skipped(self):
+        dates = [datetime.date(2026, 10, 5), datetime.date(2026, 10, 6)]
+        self.assertEqual(bulk_create_work_records(self.evening, dates)[0], 2)
+        created, skipped = bulk_create_work_records(self.evening, dates)
+
+        self.assertEqual(created, 0)
+        self.assertEqual([entry.reason for entry in skipped], ['근무 시간 중복'] * 2)
+        self.assertEqual(TeacherMonthlyWork.objects.get().work_days, 2)
+
+    def test_overnight_shift_on_last_day_overlapping_next_day_record(self):
+        TeacherWorkRecord.objects.create(teacher=self.teacher, date=datetime.date(2026, 10, 6),
+                                         start_time=datetime.time(0, 30), end_time=datetime.time(2, 0))
+        overnight = {self.teacher.pk: (datetime.time(22, 0), datetime.time(1, 0))}
+        created, skipped = bulk_create_work_records(overnight, [datetime.date(2026, 10, 5)])
+
+        self.assertEqual(created, 0)
+        self.assertEqual(skipped[0].reason, '근무 시간 중복')
+
+    def test_locks_selected_teachers(self):
+        with mock.patch('teachers.work_entry.Teacher.objects.select_for_update',
+                        wraps=Teacher.objects.select_for_update) as lock:
+            bulk_create_work_records(self.evening, [datetime.date(2026, 10, 5)])
+        lock.assert_called_once()
+
+
+class BulkPaymentTests(TestCase):
+    def setUp(self):
+        self.paid_teacher = make_teacher('김선생')
+        self.unpaid_teacher = make_teacher('박선생')
+        self.new_teacher = make_teacher('최선생')
+        for teacher in (self.paid_teacher, self.unpaid_teacher, self.new_teacher):
+            teacher.base_pay = 12000
+            teacher.hire_date = datetime.date(2026, 1, 1)
+            teacher.save()
+            TeacherWorkRecord.objects.create(teacher=teacher, date=datetime.date(2026, 10, 5))
+        TeacherPaymentRecord.objects.create(teacher=self.unpaid_teacher, year=2026, month=10,
+                                            amount_paid=0, is_paid=False)
+        self.payment_date = datetime.date(2026, 11, 5)
+
+    def test_splits_inserted_and_updated(self):
+        inserted, updated = bulk_process_payments(2026, 10, self.payment_date)
+        self.assertEqual({row.teacher for row in inserted}, {self.paid_teacher, self.new_teacher})
+        self.assertEqual([row.teacher for row in updated], [self.unpaid_teacher])
+        self.assertEqual(TeacherPaymentRecord.objects.filter(is_paid=True, amount_paid=24000).count(), 3)
+
+    def test_rows_paid_meanwhile_are_left_alone(self):
+        # 급여 계산 뒤, 잠금 전에 다른 요청이 먼저 지급 처리한 상황
+        stale = calculate_payroll_data(2026, 10)
+        TeacherPaymentRecord.objects.create(teacher=self.paid_teacher, year=2026, month=10,
+                                            amount_paid=30000, payment_date=datetime.date(2026, 10, 31))
+        with mock.patch('teachers.payroll.calculate_payroll_data', return_value=stale):
+            inserted, updated = bulk_process_payments(2026, 10, self.payment_date)
+
+        self.assertNotIn(self.paid_teacher, [row.teacher for row in inserted + updated])
+        record = TeacherPaymentRecord.objects.get(teacher=self.paid_teacher)
+        self.assertEqual((record.amount_paid, record.payment_date), (30000, datetime.date(2026, 10, 31)))
+
+        self.assertEqual(bulk_process_payments(2026, 10, self.payment_date), ([], []))
+
+
+class PayrollCalculationTests(TestCase):
+    def test_hours_are_rounded_per_record(self):
+        teacher = make_teacher()
+        teacher.base_pay = 15000
+        teacher.extra_pay = 1000
+        teacher.hire_date = datetime.date(2026, 1, 1)
+        teacher.save()
+        for day, start, end in ((5, (18, 0), (18, 20)), (6, (18, 0), (18, 20)), (7, (18, 0), (20, 30))):
+            TeacherWorkRecord.objects.create(teacher=teacher, date=datetime.date(2026, 10, day),
+                                             start_time=datetime.time(*start), end_time=datetime.time(*end))
+
+        row, = calculate_payroll_data(2026, 10)
+        # 0.33 + 0.33 + 2.5 = 3.16시간 (분 단위 합계 190분 = 3.1666...시간 이 아님)
+        self.assertEqual(row.work_hours, 3.16)
+        self.assertEqual(row.base_salary, 47400)
+        self.assertEqual(row.total_salary, 48400)
+        self.assertEqual(row.work_minutes, 190)
+
+
+class TeacherUnavailableAdminTests(TestCase):
+    def test_bulk_delete_sends_changed_dates(self):
+        teacher = make_teacher()
+        dates = [datetime.date(2026, 11, 2), datetime.date(2026, 11, 3)]
+        for date in dates:
+            TeacherUnavailable.objects.create(teacher=teacher, date=date)
+        model_admin = TeacherUnavailableAdmin(TeacherUnavailable, admin.site)
+        before = DataVersion.versions('unavailable:2026-11')['unavailable:2026-11']
+
+        received = []
+        unavailable_changed.connect(lambda sender, dates, **kwargs: received.append(dates), weak=False,
+                                    dispatch_uid='test_admin_delete')
+        try:
+            model_admin.delete_queryset(None, TeacherUnavailable.objects.all())
+        finally:
+            unavailable_changed.disconnect(dispatch_uid='test_admin_delete')
 
-# Create your tests here.
+        self.assertFalse(TeacherUnavailable.objects.exists())
+        self.assertEqual(received, [dates])
+        self.assertEqual(DataVersion.versions('unavailable:2026-11')['unavailable:2026-11'], before + 1)
@@ -23,7 +23,9 @@ urlpatterns = [
 
     # API 및 상세 PDF
     path('<int:pk>/history/pdf/', views.teacher_work_history_pdf, name='teacher_work_history_pdf'),
+    path('history/zip/', views.teacher_work_history_zip, name='teacher_work_history_zip'),
     path('api/check-availability/', views.check_availability_api, name='check_availability_api'),
+    path('api/availability/', views.availability_month_api, name='availability_month_api'),
 
     # 연도별 지급 내역
     path('payroll/annual/', views.teacher_payroll_year_list, name='teacher_payroll_year_list'),
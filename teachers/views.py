@@ -1,24 +1,30 @@
 # teachers/views.py
-import os
-from django.conf import settings
 from django.shortcuts import render, redirect, get_object_or_404
 from .models import Teacher, TeacherWorkRecord, TeacherUnavailable, TeacherPaymentRecord
 from .forms import TeacherForm, WorkRecordForm, UnavailableForm
+from .payroll import calculate_payroll_data, payroll_year_matrix, bulk_process_payments
+from .pdf import (render_cached, payroll_pdf_rows, draw_payroll_pdf,
+                  work_history_pdf_rows, draw_work_history_pdf)
+from .export import iter_work_history_zip
+from .work_entry import expand_dates, check_date_range, bulk_create_work_records
+from .availability import (month_unavailable_bitmap, bitmap_etag, month_last_modified,
+                           create_unavailable_range)
 from django.contrib import messages # 알림 메시지
 from django.utils import timezone
-from collections import defaultdict # dictionary 편의 기능
 from django.http import JsonResponse # JSON 응답용
-# PDF 생성을 위한 필수 라이브러리 임포트
-from reportlab.pdfgen import canvas
-from reportlab.lib.pagesizes import A4
-from reportlab.pdfbase import pdfmetrics
-from reportlab.pdfbase.ttfonts import TTFont
-from django.http import HttpResponse
+from django.http import HttpResponse, StreamingHttpResponse
+import calendar
 import datetime
 from django.urls import reverse
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
 from django.db.models import Sum, Count
 
 
+# 교사 상세 페이지에 표시할 최근 근무 기록 수
+RECENT_WORK_RECORD_LIMIT = 100
+
+
 def teacher_list(request):
     """교사 목록 조회 (퇴사자 필터링 기능 추가)"""
 
@@ -88,9 +94,17 @@ def teacher_detail(request, pk):
         elif action == 'unavailable':
             form = UnavailableForm(request.POST)
             if form.is_valid():
-                unavailable = form.save(commit=False)
-                unavailable.teacher = teacher
-                unavailable.save()
+                end_date = form.cleaned_data.get('end_date')
+                if end_date and end_date > form.cleaned_data['date']:
+                    # 기간 입력 시 일괄 등록 (이미 등록된 날짜는 건너뜀)
+                    created, skipped = create_unavailable_range(
+                        [teacher.pk], expand_dates(form.cleaned_data['date'], end_date), form.cleaned_data['reason']
+                    )
+                    messages.success(request, f"근무 불가 일정 {created}일이 등록되었습니다. (중복 {skipped}일 제외)")
+                else:
+                    unavailable = form.save(commit=False)
+                    unavailable.teacher = teacher
+                    unavailable.save()
                 return redirect('teacher_detail', pk=pk)
 
         elif action == 'delete_work':
@@ -116,20 +130,15 @@ def teacher_detail(request, pk):
     })
     unavailable_form = UnavailableForm()
 
-    # 목록 조회
-    work_records = teacher.work_records.all().order_by('-date')
+    # 목록 조회 (근무 기록은 최근 내역만 표시)
+    work_records = teacher.work_records.all().order_by('-date', '-start_time')[:RECENT_WORK_RECORD_LIMIT]
     unavailable_dates = teacher.unavailable_dates.all().order_by('-date')
 
-    # 월별 근무 시간 합계 계산 로직
-    monthly_summary = defaultdict(float)  # 기본값이 0.0인 딕셔너리
-    for record in work_records:
-        # '2025-11' 형태의 키 생성
-        month_key = record.date.strftime('%Y-%m')
-        # 모델의 get_work_hours() 메서드 결과 더하기
-        monthly_summary[month_key] += record.get_work_hours()
-
-    # 템플릿에서 보기 좋게 정렬 (최신 월 순서)
-    sorted_summary = dict(sorted(monthly_summary.items(), reverse=True))
+    # 월별 근무 시간 합계: 월간 집계 테이블에서 바로 조회 (최신 월 순서)
+    sorted_summary = {
+        summary.month.strftime('%Y-%m'): summary.total_hours
+        for summary in teacher.monthly_work.filter(work_days__gt=0).order_by('-month')
+    }
 
     context = {
         'teacher': teacher,
@@ -149,9 +158,24 @@ def teacher_bulk_work(request):
     teachers = Teacher.objects.filter(resign_date__isnull=True).order_by('name')
 
     if request.method == 'POST':
-        # 1. 공통 데이터 받기 (날짜, 비고)
-        date = request.POST.get('date')
+        # 1. 공통 데이터 받기 (날짜/기간, 요일, 비고)
         memo = request.POST.get('memo')
+        try:
+            start_date = datetime.datetime.strptime(request.POST.get('date'), '%Y-%m-%d').date()
+            end_date_str = request.POST.get('end_date')
+            end_date = datetime.datetime.strptime(end_date_str, '%Y-%m-%d').date() if end_date_str else start_date
+        except (ValueError, TypeError):
+            messages.error(request, "날짜 형식 오류. YYYY-MM-DD 형식으로 입력해주세요.")
+            return redirect('teacher_bulk_work')
+
+        try:
+            check_date_range(start_date, end_date)
+        except ValueError as e:
+            messages.error(request, str(e))
+            return redirect('teacher_bulk_work')
+
+        weekdays = {int(w) for w in request.POST.getlist('weekdays') if w.isdigit()}
+        dates = expand_dates(start_date, end_date, weekdays)
 
         # 2. 체크박스로 선택된 교사 ID 리스트 받기
         selected_ids = request.POST.getlist('teacher_ids')
@@ -160,30 +184,37 @@ def teacher_bulk_work(request):
             messages.error(request, "선택된 교사가 없습니다.")
             return redirect('teacher_bulk_work')
 
-        count = 0
+        # 3. 각 교사별로 입력된 시작/종료 시간 가져오기 (시간이 입력된 경우에만 저장)
+        shifts = {}
         for t_id in selected_ids:
-            # 3. 각 교사별로 입력된 시작/종료 시간 가져오기
             start = request.POST.get(f'start_time_{t_id}')
             end = request.POST.get(f'end_time_{t_id}')
-
-            if start and end:  # 시간이 입력된 경우에만 저장
-                teacher = Teacher.objects.get(pk=t_id)
-                TeacherWorkRecord.objects.create(
-                    teacher=teacher,
-                    date=date,
-                    start_time=start,
-                    end_time=end,
-                    memo=memo
-                )
-                count += 1
-
-        messages.success(request, f'{count}명의 근무 기록이 저장되었습니다.')
+            if start and end:
+                try:
+                    shifts[int(t_id)] = (datetime.datetime.strptime(start, '%H:%M').time(),
+                                         datetime.datetime.strptime(end, '%H:%M').time())
+                except ValueError:
+                    messages.error(request, f"시간 형식 오류: {start} ~ {end}")
+                    return redirect('teacher_bulk_work')
+
+        # 4. 중복/근무 불가 검사 후 일괄 저장
+        count, skipped = bulk_create_work_records(shifts, dates, memo=memo)
+
+        messages.success(request, f'{count}건의 근무 기록이 저장되었습니다.')
+        if skipped:
+            details = ", ".join(
+                f"{item.teacher_name} {item.date:%m/%d} {item.start_time:%H:%M}~{item.end_time:%H:%M}({item.reason})"
+                for item in skipped[:20]
+            )
+            more = f" 외 {len(skipped) - 20}건" if len(skipped) > 20 else ""
+            messages.warning(request, f"{len(skipped)}건은 저장하지 않았습니다: {details}{more}")
         return redirect('teacher_list')
 
     # GET 요청 시: 오늘 날짜를 기본값으로 전달
     context = {
         'teachers': teachers,
-        'today': timezone.now().strftime('%Y-%m-%d')
+        'today': timezone.now().strftime('%Y-%m-%d'),
+        'weekday_choices': list(enumerate(['월', '화', '수', '목', '금', '토', '일'])),
     }
     return render(request, 'teachers/teacher_bulk_work.html', context)
 
@@ -203,49 +234,66 @@ def check_availability_api(request):
     return JsonResponse({'unavailable_ids': unavailable_ids})
 
 
-def calculate_payroll_data(year, month):
-    """급여 계산 공통 함수"""
-    teachers = Teacher.objects.all().order_by('name')
-    payroll_data = []
-
-    for teacher in teachers:
-        hire_date = teacher.hire_date
-        # 1. 입사 연도 체크: 계산 연도가 입사 연도보다 이전이면 건너뛰기
-        if year < hire_date.year:
-            continue
-        # 2. 입사 월 체크: 연도가 같고, 계산 월이 입사 월보다 이전이면 건너뛰기
-        if year == hire_date.year and month < hire_date.month:
-            continue
-        records = teacher.work_records.filter(date__year=year, date__month=month)
-        work_days = records.count()
-        total_hours = sum(r.get_work_hours() for r in records)
-        base_salary = total_hours * teacher.base_pay
-        total_salary = base_salary + teacher.extra_pay
-
-        # 해당 월의 지급 기록이 있는지 확인
-        payment_record = TeacherPaymentRecord.objects.filter(
-            teacher=teacher, year=year, month=month
-        ).first()
+def availability_month_api(request):
+    """
+    월 단위 근무 불가 비트맵 API
+    - GET  ?year=2026&month=11 : {teacher_id: 비트맵} (비트 (일-1) = 근무 불가), ETag/Last-Modified 지원
+    - POST teacher_ids, start_date, end_date, weekdays, reason : 기간 단위 근무 불가 일괄 등록
+    """
+    if request.method == 'POST':
+        try:
+            teacher_ids = [int(t_id) for t_id in request.POST.getlist('teacher_ids')]
+            start_date = datetime.datetime.strptime(request.POST.get('start_date'), '%Y-%m-%d').date()
+            end_date_str = request.POST.get('end_date')
+            end_date = datetime.datetime.strptime(end_date_str, '%Y-%m-%d').date() if end_date_str else start_date
+            weekdays = {int(w) for w in request.POST.getlist('weekdays')}
+        except (ValueError, TypeError):
+            return JsonResponse({'status': 'error', 'message': '입력 형식 오류'}, status=400)
 
-        is_paid = payment_record.is_paid if payment_record else False
-        payment_date = payment_record.payment_date if payment_record else None
-
-        if work_days > 0 or teacher.extra_pay > 0:
-            payroll_data.append({
-                'teacher': teacher,
-                'bank_name': teacher.bank_name,
-                'account_number': teacher.account_number,
-                'work_days': work_days,
-                'work_hours': total_hours,
-                'base_pay_rate': teacher.base_pay,
-                'base_salary': int(base_salary),
-                'extra_pay': teacher.extra_pay,
-                'total_salary': int(total_salary),
-                # 지급 상태 정보
-                'is_paid': is_paid,
-                'payment_date': payment_date,
-            })
-    return payroll_data
+        try:
+            check_date_range(start_date, end_date)
+        except ValueError as e:
+            return JsonResponse({'status': 'error', 'message': str(e)}, status=400)
+        if not teacher_ids:
+            return JsonResponse({'status': 'error', 'message': '교사를 선택하세요.'}, status=400)
+        found = set(Teacher.objects.filter(pk__in=teacher_ids).values_list('pk', flat=True))
+        unknown = sorted(set(teacher_ids) - found)
+        if unknown:
+            return JsonResponse({'status': 'error', 'message': '존재하지 않는 교사입니다.', 'teacher_ids': unknown},
+                                status=400)
+        if not weekdays <= set(range(7)):
+            return JsonResponse({'status': 'error', 'message': '요일은 0(월) ~ 6(일) 이어야 합니다.'}, status=400)
+
+        created, skipped = create_unavailable_range(
+            teacher_ids, expand_dates(start_date, end_date, weekdays), request.POST.get('reason') or None
+        )
+        return JsonResponse({'status': 'success', 'created': created, 'skipped': skipped})
+
+    today = timezone.localtime(timezone.now()).date()
+    try:
+        year = int(request.GET.get('year', today.year))
+        month = int(request.GET.get('month', today.month))
+        _, last_day = calendar.monthrange(year, month)
+    except (ValueError, calendar.IllegalMonthError):
+        return JsonResponse({'status': 'error', 'message': '잘못된 년/월'}, status=400)
+
+    bitmap = month_unavailable_bitmap(year, month)
+    etag = quote_etag(bitmap_etag(year, month, bitmap))
+    last_modified = month_last_modified(year, month)
+
+    # 변경이 없으면 304 응답 (브라우저 캐시 사용)
+    response = get_conditional_response(request, etag=etag, last_modified=int(last_modified.timestamp()))
+    if response is None:
+        response = JsonResponse({
+            'year': year,
+            'month': month,
+            'days': last_day,
+            'unavailable': {str(teacher_id): bits for teacher_id, bits in bitmap.items()},
+        })
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(last_modified.timestamp())
+    response['Cache-Control'] = 'no-cache'
+    return response
 
 
 def teacher_payroll(request):
@@ -257,7 +305,7 @@ def teacher_payroll(request):
     payroll_data = calculate_payroll_data(year, month)
 
     # 이번 달 지급 대상 총액 계산
-    grand_total = sum(item['total_salary'] for item in payroll_data)
+    grand_total = sum(row.total_salary for row in payroll_data)
 
     context = {
         'payroll_data': payroll_data,
@@ -276,71 +324,13 @@ def teacher_payroll_pdf(request):
     year = int(request.GET.get('year', now.year))
     month = int(request.GET.get('month', now.month))
 
-    payroll_data = calculate_payroll_data(year, month)
+    rows = payroll_pdf_rows(calculate_payroll_data(year, month))
+    pdf = render_cached('payroll', None, year, month, draw_payroll_pdf, year, month, rows)
 
-    response = HttpResponse(content_type='application/pdf')
+    response = HttpResponse(pdf, content_type='application/pdf')
     filename = f"급여내역_{year}_{month}월.pdf"
     # 한글 파일명 깨짐 방지를 위해 ASCII 처리
     response['Content-Disposition'] = f'attachment; filename="{filename}"'
-
-    c = canvas.Canvas(response, pagesize=A4)
-    width, height = A4
-
-    # 사용자께서 설정하신 폰트 이름 사용
-    font_name = 'MaruBuri-Regular'
-
-    # 폰트 등록 (teacher_work_history_pdf 함수와 동일한 로직 사용)
-    try:
-        # settings.BASE_DIR는 views.py 상단에 import 되어 있어야 함
-        pdfmetrics.registerFont(TTFont(font_name, os.path.join(settings.BASE_DIR, 'static', 'fonts', f'{font_name}.ttf')))
-    except:
-        font_name = 'Helvetica'
-
-    # 문서 제목
-    c.setFont(font_name, 16)
-    c.drawString(200, height - 50, f"{year}년 {month}월 월간 급여 보고서")
-
-    y = height - 80
-    c.setFont(font_name, 10)
-
-    c.line(30, y + 10, 560, y + 10)
-
-    # 테이블 헤더
-    c.drawString(30, y, "이름")
-
-    c.line(30, y + 10, 560, y + 10)
-
-    # c.drawString(120, y, "은행 / 계좌")
-    c.drawString(280, y, "근무일")
-    c.drawString(320, y, "시간")
-    c.drawString(380, y, "지급액")
-
-    y -= 20
-    c.setFont(font_name, 10)
-
-    total_payout = 0
-    for data in payroll_data:
-        if y < 50: # 페이지 분할
-            c.showPage()
-            y = height - 50
-
-        c.drawString(30, y, str(data['teacher'].name))
-        # c.drawString(120, y, f"{data['bank_name']} {data['account_number']}")
-        c.drawString(280, y, str(data['work_days']))
-        c.drawString(320, y, f"{data['work_hours']}h")
-        # 천 단위 콤마 처리는 PDF에서 직접 하기 어려우므로 intcomma 대신 f-string 포맷 사용
-        c.drawString(380, y, f"{data['total_salary']:,}원")
-
-        total_payout += data['total_salary']
-        y -= 20
-
-    c.line(30, y + 10, 560, y + 10)
-    c.setFont(font_name, 12)
-    c.drawString(30, y - 10, "총 지급액:")
-    c.drawString(380, y - 10, f"{total_payout:,}원")
-
-    c.showPage()
-    c.save()
     return response
 
 
@@ -357,83 +347,27 @@ def teacher_work_history_pdf(request, pk):
 
     # 해당 월의 근무 기록 조회
     records = teacher.work_records.filter(date__year=year, date__month=month).order_by('-date')
+    rows = work_history_pdf_rows(records)
+    pdf = render_cached('work_history', teacher.pk, year, month,
+                        draw_work_history_pdf, teacher.name, date_str, rows)
 
-    # PDF 생성 시작
-    response = HttpResponse(content_type='application/pdf')
-    filename = f"WorkHistory_{teacher.name}_{date_str}.pdf"
+    response = HttpResponse(pdf, content_type='application/pdf')
     # 한글 파일명 깨짐 방지를 위해 ASCII 처리 (선택사항)
     response['Content-Disposition'] = f'attachment; filename="WorkHistory_{year}_{month}.pdf"'
+    return response
 
-    c = canvas.Canvas(response, pagesize=A4)
-    width, height = A4
 
-    # 한글 폰트 등록 (static/fonts/MaruBuri-Regular.ttf)
-    font_path = os.path.join(settings.BASE_DIR, 'static', 'fonts', 'MaruBuri-Regular.ttf')
+def teacher_work_history_zip(request):
+    """월말: 재직 교사 전체의 월간 근무 기록 PDF 를 ZIP 으로 묶어 스트리밍 다운로드"""
+    date_str = request.GET.get('date')
     try:
-        pdfmetrics.registerFont(TTFont('MaruBuri-Regular', font_path))
-        font_name = 'MaruBuri-Regular'
-    except:
-        # 폰트 파일이 없을 경우 기본 영문 폰트로 폴백 (에러 방지)
-        font_name = 'Helvetica'
-        print("Warning: MaruBuri-Regular font not found.")
-
-    # 제목
-    c.setFont(font_name, 16)  # 등록한 한글 폰트 사용
-    c.drawString(250, height - 50, f"근무 기록")
-
-    c.setFont(font_name, 12)
-    c.drawString(30, height - 80, f"이름: {teacher.name}")
-    c.drawString(30, height - 100, f"기간: {date_str}")
-
-    # 테이블 헤더
-    y = height - 140
-    c.setFont(font_name, 10)
-    c.drawString(30, y, "날짜")
-    c.drawString(120, y, "시작")
-    c.drawString(200, y, "종료")
-    c.drawString(280, y, "시간")
-    c.drawString(350, y, "비고")
-    c.line(30, y - 5, 550, y - 5)
-
-    # 데이터 출력
-    y -= 25
-    c.setFont(font_name, 10)
-
-    total_hours = 0.0
-
-    for record in records:
-        if y < 50:  # 페이지 넘김
-            c.showPage()
-            c.setFont(font_name, 10)  # 새 페이지에서도 폰트 재설정
-            y = height - 50
-
-        hours = record.get_work_hours()
-        total_hours += hours
-
-        # 날짜 형식 (YYYY-MM-DD)
-        c.drawString(30, y, record.date.strftime('%Y-%m-%d'))
-        c.drawString(120, y, record.start_time.strftime('%H:%M'))
-        c.drawString(200, y, record.end_time.strftime('%H:%M'))
-        c.drawString(280, y, f"{hours} 시간")
-
-        # 비고 (None이면 빈 문자열)
-        memo = record.memo if record.memo else ""
-        c.drawString(350, y, str(memo))
-
-        y -= 20
-
-    # 총계
-    c.line(30, y + 10, 550, y + 10)
-    c.setFont(font_name, 12)  # 강조를 위해 폰트 크기 키움
-    c.drawString(30, y - 10, "총 근무 시간:")
-    c.drawString(280, y - 10, f"{total_hours} 시간")
-
-    # 서명란
-    # c.drawString(30, y - 50, "서명: __________________________")
-
-    c.showPage()
-    c.save()
+        year, month = map(int, date_str.split('-'))
+        datetime.date(year, month, 1)
+    except (AttributeError, ValueError):
+        return HttpResponse("Invalid Date", status=400)
 
+    response = StreamingHttpResponse(iter_work_history_zip(year, month), content_type='application/zip')
+    response['Content-Disposition'] = f'attachment; filename="WorkHistory_{year}_{month:02d}.zip"'
     return response
 
 
@@ -497,41 +431,16 @@ def teacher_payroll_bulk_process(request):
             messages.error(request, "일괄 지급 처리 오류: 지급일 형식 오류.")
             return redirect(f"{reverse('teacher_payroll')}?year={year}&month={month}")
 
-        # 급여 계산 데이터를 가져옵니다. (입사일 필터링 로직 포함)
-        payroll_data = calculate_payroll_data(year, month)
-
-        processed_count = 0
-
-        for data in payroll_data:
-            # 미지급 상태이고, 근무 기록 또는 추가 급여가 있는 경우에만 처리
-            if not data['is_paid'] and (data['work_hours'] > 0 or data['extra_pay'] > 0):
-                teacher = data['teacher']
-                amount = data['total_salary']
-
-                # get_or_create로 처리 (중복 방지 및 생성)
-                record, created = TeacherPaymentRecord.objects.get_or_create(
-                    teacher=teacher,
-                    year=year,
-                    month=month,
-                    defaults={
-                        'amount_paid': amount,
-                        'payment_date': payment_date,
-                        'is_paid': True
-                    }
-                )
-
-                # 이미 존재하지만 is_paid=False로 되어있던 기록이 있다면 업데이트
-                if not created:
-                    record.amount_paid = amount
-                    record.payment_date = payment_date
-                    record.is_paid = True
-                    record.save()
-
-                processed_count += 1
+        # 미지급 급여를 upsert 한 번으로 일괄 처리 (입사일 필터링 로직 포함)
+        inserted, updated = bulk_process_payments(year, month, payment_date)
+        processed_count = len(inserted) + len(updated)
 
         if processed_count > 0:
             messages.success(request,
-                             f"{year}년 {month}월 미지급 급여 {processed_count}건이 {payment_date_str} 날짜로 일괄 지급 처리되었습니다.")
+                             f"{year}년 {month}월 미지급 급여 {processed_count}건이 {payment_date_str} 날짜로 일괄 지급 처리되었습니다. "
+                             f"(신규 {len(inserted)}건, 기존 기록 갱신 {len(updated)}건)")
+            if updated:
+                messages.info(request, "기존 기록 갱신: " + ", ".join(row.teacher.name for row in updated))
         else:
             messages.info(request, f"{year}년 {month}월에는 미지급된 급여가 없습니다.")
 
@@ -567,51 +476,11 @@ def teacher_payroll_year_list(request):
     now = datetime.datetime.now()
     selected_year = int(request.GET.get('year', now.year))
 
-    # 1. 모든 교사 가져오기
-    teachers = Teacher.objects.all().order_by('name')
-
-    report_data = []
-    # 월별 총합을 저장할 리스트 (0~11 인덱스 사용)
-    monthly_totals = [0] * 12
-    grand_total = 0
-
-    for teacher in teachers:
-        # 해당 연도의 지급 기록 가져오기 (지급 완료된 것만)
-        payments = TeacherPaymentRecord.objects.filter(
-            teacher=teacher,
-            year=selected_year,
-            is_paid=True
-        )
-
-        # 12개월치 0으로 초기화
-        monthly_amounts = [0] * 12
-        teacher_total = 0
-        has_payment = False
-
-        for p in payments:
-            # month는 1~12이므로 인덱스는 month-1
-            idx = p.month - 1
-            if 0 <= idx < 12:
-                monthly_amounts[idx] = p.amount_paid
-                teacher_total += p.amount_paid
-
-                # 세로 합계(월별 총합) 누적
-                monthly_totals[idx] += p.amount_paid
-                has_payment = True
-
-        # 1년 동안 한 번이라도 지급 내역이 있는 교사만 리포트에 포함
-        if has_payment:
-            report_data.append({
-                'teacher': teacher,
-                'monthly_amounts': monthly_amounts,  # [1월액, 2월액, ... 12월액]
-                'row_total': teacher_total
-            })
-            grand_total += teacher_total
+    # 교사/월 그룹 쿼리 1회로 만든 매트릭스 (연도별 캐시)
+    matrix = payroll_year_matrix(selected_year)
 
     context = {
-        'report_data': report_data,
-        'monthly_totals': monthly_totals,
-        'grand_total': grand_total,
+        **matrix,
         'selected_year': selected_year,
         'year_range': range(now.year - 2, now.year + 2),
     }
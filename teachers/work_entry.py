@@ -0,0 +1,116 @@
+# teachers/work_entry.py
+
+import datetime
+from collections import defaultdict, namedtuple
+from django.db import transaction
+from .models import (Teacher, TeacherWorkRecord, TeacherUnavailable, TeacherMonthlyWork,
+                     calculate_shift_minutes)
+
+
+# 저장하지 않고 건너뛴 근무 입력 (사유 포함)
+SkippedEntry = namedtuple('SkippedEntry', ['teacher_name', 'date', 'start_time', 'end_time', 'reason'])
+
+
+# 기간 입력으로 한 번에 등록할 수 있는 최대 일수 (약 3개월, 잘못 입력한 종료일로 수년치가 생성되지 않도록)
+MAX_RANGE_DAYS = 93
+
+
+def check_date_range(start_date, end_date):
+    """기간이 올바르지 않으면 화면에 보여줄 메시지와 함께 ValueError 를 발생시킵니다."""
+    if end_date < start_date:
+        raise ValueError("종료 날짜가 시작 날짜보다 빠릅니다.")
+    if (end_date - start_date).days + 1 > MAX_RANGE_DAYS:
+        raise ValueError(f"기간은 최대 {MAX_RANGE_DAYS}일까지 한 번에 입력할 수 있습니다.")
+
+
+def expand_dates(start_date, end_date=None, weekdays=None):
+    """
+    시작일~종료일 사이의 날짜 목록을 만듭니다.
+    weekdays 가 주어지면 해당 요일(월=0 ... 일=6)만 포함합니다.
+    """
+    end_date = end_date or start_date
+    dates = []
+    day = start_date
+    while day <= end_date:
+        if not weekdays or day.weekday() in weekdays:
+            dates.append(day)
+        day += datetime.timedelta(days=1)
+    return dates
+
+
+def _interval(date, start_time, end_time):
+    """근무 시간을 절대 분(minute) 구간으로 변환 (야간 근무는 다음날까지 이어짐)"""
+    start = date.toordinal() * 24 * 60 + start_time.hour * 60 + start_time.minute
+    return start, start + calculate_shift_minutes(start_time, end_time)
+
+
+def bulk_create_work_records(shifts, dates, memo=None):
+    """
+    여러 교사의 근무 기록을 여러 날짜에 걸쳐 한 번에 저장합니다.
+
+    1. 선택된 교사의 기존 근무 기록과 근무 불가 일정을 각각 쿼리 1회로 조회
+    2. 기존 기록 또는 이번 입력끼리 시간이 겹치는 건, 근무 불가일은 건너뛰고 보고
+    3. 나머지는 bulk_create 로 저장하고 월간 근무 집계를 일괄 갱신
+
+    :param shifts: {teacher_id: (start_time, end_time)}
+    :param dates: 근무 날짜 목록
+    :return: (created_count, skipped) - skipped 는 SkippedEntry 리스트
+    """
+    if not shifts or not dates:
+        return 0, []
+
+    with transaction.atomic():
+        # 선택한 교사 행을 잠가, 같은 입력이 두 번 전송되거나 두 사람이 동시에 입력해도
+        # 중복 검사와 저장이 교사별로 차례대로 이루어지게 함
+        teachers = {
+            teacher.pk: teacher
+            for teacher in Teacher.objects.select_for_update().filter(pk__in=list(shifts)).order_by('pk')
+        }
+        first_day, last_day = min(dates), max(dates)
+
+        # 야간 근무가 날짜를 넘나드는 경우까지 보기 위해 하루 전 ~ 하루 뒤까지 조회
+        # (전날 야간 근무가 첫날로, 마지막 날 야간 근무가 다음날 기록으로 겹칠 수 있음)
+        existing = defaultdict(list)
+        for teacher_id, date, start, end in TeacherWorkRecord.objects.filter(
+            teacher_id__in=teachers, date__gte=first_day - datetime.timedelta(days=1),
+            date__lte=last_day + datetime.timedelta(days=1),
+        ).values_list('teacher_id', 'date', 'start_time', 'end_time'):
+            existing[teacher_id].append(_interval(date, start, end))
+
+        unavailable = set(TeacherUnavailable.objects.filter(
+            teacher_id__in=teachers, date__gte=first_day, date__lte=last_day
+        ).values_list('teacher_id', 'date'))
+
+        new_records = []
+        skipped = []
+        deltas = defaultdict(lambda: [0, 0])
+
+        for teacher_id, (start_time, end_time) in shifts.items():
+            teacher = teachers.get(teacher_id)
+            if teacher is None:
+                continue
+            busy = existing[teacher_id]
+            for date in dates:
+                if (teacher_id, date) in unavailable:
+                    skipped.append(SkippedEntry(teacher.name, date, start_time, end_time, "근무 불가일"))
+                    continue
+
+                start, end = _interval(date, start_time, end_time)
+                if any(start < other_end and other_start < end for other_start, other_end in busy):
+                    skipped.append(SkippedEntry(teacher.name, date, start_time, end_time, "근무 시간 중복"))
+                    continue
+
+                busy.append((start, end))
+                minutes = end - start
+                new_records.append(TeacherWorkRecord(
+                    teacher=teacher, date=date, start_time=start_time, end_time=end_time,
+                    duration_minutes=minutes, memo=memo,
+                ))
+                delta = deltas[(teacher_id, date.replace(day=1))]
+                delta[0] += 1
+                delta[1] += minutes
+
+        TeacherWorkRecord.objects.bulk_create(new_records, batch_size=500)
+        TeacherMonthlyWork.add_many({key: tuple(value) for key, value in deltas.items()})
+
+    return len(new_records), skipped